@@ -29,13 +29,14 @@ DETECTION_CONFIG = {
     "class_name": "drone",       # Only detect drones
     "source": 0,                 # 0 for webcam, or path to video file
     "device": 0,                 # 0 for GPU, 'cpu' for CPU only
+    "track_objects": True,       # env: TRACK_OBJECTS - ByteTrack ids (lap package); kinematics need them
 }
 
 # ==============================================================================
 # LOGIC MODULE CONFIGURATION
 # ==============================================================================
 
-# File: logic/threat_engine.py
+# File: logic/threat_engine.py (thresholds and levels: logic/threat_evaluation.py)
 THREAT_CONFIG = {
     "confidence_threshold": 0.75,        # Minimum to trigger action
     "medium_threat_confidence": 0.80,    # MEDIUM threat boundary
@@ -48,8 +49,121 @@ THREAT_CONFIG = {
         "HIGH": "confidence >= 0.85"             # → triggers API
     },
     
-    "api_endpoint": "http://localhost:5000/trigger",
-    "api_timeout": 5  # seconds
+    "api_endpoint": "http://localhost:5000/api/trigger",  # env: FLASK_API_URL
+    "api_timeout": 5,  # seconds
+    "transport": "http",         # env: TRIGGER_TRANSPORT - "http" or "inprocess" (engine + backend in one process)
+    "wire_format": "auto"        # env: WIRE_FORMAT - "auto" (binary if /api/health advertises it), "json", "binary"
+}
+
+# File: logic/rule_engine.py
+RULES_CONFIG = {
+    "rules_file": "config/threat_rules.json",  # env: THREAT_RULES_FILE (see config/threat_rules.example.json)
+    "fields": ["class_name", "zone", "camera_id", "confidence", "bbox_area",
+               "bbox_width", "bbox_height", "hour", "track_age", "speed"],
+    "matching": "first matching rule wins; unmatched detections keep threshold level"
+}
+
+# File: logic/geofence.py
+GEOFENCE_CONFIG = {
+    "zones_file": "config/geofence_zones.json",  # env: GEOFENCE_FILE (see config/geofence_zones.example.json)
+    "lookup": "box centre -> zone id via rasterized per-camera label image",
+    "usage": "zone name available to rules as 'zone', logged and included in alerts"
+}
+
+# File: logic/kinematics.py
+KINEMATICS_CONFIG = {
+    "history_size": 8,           # ring buffer samples per track
+    "target_zone": "core",       # env: KINEMATIC_TARGET_ZONE - zone used for time-to-zone
+    "score": "confidence + growth (<=0.08) + speed (<=0.02) + zone entry (<=0.05), capped at 1.0"
+}
+
+# File: logic/config_reload.py
+HOT_RELOAD_CONFIG = {
+    "thresholds_file": "config/threat_thresholds.json",  # env: THREAT_CONFIG_FILE - {"low", "medium", "high"}
+    "rules_file": "config/threat_rules.json",            # env: THREAT_RULES_FILE
+    "reload_interval": 2.0       # env: CONFIG_RELOAD_INTERVAL - seconds between checks (0 = disabled)
+}
+
+# File: logic/confidence_smoothing.py
+SMOOTHING_CONFIG = {
+    "mode": "kofn",              # env: CONFIDENCE_SMOOTHING - "kofn", "ema" or "none"
+    "k": 2,                      # env: SMOOTHING_K - kofn: frames that must reach a confidence ...
+    "n": 3,                      # env: SMOOTHING_N - ... within the last n frames
+    "alpha": 0.6                 # env: SMOOTHING_ALPHA - ema: weight of the newest frame
+}
+
+# File: logic/sensor_fusion.py
+FUSION_CONFIG = {
+    "enabled": False,            # env: SENSOR_FUSION - join camera detections with RF / acoustic events
+    "window": 1.0,               # env: FUSION_WINDOW - seconds either side counted as simultaneous
+    "cell_size": 10.0,           # env: FUSION_CELL_SIZE - site-plane join radius / bucket size (other sensors only)
+    "source_weights": {"camera": 1.0, "rf": 0.8, "acoustic": 0.6},  # others: 0.5
+    "score": "1 - (1 - threat_score) * prod(1 - weight * confidence) over other source types",
+    "event": "detection dict + source, sensor_id, site_position [x, y] (required to join), confidence, timestamp_s"
+}
+
+# File: logic/engine_service.py
+ENGINE_SERVICE_CONFIG = {
+    "socket": "/tmp/aeroguard-engine.sock",  # env: ENGINE_SOCKET - set for detect_live.py to use the shared service
+    "max_frame_size": 16 * 1024 * 1024,      # bytes per frame
+    "frame": "u32 length + wire-format detection batch; response: u32 length + u8 level per detection",
+    "run": "python logic/engine_service.py [--socket PATH] [--log-level WARNING]"
+}
+
+# File: logic/rolling_stats.py
+ROLLING_STATS_CONFIG = {
+    "windows": {"last_minute": "1 s x 60", "last_hour": "1 min x 60", "last_day": "1 h x 24"},
+    "keys": "zone (or 'unzoned') x level (NONE, LOW, MEDIUM, HIGH)",
+    "max_zones": 64,             # env: MAX_STAT_ZONES - zone rows kept; further zones count as 'other'
+    "engine": "threat_engine.threat_stats - every evaluated detection (in the [ENGINE-STATS] log line)",
+    "backend": "threat store threat_counts table - logged detections and handled threats, the same in every worker (/api/status)"
+}
+
+# File: logic/camera_dedup.py
+DEDUP_CONFIG = {
+    "calibration_file": "config/camera_calibration.json",  # env: CAMERA_CALIBRATION_FILE
+    "cell_size": 5.0,            # site-plane metres per grid cell
+    "time_bucket": 0.5,          # seconds per time bucket
+    "merge_distance": 5.0,       # max distance to treat two detections as one object
+    "object_ttl": 2.0            # seconds an object is remembered
+}
+
+# File: logic/track_state.py
+TRACK_STATE_CONFIG = {
+    "alert_cooldown": 30.0,      # env: ALERT_COOLDOWN - seconds between repeat triggers per object
+    "track_ttl": 60.0,           # env: TRACK_TTL - seconds before an unseen track is forgotten
+    "max_tracks": 10000,         # env: MAX_TRACKS - bound on remembered tracks
+    "track_cell_size": 64,       # pixels per cell when no track id and no associator is available
+    "association_gate": 160.0,   # env: TRACK_ASSOCIATION_GATE - px an untracked box may move between sightings
+    "association_ttl": 2.0       # env: TRACK_ASSOCIATION_TTL - seconds unseen before an untracked box is a new object
+}
+
+# File: logic/threat_engine.py (trigger coalescing)
+TRIGGER_BATCH_CONFIG = {
+    "window": 0.1,               # env: TRIGGER_BATCH_WINDOW - MEDIUM/LOW lane batch window (HIGH never waits)
+    "max_batch": 16              # env: TRIGGER_BATCH_SIZE - flush early at this many triggers
+}
+
+TRIGGER_DISPATCH_CONFIG = {
+    "workers": 4,                # env: DISPATCH_WORKERS - concurrent sends (0 = send on the detector thread)
+    "capacity": 256,             # env: DISPATCH_CAPACITY - queued triggers before the oldest low-priority one is shed (HIGH overflow is spooled, never shed)
+    "concurrency": {             # max concurrent sends per lane
+        "HIGH": 4,               # env: DISPATCH_HIGH_CONCURRENCY
+        "MEDIUM": 2,             # env: DISPATCH_MEDIUM_CONCURRENCY
+        "LOW": 1                 # env: DISPATCH_LOW_CONCURRENCY
+    }
+}
+
+ENGINE_STATS_CONFIG = {
+    "interval": 60.0,            # env: ENGINE_STATS_INTERVAL - seconds between "[ENGINE-STATS] {json}" log lines (0 = disabled)
+    "contents": "tracks, dispatch lanes (queue wait avg/p95/max, batches, shed, spooled), delivery (breaker, spool), transport, dedup, fusion"
+}
+
+# File: logic/trigger_delivery.py
+TRIGGER_DELIVERY_CONFIG = {
+    "breaker_failure_threshold": 3,   # env: BREAKER_FAILURE_THRESHOLD - failures before failing fast
+    "breaker_reset_timeout": 10.0,    # env: BREAKER_RESET_TIMEOUT - seconds before a half-open probe
+    "spool_file": "threat_logs/trigger_spool.jsonl"  # env: TRIGGER_SPOOL_FILE
 }
 
 # ==============================================================================
@@ -64,6 +178,37 @@ FLASK_CONFIG = {
     "json_sort_keys": False,
 }
 
+# File: backend/countermeasures.py
+COUNTERMEASURE_CONFIG = {
+    "workers": 2,                # env: COUNTERMEASURE_WORKERS - concurrent jammer / alert jobs
+    "max_jobs": 1000,            # env: MAX_COUNTERMEASURE_JOBS - job records kept for /api/jobs/<id>
+    "flow": "/api/trigger logs the threat, queues a job and returns 202 + job_id",
+    "max_ingest_batch": 5000,    # env: MAX_INGEST_BATCH - detections per POST /api/detections/batch
+    "ingest": "/api/detections/batch logs every detection in one transaction; MEDIUM/HIGH ones form one job"
+}
+
+# File: backend/threat_store.py
+THREAT_STORE_CONFIG = {
+    "db_file": "threat_logs/threats.db",  # env: THREAT_DB_FILE - SQLite database (WAL mode)
+    "write_batch_size": 512,     # queued writes committed per transaction at most (single writer thread)
+    "indexes": ["timestamp_s", "level", "class_name", "camera_id", "zone"],
+    "page_size": 100,            # env: THREAT_LOG_PAGE_SIZE - default GET /api/threat-log page
+    "max_page_size": 500,        # env: THREAT_LOG_MAX_PAGE_SIZE - hard cap on ?limit=
+    "query": "?cursor=&limit=&since=&until=&level=&class=&camera=&zone=&fields= (keyset on id, newest first)"
+}
+
+# File: backend/event_bus.py (served by backend/app.py at GET /api/events)
+EVENT_STREAM_CONFIG = {
+    "transport": "Server-Sent Events (text/event-stream)",
+    "events": ["status", "threat", "job", "reset"],  # status = changed /api/status sections only
+    "history": 1000,             # env: EVENT_HISTORY - events kept for Last-Event-ID resume
+    "poll_interval": 0.25,       # env: EVENT_POLL_INTERVAL - seconds between reads of the shared event table
+    "status_push_interval": 2.0, # env: STATUS_PUSH_INTERVAL - seconds between status delta checks
+    "heartbeat": 15.0,           # env: EVENT_STREAM_HEARTBEAT - keep-alive comment on idle streams
+    "resume": "Last-Event-ID header or ?last_event_id= on any worker (reset event when the history no longer covers it)",
+    "gunicorn": "--worker-class gthread --threads 16 (one thread per open stream)"
+}
+
 # File: backend/jammer_sim.py
 JAMMER_CONFIG = {
     "simulation_only": True,    # Always simulation, no real RF
@@ -141,9 +286,9 @@ THREAT_RESPONSE_PIPELINE = {
     
     "Phase 3": {
         "action": "Log incident",
-        "module": "backend.app",
-        "function": "threat_log.append(entry)",
-        "retention": "In-memory (session duration)"
+        "module": "backend.threat_store",
+        "function": "ThreatStore.append(entries)",
+        "retention": "SQLite (WAL) database, shared by all backend workers"
     }
 }
 
@@ -206,15 +351,19 @@ LOGGING_CONFIG = {
 
 API_RESPONSES = {
     "200": "OK - Request successful",
+    "202": "Accepted - Countermeasure queued (poll /api/jobs/<job_id>)",
     "400": "Bad Request - Invalid payload",
     "404": "Not Found - Endpoint doesn't exist",
+    "413": "Payload Too Large - Detection batch exceeds MAX_INGEST_BATCH",
     "500": "Internal Server Error - Server error",
 }
 
 THREAT_RESPONSE_CODES = {
     "success": 200,
+    "accepted": 202,
     "bad_request": 400,
     "not_found": 404,
+    "payload_too_large": 413,
     "server_error": 500
 }
 
@@ -336,7 +336,7 @@ Step 3: Response
         ↓
     ├─ backend/jammer_sim.py (activate_jammer)
     ├─ backend/email_alert.py (send_alert)
-    └─ Local threat_log.append()
+    └─ backend/threat_store.py (SQLite threat log)
         ↓
     JSON Response: 200 OK
 
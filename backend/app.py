@@ -2,20 +2,29 @@
 Flask Backend API for AeroGuard AI
 Provides REST endpoints for threat handling and countermeasure activation
 Implements ACT phase of SEE-THINK-ACT pipeline
+Pushes threats, job progress and status changes to dashboards over Server-Sent Events
 """
 
+import os
 import sys
+import math
+import time
+import threading
 from pathlib import Path
 import logging
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 
 # Add parent directory to path for relative imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from jammer_sim import activate_jammer, deactivate_jammer, get_jammer_status
-from email_alert import send_alert, get_alert_stats
+from jammer_sim import deactivate_jammer, get_jammer_status
+from email_alert import get_alert_stats
+from countermeasures import countermeasure_service, validate_detections, MAX_INGEST_BATCH
+from threat_store import MAX_PAGE_SIZE
+from event_bus import event_bus, format_event, EVENT_STATUS, EVENT_RESET
+from logic.wire_format import decode_trigger, WireFormatError, WIRE_FORMATS, CONTENT_TYPE_BINARY
 
 # Setup logging
 logging.basicConfig(
@@ -40,9 +49,26 @@ CORS(app, resources={r"/api/*": {"origins": "*"}})
 
 app.config['JSON_SORT_KEYS'] = False
 
-# Global state for threat tracking
-threat_log = []
+# Co-located deployment: run the detector in this process and deliver triggers in-process
+EMBED_DETECTOR = os.getenv("EMBED_DETECTOR", "false").lower() == "true"
+DETECTOR_SOURCE = os.getenv("DETECTOR_SOURCE", "0")
 
+# Threat log page size for GET /api/threat-log (?limit= is capped at THREAT_LOG_MAX_PAGE_SIZE)
+THREAT_LOG_PAGE_SIZE = int(os.getenv("THREAT_LOG_PAGE_SIZE", 100))
+THREAT_LOG_MAX_PAGE_SIZE = int(os.getenv("THREAT_LOG_MAX_PAGE_SIZE", MAX_PAGE_SIZE))
+
+# Event stream (GET /api/events)
+STATUS_PUSH_INTERVAL = float(os.getenv("STATUS_PUSH_INTERVAL", 2.0))        # seconds between status delta checks
+EVENT_STREAM_HEARTBEAT = float(os.getenv("EVENT_STREAM_HEARTBEAT", 15.0))   # keep-alive comment on idle streams
+EVENT_STREAM_RETRY_MS = 3000                                                # client reconnect delay hint
+
+# Query parameter -> threat store filter column
+THREAT_LOG_FILTERS = {
+    "level": "level",
+    "class": "class_name",
+    "camera": "camera_id",
+    "zone": "zone"
+}
 
 # ============================================================================
 # FRONTEND ROUTES (Serve React app)
@@ -97,10 +123,26 @@ def health_check():
         "status": "operational",
         "service": "AeroGuard AI Backend",
         "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "wire_formats": list(WIRE_FORMATS)
     }), 200
 
 
+def read_payload():
+    """
+    Parse the request body: binary wire format or JSON
+    
+    Returns:
+        Parsed payload (None if empty)
+    
+    Raises:
+        WireFormatError: If a binary body is malformed
+    """
+    if request.mimetype == CONTENT_TYPE_BINARY:
+        return decode_trigger(request.get_data())
+    return request.get_json(silent=True)
+
+
 @app.route('/api/trigger', methods=['POST'])
 def trigger_response():
     """
@@ -118,6 +160,15 @@ def trigger_response():
         }
     }
     
+    Batched triggers send "detections": [ {...}, ... ] instead of "detection";
+    the whole batch is handled as a single countermeasure decision.
+    
+    The same payload may be sent in the compact binary format with
+    Content-Type: application/x-aeroguard-trigger (see logic/wire_format.py).
+    
+    A confirmed threat is logged and answered with 202 and a job id at once;
+    poll /api/jobs/<job_id> for the jammer and notification steps.
+    
     Returns:
         JSON: Response status and details
     """
@@ -127,8 +178,15 @@ def trigger_response():
     logger.info("="*70)
     
     try:
-        # Parse request payload
-        data = request.json
+        # Parse request payload (binary wire format or JSON)
+        try:
+            data = read_payload()
+        except WireFormatError as e:
+            logger.warning(f"Invalid binary trigger: {str(e)}")
+            return jsonify({
+                "status": "error",
+                "message": str(e)
+            }), 400
         
         if not data:
             logger.warning("Empty request payload")
@@ -137,81 +195,180 @@ def trigger_response():
                 "message": "Empty payload"
             }), 400
         
+        if not isinstance(data, dict):
+            return jsonify({
+                "status": "error",
+                "message": "Expected a JSON object"
+            }), 400
+        
         threat_detected = data.get("threat_detected", False)
-        detection = data.get("detection", {})
-        timestamp = datetime.now().isoformat()
+        detections = data.get("detections") or ([data["detection"]] if "detection" in data else [])
+        if not isinstance(threat_detected, bool) or not isinstance(detections, list):
+            return jsonify({
+                "status": "error",
+                "message": "threat_detected must be a boolean and detections an array"
+            }), 400
         
-        logger.info(f"Threat detected: {threat_detected}")
-        logger.info(f"Detection class: {detection.get('class_name', 'Unknown')}")
-        logger.info(f"Confidence: {detection.get('confidence', 0):.2%}")
+        valid, rejected = validate_detections(detections)
+        if rejected or (threat_detected and not valid):
+            return jsonify({
+                "status": "error",
+                "message": "Invalid detections" if rejected else "A confirmed threat needs a detection",
+                "rejected": rejected
+            }), 400
         
-        if threat_detected:
-            # Log threat
-            threat_entry = {
-                "timestamp": timestamp,
-                "detection": detection,
-                "action": "COUNTERMEASURE_ACTIVATED"
-            }
-            threat_log.append(threat_entry)
-            
-            logger.info("="*70)
-            logger.info("INITIATING COUNTERMEASURE SEQUENCE")
-            logger.info("="*70)
-            
-            # Phase 1: Activate jammer
-            logger.info("[PHASE 1] Activating anti-drone jammer...")
-            try:
-                activate_jammer()
-                logger.info("[PHASE 1] ✓ Jammer activation complete")
-            except Exception as e:
-                logger.error(f"[PHASE 1] ✗ Jammer activation failed: {str(e)}")
-            
-            # Phase 2: Send alert
-            logger.info("[PHASE 2] Sending threat notification...")
-            try:
-                logger.info("[PHASE 2] Calling send_alert function...")
-                email_sent = send_alert(detection)
-                logger.info(f"[PHASE 2] send_alert returned: {email_sent}")
-                if email_sent:
-                    logger.info("[PHASE 2] ✓ Email alert sent")
-                else:
-                    logger.warning("[PHASE 2] ✗ Email alert delivery failed - check logs above for details")
-            except Exception as e:
-                logger.error(f"[PHASE 2] ✗ Email service error: {str(e)}")
-                import traceback
-                logger.error(f"   Traceback: {traceback.format_exc()}")
-            
-            logger.info("="*70)
-            logger.info("COUNTERMEASURE SEQUENCE COMPLETE")
-            logger.info("="*70)
-            
+        # Record the threat and queue the countermeasure - jammer and alert run on the worker pool
+        response, queued = countermeasure_service.submit(detections, threat_detected)
+        return jsonify(response), 202 if queued else 200
+    
+    except Exception as e:
+        logger.error(f"Error processing threat response: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"Internal server error: {str(e)}"
+        }), 500
+
+
+@app.route('/api/detections/batch', methods=['POST'])
+def ingest_detections():
+    """
+    Bulk detection ingest for detector nodes (any number of cameras per request)
+    
+    Expected JSON payload: {"detections": [ {...}, ... ]} or a bare array;
+    or the binary wire format (Content-Type: application/x-aeroguard-trigger).
+    Each detection needs a confidence (0-1); bbox, class_name, camera_id, zone,
+    threat_level, ... are optional.
+    
+    All valid detections are logged in one transaction. Those the threat rules
+    classify MEDIUM/HIGH (or labelled so by the node) form one queued
+    countermeasure job. Invalid detections are skipped and listed in "rejected".
+    
+    Returns:
+        JSON: Ingest counts, job id when a countermeasure was queued (202), rejected entries
+    """
+    try:
+        try:
+            data = read_payload()
+        except WireFormatError as e:
             return jsonify({
-                "status": "success",
-                "message": "Threat response activated",
-                "actions": {
-                    "jammer": "ACTIVATED",
-                    "email_alert": "SENT"
-                },
-                "threat_entry": threat_entry,
-                "timestamp": timestamp
-            }), 200
+                "status": "error",
+                "message": str(e)
+            }), 400
         
-        else:
-            logger.info("No threat detected - monitoring only")
+        detections = data.get("detections") if isinstance(data, dict) else data
+        if not isinstance(detections, list) or not detections:
             return jsonify({
-                "status": "success",
-                "message": "No action required",
-                "timestamp": timestamp
-            }), 200
+                "status": "error",
+                "message": "Expected a non-empty detections array"
+            }), 400
+        if len(detections) > MAX_INGEST_BATCH:
+            return jsonify({
+                "status": "error",
+                "message": f"Batch of {len(detections)} exceeds MAX_INGEST_BATCH ({MAX_INGEST_BATCH})"
+            }), 413
+        
+        valid, rejected = validate_detections(detections)
+        if not valid:
+            return jsonify({
+                "status": "error",
+                "message": "No valid detections",
+                "rejected": rejected
+            }), 400
+        
+        response, queued = countermeasure_service.ingest(valid)
+        response["rejected"] = rejected
+        return jsonify(response), 202 if queued else 200
     
     except Exception as e:
-        logger.error(f"Error processing threat response: {str(e)}")
+        logger.error(f"Error ingesting detections: {str(e)}")
         return jsonify({
             "status": "error",
             "message": f"Internal server error: {str(e)}"
         }), 500
 
 
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Get the status of a queued countermeasure
+    
+    Returns:
+        JSON: Job status and per-step results (jammer, email_alert)
+    """
+    job = countermeasure_service.get_job(job_id)
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown job: {job_id}"
+        }), 404
+    return jsonify(job), 200
+
+
+def collect_status() -> dict:
+    """
+    Current jammer, alert, threat log and job status (the /api/status body
+    and the sections pushed as status deltas)
+    """
+    return {
+        "jammer": get_jammer_status(),
+        "email_service": get_alert_stats(),
+        "threats_logged": countermeasure_service.store.count(),
+        "countermeasure_jobs": countermeasure_service.get_job_stats(),
+        **countermeasure_service.rolling_stats()
+    }
+
+
+class StatusPublisher:
+    """
+    Publishes status deltas on the event bus (to this worker's streams - the status is per worker)
+    One background thread compares the status with the last one published and
+    sends only the sections that changed, however many dashboards are connected
+    """
+    
+    def __init__(self, interval=STATUS_PUSH_INTERVAL):
+        """
+        Initialize status publisher
+        
+        Args:
+            interval (float): Seconds between checks
+        """
+        self.interval = interval
+        self.last = {}
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def start(self):
+        """Start the background thread (once, when the first dashboard subscribes)"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="status-publisher", daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.publish_changes()
+            except Exception as e:
+                logger.error(f"Status push failed: {str(e)}")
+    
+    def publish_changes(self):
+        """Publish the status sections that changed since the last push (if anyone listens)"""
+        if not event_bus.subscribers:
+            return
+        status = collect_status()
+        with self._lock:
+            delta = {key: value for key, value in status.items() if self.last.get(key) != value}
+            self.last = status
+            if delta:
+                delta["timestamp"] = datetime.now().isoformat()
+                event_bus.publish_local(EVENT_STATUS, delta)
+
+
+# Global status publisher instance
+status_publisher = StatusPublisher()
+
+
 @app.route('/api/status', methods=['GET'])
 def get_status():
     """
@@ -222,15 +379,11 @@ def get_status():
         JSON: System status information
     """
     try:
-        jammer_status = get_jammer_status()
-        email_stats = get_alert_stats()
-        
         return jsonify({
             "status": "operational",
             "timestamp": datetime.now().isoformat(),
-            "jammer": jammer_status,
-            "email_service": email_stats,
-            "threats_logged": len(threat_log)
+            **collect_status(),
+            "event_stream": event_bus.get_stats()
         }), 200
     
     except Exception as e:
@@ -241,20 +394,88 @@ def get_status():
         }), 500
 
 
+def split_param(value: str, upper=False) -> list:
+    """Split a comma-separated query parameter into non-empty values"""
+    values = [v.strip() for v in value.split(",") if v.strip()]
+    return [v.upper() for v in values] if upper else values
+
+
+def parse_time_param(value):
+    """
+    Parse a time query parameter
+    
+    Args:
+        value (str): ISO 8601 timestamp or epoch seconds (None = not given)
+    
+    Returns:
+        float: Epoch seconds, or None
+    
+    Raises:
+        ValueError: If the value is neither format, or not a finite time
+    """
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+    if not math.isfinite(seconds):
+        raise ValueError(f"time must be finite, got {value}")
+    return seconds
+
+
 @app.route('/api/threat-log', methods=['GET'])
 def get_threat_log():
     """
-    Get threat detection log
-    Returns all logged threats since service start
+    Get threat detection log, newest first, one page at a time
+    
+    Query parameters (all optional):
+        limit     page size (default THREAT_LOG_PAGE_SIZE, capped at THREAT_LOG_MAX_PAGE_SIZE)
+        cursor    next_cursor from the previous page
+        since     earliest time (ISO 8601 or epoch seconds)
+        until     latest time, exclusive (ISO 8601 or epoch seconds)
+        level, class, camera, zone   comma-separated accepted values
+        fields    comma-separated fields to return, e.g. timestamp,class_name,confidence
+                  ("detection" returns the whole detection)
     
     Returns:
-        JSON: Array of threat entries
+        JSON: Page of threat entries, next_cursor (null on the last page) and the total count
     """
     try:
+        args = request.args
+        try:
+            limit = min(int(args.get("limit", THREAT_LOG_PAGE_SIZE)), THREAT_LOG_MAX_PAGE_SIZE)
+            cursor = int(args["cursor"]) if "cursor" in args else None
+            since = parse_time_param(args.get("since"))
+            until = parse_time_param(args.get("until"))
+        except ValueError as e:
+            return jsonify({
+                "status": "error",
+                "message": f"Invalid query parameter: {str(e)}"
+            }), 400
+        
+        filters = {
+            column: split_param(args[name], upper=(name == "level"))
+            for name, column in THREAT_LOG_FILTERS.items()
+            if name in args
+        }
+        fields = set(split_param(args["fields"])) if "fields" in args else None
+        
+        store = countermeasure_service.store
+        threats, next_cursor = store.query(
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            filters=filters,
+            fields=fields
+        )
         return jsonify({
             "status": "success",
-            "threat_count": len(threat_log),
-            "threats": threat_log,
+            "threat_count": store.count(),
+            "threats": threats,
+            "count": len(threats),
+            "next_cursor": next_cursor,
             "timestamp": datetime.now().isoformat()
         }), 200
     
@@ -275,11 +496,9 @@ def clear_threat_log():
     Returns:
         JSON: Confirmation message
     """
-    global threat_log
-    
     try:
-        count = len(threat_log)
-        threat_log = []
+        count = countermeasure_service.clear_log()
+        status_publisher.publish_changes()
         
         logger.info(f"Threat log cleared ({count} entries removed)")
         
@@ -297,6 +516,79 @@ def clear_threat_log():
         }), 500
 
 
+def stream_events(last_event_id):
+    """
+    Generate the SSE stream for one dashboard
+    
+    Args:
+        last_event_id (int): Last event the client received (None on a fresh connect)
+    
+    Yields:
+        bytes: SSE frames (frames published together are sent in one write)
+    """
+    after, local_after = event_bus.subscribe()
+    try:
+        yield f"retry: {EVENT_STREAM_RETRY_MS}\n\n".encode()
+        # Status frames are not resumable (they describe this worker): every connect starts with
+        # the full status, then only deltas; shared events resume from the client's last id
+        yield format_event(None, EVENT_STATUS, dict(collect_status(), timestamp=datetime.now().isoformat()))
+        if last_event_id is not None:
+            after = last_event_id
+        
+        while True:
+            frames, last_id, local_after = event_bus.read(after, local_after, timeout=EVENT_STREAM_HEARTBEAT)
+            if frames is None:
+                # Missed events are gone (history overrun or a new store): resync the client
+                logger.info(f"Event stream resync from event {after} to {last_id}")
+                yield format_event(None, EVENT_RESET, {"last_event_id": last_id})
+                yield format_event(None, EVENT_STATUS, dict(collect_status(), timestamp=datetime.now().isoformat()))
+            elif frames:
+                yield b"".join(frames)
+            else:
+                yield b": keep-alive\n\n"
+            after = last_id
+    finally:
+        event_bus.unsubscribe()
+
+
+@app.route('/api/events', methods=['GET'])
+def event_stream():
+    """
+    Server-Sent Events stream of threats, countermeasure jobs and status deltas
+    
+    Events:
+        status   changed /api/status sections (the full status on connect)
+        threat   new threat log entries of a trigger
+        job      countermeasure job state (queued, running, completed/failed)
+        reset    events since Last-Event-ID were lost - reload the threat log
+    
+    Reconnecting clients resume with the Last-Event-ID header (sent by
+    EventSource automatically) or ?last_event_id=. Threat and job events come
+    from the shared store, so a client may resume on any backend worker.
+    
+    Returns:
+        Response: text/event-stream
+    """
+    last_event_id = request.headers.get("Last-Event-ID", request.args.get("last_event_id"))
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "message": f"Invalid Last-Event-ID: {last_event_id}"
+        }), 400
+    
+    status_publisher.start()
+    return Response(
+        stream_events(last_event_id),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # disable proxy buffering (nginx)
+        }
+    )
+
+
 @app.route('/api/jammer/deactivate', methods=['POST'])
 def manual_deactivate():
     """
@@ -309,6 +601,7 @@ def manual_deactivate():
     try:
         logger.info("Manual jammer deactivation requested")
         deactivate_jammer()
+        status_publisher.publish_changes()
         
         return jsonify({
             "status": "success",
@@ -342,6 +635,28 @@ def internal_error(error):
     }), 500
 
 
+def start_embedded_detector(source=DETECTOR_SOURCE):
+    """
+    Run the headless detection pipeline on a background thread of this process
+    Triggers reach the countermeasure service through the in-process transport
+    
+    Args:
+        source (str): Video source (camera index or stream URL)
+    """
+    os.environ.setdefault("TRIGGER_TRANSPORT", "inprocess")
+    from vision.detect_live import run_detection_pipeline
+    
+    source = int(source) if str(source).isdigit() else source
+    thread = threading.Thread(
+        target=run_detection_pipeline,
+        kwargs={"source": source, "display": False},
+        name="embedded-detector",
+        daemon=True
+    )
+    thread.start()
+    logger.info(f"Embedded detector started on source {source} (in-process triggers)")
+
+
 def run_server(host='0.0.0.0', port=5000, debug=False):
     """
     Run Flask development server
@@ -364,7 +679,11 @@ def run_server(host='0.0.0.0', port=5000, debug=False):
         logger.warning(f"⚠️  Frontend build not found at {FRONTEND_BUILD}")
         logger.warning("Build frontend first: cd frontend && npm run build")
     
-    app.run(host=host, port=port, debug=debug)
+    if EMBED_DETECTOR:
+        start_embedded_detector()
+    
+    # The reloader would fork a second process (and a second detector)
+    app.run(host=host, port=port, debug=debug, use_reloader=debug and not EMBED_DETECTOR)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,481 @@
+"""
+Countermeasure Service for AeroGuard AI
+Handles confirmed threats: logs them, activates the jammer and sends the alert
+Shared by the Flask /api/trigger endpoint and the threat engine's in-process transport
+/api/trigger only records the threat and queues a job; a worker pool runs the
+jammer and notification steps so requests never wait on them
+Job records are kept in the shared store, so /api/jobs works from any backend worker
+New threats and job state changes are published on the event bus (dashboard SSE stream)
+/api/detections/batch ingests detections in bulk: all are logged in one transaction,
+only those crossing the countermeasure rules become threats and a queued job
+"""
+
+import os
+import sys
+import math
+import uuid
+import threading
+import logging
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+# Backend modules are imported by name (as when running backend/app.py)
+sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(1, str(Path(__file__).parent.parent))
+
+from jammer_sim import activate_jammer
+from email_alert import send_alert
+from threat_store import ThreatStore
+from event_bus import event_bus, EVENT_THREAT, EVENT_JOB
+from logic.rolling_stats import counts_snapshot, LEVEL_NAMES, WINDOWS
+from logic.rule_engine import DetectionColumns
+# Only the pure evaluator: importing logic.threat_engine would start a second trigger
+# spool replayer, dispatcher pool and HTTP session in every backend worker
+from logic.threat_evaluation import default_threat_evaluator, THREAT_API_TRIGGERED
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+COUNTERMEASURE_WORKERS = int(os.getenv("COUNTERMEASURE_WORKERS", 2))  # concurrent countermeasure jobs
+MAX_JOBS = int(os.getenv("MAX_COUNTERMEASURE_JOBS", 1000))           # job records kept for /api/jobs
+MAX_INGEST_BATCH = int(os.getenv("MAX_INGEST_BATCH", 5000))          # detections per /api/detections/batch request
+
+# Threat log actions
+ACTION_COUNTERMEASURE = "COUNTERMEASURE_ACTIVATED"
+ACTION_LOGGED = "DETECTION_LOGGED"
+
+# Job and step states
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+STEP_PENDING = "PENDING"
+
+# Threat evaluator for /api/detections/batch (see _get_evaluator)
+_threat_evaluator = None
+_evaluator_lock = threading.Lock()
+
+# Optional numeric detection fields: a finite number or null
+NUMERIC_FIELDS = ("threat_score", "smoothed_confidence", "track_age", "speed", "timestamp_s")
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _detection_error(detection):
+    if not isinstance(detection, dict):
+        return "detection must be an object"
+    confidence = detection.get("confidence")
+    if not _is_number(confidence) or not 0 <= confidence <= 1:
+        return "confidence must be a number between 0 and 1"
+    for field in NUMERIC_FIELDS:
+        if detection.get(field) is not None and not _is_number(detection[field]):
+            return f"{field} must be a finite number or null"
+    bbox = detection.get("bbox")
+    if bbox is not None and not (
+        isinstance(bbox, (list, tuple)) and len(bbox) == 4 and all(_is_number(v) for v in bbox)
+    ):
+        return "bbox must be [x1, y1, x2, y2]"
+    level = detection.get("threat_level")
+    if level is not None and level not in LEVEL_NAMES:
+        return f"unknown threat_level: {level}"
+    return None
+
+
+def validate_detections(detections: list) -> tuple:
+    """
+    Validate a batch of detections in one pass
+    
+    Args:
+        detections (list): Detection dicts
+    
+    Returns:
+        tuple: (valid detections, rejected [{"index", "error"}, ...])
+    """
+    valid = []
+    rejected = []
+    for index, detection in enumerate(detections):
+        error = _detection_error(detection)
+        if error is None:
+            valid.append(detection)
+        else:
+            rejected.append({"index": index, "error": error})
+    return valid, rejected
+
+
+def _get_evaluator():
+    # The running engine's (hot-reloaded) evaluator when it shares this process,
+    # else one built on first use from the same threshold and rule files
+    threat_engine = sys.modules.get("logic.threat_engine")
+    if threat_engine is not None:
+        return threat_engine.threat_evaluator
+    global _threat_evaluator
+    with _evaluator_lock:
+        if _threat_evaluator is None:
+            _threat_evaluator = default_threat_evaluator()
+        return _threat_evaluator
+
+
+def evaluate_detections(detections: list) -> tuple:
+    """
+    Threat level per detection, by the threat engine's thresholds and site rules
+    Detections already labelled by a detector node keep their threat_level
+    
+    Args:
+        detections (list): Validated detection dicts
+    
+    Returns:
+        tuple: (level index per detection (0=NONE ... 3=HIGH),
+                countermeasure flag per detection) as numpy arrays
+    """
+    evaluator = _get_evaluator()
+    
+    # Same score as evaluate_detection: kinematic score, else smoothed, else raw confidence
+    scores = [
+        next(v for v in (d.get("threat_score"), d.get("smoothed_confidence"), d["confidence"]) if v is not None)
+        for d in detections
+    ]
+    columns = DetectionColumns.from_dicts(detections) if evaluator.rules else None
+    levels = evaluator.evaluate_batch(scores, columns=columns)["level_index"]
+    
+    for index, detection in enumerate(detections):
+        if detection.get("threat_level") is not None:
+            levels[index] = LEVEL_NAMES.index(detection["threat_level"])
+    return levels, THREAT_API_TRIGGERED[levels]
+
+
+class CountermeasureService:
+    """
+    Executes the ACT phase for a trigger of one or more detections
+    Keeps the threat log and the countermeasure jobs queued by the trigger endpoint
+    (SQLite store), and the rolling threat counts served by the dashboard
+    """
+    
+    def __init__(self, workers=COUNTERMEASURE_WORKERS, max_jobs=MAX_JOBS, store=None):
+        """
+        Initialize countermeasure service
+        
+        Args:
+            workers (int): Worker threads running countermeasure jobs
+            max_jobs (int): Job records kept (oldest are dropped first)
+            store (ThreatStore): Threat log store (the default database if None)
+        """
+        self.store = store if store is not None else ThreatStore()
+        self._lock = threading.Lock()
+        
+        self.workers = workers
+        self.max_jobs = max_jobs
+        self._executor = None
+    
+    def record(self, detections: list, timestamp: str) -> list:
+        """
+        Add a trigger's detections to the threat log (which keeps the rolling counts)
+        
+        Args:
+            detections (list): Detection dicts
+            timestamp (str): Handling time (ISO format)
+        
+        Returns:
+            list: Threat log entries, one per detection
+        """
+        threat_entries = [
+            {
+                "timestamp": timestamp,
+                "detection": d,
+                "action": ACTION_COUNTERMEASURE
+            }
+            for d in detections
+        ]
+        self.store.append(threat_entries)
+        self._count_threats(detections, threat_entries, timestamp)
+        return threat_entries
+    
+    def _count_threats(self, detections: list, threat_entries: list, timestamp: str):
+        event_bus.publish(EVENT_THREAT, {"timestamp": timestamp, "threats": threat_entries})
+    
+    def execute(self, detection: dict, batch_size: int = 1, steps: dict = None) -> dict:
+        """
+        Run the countermeasure sequence: jammer, then notification
+        
+        Args:
+            detection (dict): Detection driving the alert
+            batch_size (int): Detections in the trigger
+            steps (dict): Step status dict updated as each step finishes (for job reporting)
+        
+        Returns:
+            dict: Step results {"jammer": ..., "email_alert": ...}
+        """
+        steps = steps if steps is not None else {}
+        
+        logger.info("="*70)
+        logger.info("INITIATING COUNTERMEASURE SEQUENCE")
+        logger.info("="*70)
+        
+        # Phase 1: Activate jammer
+        logger.info("[PHASE 1] Activating anti-drone jammer...")
+        try:
+            activate_jammer()
+            steps["jammer"] = "ACTIVATED"
+            logger.info("[PHASE 1] ✓ Jammer activation complete")
+        except Exception as e:
+            steps["jammer"] = "FAILED"
+            logger.error(f"[PHASE 1] ✗ Jammer activation failed: {str(e)}")
+        
+        # Phase 2: Send alert
+        logger.info("[PHASE 2] Sending threat notification...")
+        try:
+            logger.info("[PHASE 2] Calling send_alert function...")
+            email_sent = send_alert(dict(detection, batch_size=batch_size))
+            logger.info(f"[PHASE 2] send_alert returned: {email_sent}")
+            if email_sent:
+                steps["email_alert"] = "SENT"
+                logger.info("[PHASE 2] ✓ Email alert sent")
+            else:
+                steps["email_alert"] = "FAILED"
+                logger.warning("[PHASE 2] ✗ Email alert delivery failed - check logs above for details")
+        except Exception as e:
+            steps["email_alert"] = "FAILED"
+            logger.error(f"[PHASE 2] ✗ Email service error: {str(e)}")
+            import traceback
+            logger.error(f"   Traceback: {traceback.format_exc()}")
+        
+        logger.info("="*70)
+        logger.info("COUNTERMEASURE SEQUENCE COMPLETE")
+        logger.info("="*70)
+        return steps
+    
+    def _prepare(self, detections: list, threat_detected: bool):
+        detections = detections or [{}]
+        timestamp = datetime.now().isoformat()
+        
+        # Highest-confidence detection drives the alert for a batch
+        detection = max(detections, key=lambda d: d.get("confidence", 0))
+        
+        logger.info(f"Threat detected: {threat_detected}")
+        logger.info(f"Detections in trigger: {len(detections)}")
+        logger.info(f"Detection class: {detection.get('class_name', 'Unknown')}")
+        logger.info(f"Confidence: {detection.get('confidence', 0):.2%}")
+        if detection.get("smoothed_confidence") is not None:
+            logger.info(f"Smoothed confidence: {detection['smoothed_confidence']:.2%}")
+        return detections, detection, timestamp
+    
+    def _no_threat(self, timestamp: str) -> dict:
+        logger.info("No threat detected - monitoring only")
+        return {
+            "status": "success",
+            "message": "No action required",
+            "timestamp": timestamp
+        }
+    
+    def handle(self, detections: list, threat_detected=True) -> dict:
+        """
+        Handle a trigger as a single countermeasure decision, on the calling thread
+        
+        Args:
+            detections (list): Detection dicts (a batch or a single detection)
+            threat_detected (bool): Whether the engine confirmed a threat
+        
+        Returns:
+            dict: Response body (status, message, actions, threat_entry, ...)
+        """
+        detections, detection, timestamp = self._prepare(detections, threat_detected)
+        if not threat_detected:
+            return self._no_threat(timestamp)
+        
+        threat_entries = self.record(detections, timestamp)
+        actions = self.execute(detection, len(detections))
+        
+        return {
+            "status": "success",
+            "message": "Threat response activated",
+            "actions": actions,
+            "threat_entry": threat_entries[detections.index(detection)],
+            "threats_handled": len(threat_entries),
+            "timestamp": timestamp
+        }
+    
+    def submit(self, detections: list, threat_detected=True) -> tuple:
+        """
+        Record a trigger and queue its countermeasure sequence on the worker pool
+        
+        Args:
+            detections (list): Detection dicts (a batch or a single detection)
+            threat_detected (bool): Whether the engine confirmed a threat
+        
+        Returns:
+            tuple: (response body, job queued?) - the body carries the job id
+        """
+        detections, detection, timestamp = self._prepare(detections, threat_detected)
+        if not threat_detected:
+            return self._no_threat(timestamp), False
+        
+        threat_entries = self.record(detections, timestamp)
+        job = self._enqueue(detections, detection, timestamp)
+        
+        return {
+            "status": "accepted",
+            "message": "Countermeasure queued",
+            "job_id": job["job_id"],
+            "job_url": f"/api/jobs/{job['job_id']}",
+            "threat_entry": threat_entries[detections.index(detection)],
+            "threats_handled": len(threat_entries),
+            "timestamp": timestamp
+        }, True
+    
+    def ingest(self, detections: list) -> tuple:
+        """
+        Log a bulk batch of validated detections and queue a countermeasure for the threats
+        
+        Every detection is written to the threat log in one append (one transaction).
+        Only those whose level calls for a countermeasure (MEDIUM/HIGH) count as threats; together
+        they form a single countermeasure job, like a batched /api/trigger.
+        
+        Args:
+            detections (list): Validated detection dicts (see validate_detections)
+        
+        Returns:
+            tuple: (response body, job queued?)
+        """
+        timestamp = datetime.now().isoformat()
+        levels, triggered = evaluate_detections(detections)
+        
+        entries = []
+        threats = []
+        threat_entries = []
+        for d, level, is_threat in zip(detections, levels.tolist(), triggered.tolist()):
+            if d.get("threat_level") is None:
+                d = dict(d, threat_level=LEVEL_NAMES[level])
+            entry = {
+                "timestamp": timestamp,
+                "detection": d,
+                "action": ACTION_COUNTERMEASURE if is_threat else ACTION_LOGGED
+            }
+            entries.append(entry)
+            if is_threat:
+                threats.append(d)
+                threat_entries.append(entry)
+        self.store.append(entries)
+        
+        logger.info(f"Ingested {len(entries)} detection(s), {len(threats)} threat(s)")
+        response = {
+            "status": "success",
+            "message": "No action required",
+            "ingested": len(entries),
+            "threats_handled": len(threats),
+            "timestamp": timestamp
+        }
+        if not threats:
+            return response, False
+        
+        self._count_threats(threats, threat_entries, timestamp)
+        job = self._enqueue(threats, max(threats, key=lambda d: d["confidence"]), timestamp)
+        response.update({
+            "status": "accepted",
+            "message": "Countermeasure queued",
+            "job_id": job["job_id"],
+            "job_url": f"/api/jobs/{job['job_id']}"
+        })
+        return response, True
+    
+    def _enqueue(self, detections: list, detection: dict, timestamp: str) -> dict:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "status": JOB_QUEUED,
+            "created": timestamp,
+            "started": None,
+            "finished": None,
+            "threats": len(detections),
+            "steps": {"jammer": STEP_PENDING, "email_alert": STEP_PENDING}
+        }
+        # Committed before the job id is returned, so a poll on any worker finds it
+        self.store.save_job(job, self.max_jobs, wait=True)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="countermeasure")
+        self._publish_job(job)
+        self._executor.submit(self._run_job, job, detection, len(detections))
+        logger.info(f"Countermeasure job {job['job_id']} queued")
+        return job
+    
+    def _run_job(self, job: dict, detection: dict, batch_size: int):
+        job["status"] = JOB_RUNNING
+        job["started"] = datetime.now().isoformat()
+        self._save_job(job)
+        try:
+            self.execute(detection, batch_size, steps=job["steps"])
+            job["status"] = JOB_FAILED if "FAILED" in job["steps"].values() else JOB_COMPLETED
+        except Exception as e:
+            job["status"] = JOB_FAILED
+            logger.error(f"Countermeasure job {job['job_id']} failed: {str(e)}")
+        job["finished"] = datetime.now().isoformat()
+        self._save_job(job)
+    
+    def _save_job(self, job: dict):
+        self.store.save_job(job, self.max_jobs)
+        self._publish_job(job)
+    
+    def _publish_job(self, job: dict):
+        event_bus.publish(EVENT_JOB, dict(job, steps=dict(job["steps"])))
+    
+    def get_job(self, job_id: str):
+        """
+        Get a countermeasure job's status
+        
+        Args:
+            job_id (str): Job id returned by submit
+        
+        Returns:
+            dict: Job status, or None if unknown
+        """
+        return self.store.get_job(job_id)
+    
+    def rolling_stats(self, now=None) -> dict:
+        """
+        Rolling counts per zone and level from the shared store (the same in every worker)
+        
+        Args:
+            now (float): Current time in seconds (defaults to now)
+        
+        Returns:
+            dict: "threat_stats" (countermeasure threats) and "detection_stats" (every logged
+                  detection: triggers and bulk ingests), each window name -> counts
+        """
+        threats = {}
+        detections = {}
+        for name, resolution, buckets in WINDOWS:
+            rows = self.store.rolling_counts(int(resolution), buckets, now)
+            threats[name] = (resolution * buckets, [(zone, level, count) for zone, level, flag, count in rows if flag])
+            detections[name] = (resolution * buckets, [(zone, level, count) for zone, level, flag, count in rows])
+        return {
+            "threat_stats": counts_snapshot(threats),
+            "detection_stats": counts_snapshot(detections)
+        }
+    
+    def get_job_stats(self) -> dict:
+        """
+        Count known jobs by status
+        
+        Returns:
+            dict: status -> job count
+        """
+        counts = dict.fromkeys((JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED), 0)
+        counts.update(self.store.job_counts())
+        return counts
+    
+    def clear_log(self) -> int:
+        """
+        Clear the threat log
+        
+        Returns:
+            int: Number of entries removed
+        """
+        return self.store.clear()
+
+
+# Global countermeasure service instance
+countermeasure_service = CountermeasureService()
+
+# Every worker publishes and streams dashboard events through the shared store
+event_bus.attach(countermeasure_service.store)
@@ -136,6 +136,12 @@ Detection Details:
 - Threat Level: {detection_data.get('threat_level', 'UNKNOWN')}
 - Location (BBox): {detection_data.get('bbox', 'N/A')}
 """
+                if detection_data.get('smoothed_confidence') is not None:
+                    text_body += f"- Smoothed Confidence: {detection_data['smoothed_confidence']:.2%}\n"
+                if detection_data.get('zone'):
+                    text_body += f"- Zone: {detection_data['zone']}\n"
+                if detection_data.get('batch_size', 1) > 1:
+                    text_body += f"- Detections in event: {detection_data['batch_size']}\n"
             
             text_body += """
 ACTION TAKEN:
@@ -154,8 +160,12 @@ This is an automated alert from AeroGuard AI
             confidence = detection_data.get('confidence', 0) if detection_data else 0
             threat_level = detection_data.get('threat_level', 'UNKNOWN') if detection_data else 'N/A'
             bbox = str(detection_data.get('bbox', 'N/A')) if detection_data else 'N/A'
+            zone = (detection_data.get('zone') or 'Outside zones') if detection_data else 'N/A'
             
             confidence_str = f"{confidence:.2%}" if isinstance(confidence, (int, float)) else 'N/A'
+            smoothed = detection_data.get('smoothed_confidence') if detection_data else None
+            if isinstance(smoothed, (int, float)):
+                confidence_str += f" (smoothed {smoothed:.2%})"
             
             # HTML version (more formatted)
             html_body = f"""
@@ -185,10 +195,14 @@ This is an automated alert from AeroGuard AI
           <td style="padding: 8px; font-weight: bold;">Threat Level:</td>
           <td style="padding: 8px;">{threat_level}</td>
         </tr>
-        <tr>
+        <tr style="border-bottom: 1px solid #ddd;">
           <td style="padding: 8px; font-weight: bold;">Location (BBox):</td>
           <td style="padding: 8px;">{bbox}</td>
         </tr>
+        <tr>
+          <td style="padding: 8px; font-weight: bold;">Zone:</td>
+          <td style="padding: 8px;">{zone}</td>
+        </tr>
       </table>
       
       <h3 style="color: #2e7d32;">Actions Taken:</h3>
@@ -0,0 +1,246 @@
+"""
+Event Bus for AeroGuard AI
+Publish/subscribe feeding the dashboard's Server-Sent Events stream
+Threat and job events are shared by every backend worker: they are written to the
+threat store's event table, which gets one id sequence for all processes. One poller
+thread per process reads new events into a history ring. Each event is serialized
+to its SSE frame once per process, and every subscriber reads the same bytes from
+the ring, so fan-out costs no re-encoding and no per-subscriber queue.
+The ring also serves resume: a client reconnecting with Last-Event-ID (to any
+worker) gets every event it missed, as long as the history still holds them
+Status frames describe the worker serving the stream, so they stay local and carry no id
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+EVENT_HISTORY = int(os.getenv("EVENT_HISTORY", 1000))                   # events kept for Last-Event-ID resume
+EVENT_POLL_INTERVAL = float(os.getenv("EVENT_POLL_INTERVAL", 0.25))     # seconds between shared event polls
+
+# Event types
+EVENT_THREAT = "threat"
+EVENT_JOB = "job"
+EVENT_STATUS = "status"
+EVENT_RESET = "reset"
+
+
+def format_event(event_id, event_type: str, data) -> bytes:
+    """
+    Encode one SSE frame
+    
+    Args:
+        event_id (int): Event id (None for frames that are not resumable)
+        event_type (str): SSE event name
+        data: JSON-serializable payload
+    
+    Returns:
+        bytes: "id: ...\\nevent: ...\\ndata: ...\\n\\n"
+    """
+    return _frame(event_id, event_type, encode_data(data))
+
+
+def encode_data(data) -> str:
+    """Compact JSON payload (never contains a newline, so it is a single SSE data line)"""
+    return json.dumps(data, separators=(",", ":"), default=str)
+
+
+def _frame(event_id, event_type: str, payload: str) -> bytes:
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event_type}\ndata: {payload}\n\n".encode()
+
+
+def _newer(ring: deque, after: int) -> list:
+    # Frames with a sequence number above `after`, walked from the end of the ring
+    frames = []
+    for sequence, frame in reversed(ring):
+        if sequence <= after:
+            break
+        frames.append(frame)
+    return frames[::-1]
+
+
+class EventBus:
+    """
+    Sequence-numbered event rings with blocking reads
+    
+    Shared events are numbered by the store (the same ids in every worker);
+    local (status) frames by a per-process sequence. Subscribers remember the
+    last number of each they sent and call read() for everything newer.
+    Without a store attached, shared events are numbered in-process. Thread-safe.
+    """
+    
+    def __init__(self, history=EVENT_HISTORY, poll_interval=EVENT_POLL_INTERVAL):
+        """
+        Initialize event bus
+        
+        Args:
+            history (int): Events kept for resume (older ones are dropped first)
+            poll_interval (float): Seconds between reads of the shared event table
+        """
+        self.history = history
+        self.poll_interval = poll_interval
+        self.store = None
+        self.last_id = 0
+        self.local_id = 0
+        self.published = 0
+        self.subscribers = 0
+        self._frames = deque(maxlen=history)  # (event id, frame) of shared events
+        self._local = deque(maxlen=history)   # (sequence, frame) of this process's status frames
+        self._cond = threading.Condition()
+        self._poller = None
+    
+    def attach(self, store):
+        """
+        Share events through a threat store's event table
+        
+        Args:
+            store (ThreatStore): Store every backend worker opens
+        """
+        with self._cond:
+            self.store = store
+            self.last_id = store.last_event_id()
+    
+    def publish(self, event_type: str, data):
+        """
+        Publish an event to every worker's subscribers
+        
+        With a store attached the event is queued for its group commit and reaches
+        subscribers (in this and every other worker) on the next poll.
+        
+        Args:
+            event_type (str): SSE event name
+            data: JSON-serializable payload
+        """
+        payload = encode_data(data)
+        with self._cond:
+            self.published += 1
+            if self.store is not None:
+                self.store.append_event(event_type, payload, self.history)
+                return
+            self.last_id += 1
+            self._frames.append((self.last_id, _frame(self.last_id, event_type, payload)))
+            self._cond.notify_all()
+    
+    def publish_local(self, event_type: str, data):
+        """
+        Serialize a frame once for this process's subscribers only (no id, not resumable)
+        
+        Args:
+            event_type (str): SSE event name
+            data: JSON-serializable payload
+        """
+        frame = format_event(None, event_type, data)
+        with self._cond:
+            self.local_id += 1
+            self._local.append((self.local_id, frame))
+            self._cond.notify_all()
+    
+    def _poll(self):
+        while True:
+            time.sleep(self.poll_interval)
+            if not self.subscribers:
+                continue
+            try:
+                rows = self.store.events_after(self.last_id, self.history)
+            except Exception as e:
+                logger.error(f"[EVENT-BUS] Event poll failed: {str(e)}")
+                continue
+            if rows:
+                with self._cond:
+                    for event_id, event_type, payload in rows:
+                        if event_id > self.last_id:
+                            self._frames.append((event_id, _frame(event_id, event_type, payload)))
+                            self.last_id = event_id
+                    self._cond.notify_all()
+    
+    def _replay(self, after: int, last_id: int):
+        # Events this process never polled (it started later) may still be in the store
+        if self.store is None or last_id - after > self.history:
+            return None
+        rows = self.store.events_after(after, last_id - after)
+        if not rows or rows[0][0] != after + 1:
+            return None
+        return [_frame(event_id, event_type, payload) for event_id, event_type, payload in rows]
+    
+    def read(self, after: int, local_after: int, timeout=None) -> tuple:
+        """
+        Get the frames published after a subscriber's position, waiting for one if there are none
+        
+        Args:
+            after (int): Last shared event id the subscriber has
+            local_after (int): Last local frame number the subscriber has
+            timeout (float): Maximum seconds to wait (None = forever)
+        
+        Returns:
+            tuple: (frames, last event id, last local frame number) - frames is None
+                when events after `after` are no longer available (the subscriber must resync)
+        """
+        if after > self.last_id:
+            # Another worker may simply be ahead of this one's poller; an id the store never
+            # issued means the log was recreated - nothing to replay
+            known = self.store.last_event_id() if self.store is not None else self.last_id
+            if after > known:
+                return None, self.last_id, self.local_id
+        
+        with self._cond:
+            if after >= self.last_id and local_after >= self.local_id:
+                self._cond.wait(timeout)
+            last_id = self.last_id
+            local_id = self.local_id
+            frames = _newer(self._local, local_after)
+            if after >= last_id:
+                return frames, after, local_id
+            oldest = self._frames[0][0] if self._frames else last_id + 1
+            shared = _newer(self._frames, after) if oldest <= after + 1 else None
+        
+        if shared is None:
+            shared = self._replay(after, last_id)
+            if shared is None:
+                return None, last_id, local_id
+        return shared + frames, last_id, local_id
+    
+    def subscribe(self) -> tuple:
+        """
+        Register a subscriber
+        
+        Returns:
+            tuple: (last event id, last local frame number) - where a new subscriber starts
+        """
+        with self._cond:
+            self.subscribers += 1
+            if self.store is not None and self._poller is None:
+                self._poller = threading.Thread(target=self._poll, name="event-poller", daemon=True)
+                self._poller.start()
+            return self.last_id, self.local_id
+    
+    def unsubscribe(self):
+        """Unregister a subscriber"""
+        with self._cond:
+            self.subscribers -= 1
+    
+    def get_stats(self) -> dict:
+        """
+        Get bus statistics
+        
+        Returns:
+            dict: Subscribers, last event id, published and buffered event counts
+        """
+        with self._cond:
+            return {
+                "subscribers": self.subscribers,
+                "shared": self.store is not None,
+                "last_event_id": self.last_id,
+                "published": self.published,
+                "buffered": len(self._frames)
+            }
+
+
+# Global event bus instance (countermeasures attaches the shared store)
+event_bus = EventBus()
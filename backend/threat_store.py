@@ -0,0 +1,559 @@
+"""
+Threat Store for AeroGuard AI
+Durable, indexed threat log backed by SQLite in WAL mode
+One writer thread per process group-commits queued entries (many inserts, one
+transaction); readers use their own connections and never block the writer
+Shared by every backend worker process, so all of them serve the same log
+Countermeasure jobs and dashboard events live here too, so any worker can answer for a
+job another queued, and every worker's event stream carries the same events and ids
+Rolling counts per time bucket, zone and level are kept up to date on insert, so every
+worker's /api/status reports the same detection and threat statistics
+"""
+
+import os
+import json
+import math
+import time
+import queue
+import atexit
+import sqlite3
+import threading
+import logging
+from pathlib import Path
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+THREAT_DB_FILE = os.getenv(
+    "THREAT_DB_FILE",
+    str(Path(__file__).parent.parent / "threat_logs" / "threats.db")
+)
+WRITE_BATCH_SIZE = 512   # queued operations committed per transaction at most
+BUSY_TIMEOUT_MS = 5000   # wait for another process's write lock
+MAX_PAGE_SIZE = 500      # hard cap on entries per query
+# Rolling count buckets: bucket seconds -> buckets kept (the logic/rolling_stats.py windows)
+COUNT_BUCKETS = {1: 60, 60: 60, 3600: 24}
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS threats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT NOT NULL,
+        timestamp_s REAL NOT NULL,
+        level TEXT,
+        class_name TEXT,
+        camera_id TEXT,
+        zone TEXT,
+        confidence REAL,
+        action TEXT NOT NULL,
+        detection TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_threats_time ON threats (timestamp_s)",
+    "CREATE INDEX IF NOT EXISTS idx_threats_level ON threats (level, id)",
+    "CREATE INDEX IF NOT EXISTS idx_threats_class ON threats (class_name, id)",
+    "CREATE INDEX IF NOT EXISTS idx_threats_camera ON threats (camera_id, id)",
+    "CREATE INDEX IF NOT EXISTS idx_threats_zone ON threats (zone, id)",
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        job_id TEXT NOT NULL UNIQUE,
+        status TEXT NOT NULL,
+        created TEXT,
+        started TEXT,
+        finished TEXT,
+        threats INTEGER,
+        steps TEXT NOT NULL
+    )
+    """,
+    # Row count kept up to date on insert, so counting never scans the log
+    "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO counters (name, value) SELECT 'threats', COUNT(*) FROM threats",
+    """
+    CREATE TRIGGER IF NOT EXISTS threats_counted AFTER INSERT ON threats
+    BEGIN
+        UPDATE counters SET value = value + 1 WHERE name = 'threats';
+    END
+    """,
+    # Detections per time bucket, zone, level index and countermeasure flag, for rolling stats
+    """
+    CREATE TABLE IF NOT EXISTS threat_counts (
+        resolution INTEGER NOT NULL,
+        bucket INTEGER NOT NULL,
+        zone TEXT NOT NULL,
+        level INTEGER NOT NULL,
+        countermeasure INTEGER NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (resolution, bucket, zone, level, countermeasure)
+    ) WITHOUT ROWID
+    """,
+    # Unlabelled or unknown levels count as HIGH, like unlabelled triggers
+    f"""
+    CREATE TRIGGER IF NOT EXISTS threats_bucketed AFTER INSERT ON threats
+    BEGIN
+        INSERT INTO threat_counts (resolution, bucket, zone, level, countermeasure, count)
+        SELECT column1, CAST(NEW.timestamp_s / column1 AS INTEGER), COALESCE(NEW.zone, ''),
+               CASE NEW.level WHEN 'NONE' THEN 0 WHEN 'LOW' THEN 1 WHEN 'MEDIUM' THEN 2 ELSE 3 END,
+               NEW.action = 'COUNTERMEASURE_ACTIVATED', 1
+        FROM (VALUES {', '.join(f'({resolution})' for resolution in COUNT_BUCKETS)}) WHERE true
+        ON CONFLICT DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event TEXT NOT NULL,
+        data TEXT NOT NULL
+    )
+    """
+)
+
+# Statements are constants so each connection's statement cache keeps them prepared
+INSERT_SQL = (
+    "INSERT INTO threats (timestamp, timestamp_s, level, class_name, camera_id, zone, confidence, action, detection) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+DELETE_ALL_SQL = "DELETE FROM threats"
+RESET_COUNT_SQL = "UPDATE counters SET value = 0 WHERE name = 'threats'"
+COUNT_SQL = "SELECT value FROM counters WHERE name = 'threats'"
+DELETE_COUNTS_SQL = "DELETE FROM threat_counts"
+PRUNE_COUNTS_SQL = "DELETE FROM threat_counts WHERE resolution = ? AND bucket <= ?"
+ROLLING_COUNTS_SQL = (
+    "SELECT zone, level, countermeasure, SUM(count) FROM threat_counts "
+    "WHERE resolution = ? AND bucket > ? GROUP BY zone, level, countermeasure"
+)
+# Upsert keeps the row id, so pruning by id drops the oldest jobs first
+SAVE_JOB_SQL = (
+    "INSERT INTO jobs (job_id, status, created, started, finished, threats, steps) VALUES (?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (job_id) DO UPDATE SET status = excluded.status, started = excluded.started, "
+    "finished = excluded.finished, steps = excluded.steps"
+)
+PRUNE_JOBS_SQL = "DELETE FROM jobs WHERE id <= (SELECT MAX(id) FROM jobs) - ?"
+GET_JOB_SQL = "SELECT job_id, status, created, started, finished, threats, steps FROM jobs WHERE job_id = ?"
+JOB_COUNTS_SQL = "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+INSERT_EVENT_SQL = "INSERT INTO events (event, data) VALUES (?, ?)"
+PRUNE_EVENTS_SQL = "DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?"
+EVENTS_AFTER_SQL = "SELECT id, event, data FROM events WHERE id > ? ORDER BY id LIMIT ?"
+LAST_EVENT_ID_SQL = "SELECT COALESCE(MAX(id), 0) FROM events"
+JOB_FIELDS = ("job_id", "status", "created", "started", "finished", "threats", "steps")
+
+# Detection fields stored in their own (indexed) columns: filterable, and projectable
+# without decoding the detection JSON
+COLUMN_FIELDS = {
+    "threat_level": "level",
+    "class_name": "class_name",
+    "camera_id": "camera_id",
+    "zone": "zone",
+    "confidence": "confidence"
+}
+FILTER_COLUMNS = ("level", "class_name", "camera_id", "zone")
+ENTRY_FIELDS = ("id", "timestamp", "action")
+
+_INSERT = "insert"
+_CLEAR = "clear"
+_JOB = "job"
+_EVENT = "event"
+_FLUSH = "flush"
+_STOP = "stop"
+
+
+def _text(value):
+    # Indexed text columns take scalars only; anything else stays in the detection JSON
+    if isinstance(value, str) or value is None:
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return None
+
+
+def _real(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return float(value)
+    return None
+
+
+def _row(entry: dict) -> tuple:
+    detection = entry.get("detection")
+    if not isinstance(detection, dict):
+        detection = {}
+    timestamp = entry["timestamp"]
+    return (
+        timestamp,
+        datetime.fromisoformat(timestamp).timestamp(),
+        _text(detection.get("threat_level")),
+        _text(detection.get("class_name")),
+        _text(detection.get("camera_id")),
+        _text(detection.get("zone")),
+        _real(detection.get("confidence")),
+        str(entry.get("action", "COUNTERMEASURE_ACTIVATED")),
+        json.dumps(detection, default=str)
+    )
+
+
+def _entry(row) -> dict:
+    entry_id, timestamp, action, detection = row
+    return {
+        "id": entry_id,
+        "timestamp": timestamp,
+        "detection": json.loads(detection),
+        "action": action
+    }
+
+
+def _project(entry: dict, fields: set) -> dict:
+    projected = {name: entry[name] for name in ENTRY_FIELDS if name == "id" or name in fields}
+    detection_fields = fields.difference(ENTRY_FIELDS)
+    if "detection" in detection_fields:
+        # The detection itself was asked for - return the whole object
+        projected["detection"] = entry["detection"]
+    elif detection_fields:
+        detection = entry["detection"]
+        projected["detection"] = {name: detection[name] for name in detection_fields if name in detection}
+    return projected
+
+
+class ThreatStore:
+    """
+    SQLite threat log with a single group-committing writer thread
+    
+    append() only queues entries, so request handlers never wait on disk.
+    Entries become visible to readers once their batch commits (normally
+    within milliseconds); flush() waits for that when a caller needs it.
+    """
+    
+    def __init__(self, path=THREAT_DB_FILE, batch_size=WRITE_BATCH_SIZE):
+        """
+        Initialize threat store (creates the database and indexes if needed)
+        
+        Args:
+            path (str): SQLite database file
+            batch_size (int): Maximum queued operations per transaction
+        """
+        self.path = str(path)
+        self.batch_size = batch_size
+        
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connect()
+        with conn:
+            for statement in SCHEMA:
+                conn.execute(statement)
+        conn.close()
+        
+        self.committed = 0
+        self.transactions = 0
+        self.dropped = 0
+        
+        self._queue = queue.Queue()
+        self._local = threading.local()
+        self._writer = threading.Thread(target=self._run, name="threat-store-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        # NORMAL is crash-safe in WAL mode; only the last commits can be lost on power failure
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        return conn
+    
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+    
+    def _run(self):
+        conn = self._connect()
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            running = all(kind != _STOP for kind, data, result in batch)
+            try:
+                with conn:
+                    inserted = self._apply(conn, batch)
+                self.committed += inserted
+                self.transactions += 1
+            except Exception as e:
+                # One bad row must not cost the rest of the group commit: redo it row by row
+                logger.warning(f"[THREAT-STORE] Group commit failed ({str(e)}) - retrying rows individually")
+                self._apply_individually(conn, batch)
+            
+            for kind, data, result in batch:
+                if result is not None:
+                    result["done"].set()
+        conn.close()
+    
+    def _apply(self, conn, batch: list) -> int:
+        inserted = 0
+        for kind, data, result in batch:
+            if kind == _INSERT:
+                conn.executemany(INSERT_SQL, data)
+                inserted += len(data)
+            elif kind == _CLEAR:
+                result["deleted"] = conn.execute(DELETE_ALL_SQL).rowcount
+                conn.execute(RESET_COUNT_SQL)
+                conn.execute(DELETE_COUNTS_SQL)
+            elif kind == _JOB:
+                row, max_jobs = data
+                conn.execute(SAVE_JOB_SQL, row)
+                conn.execute(PRUNE_JOBS_SQL, (max_jobs,))
+            elif kind == _EVENT:
+                row, keep = data
+                conn.execute(INSERT_EVENT_SQL, row)
+                conn.execute(PRUNE_EVENTS_SQL, (keep,))
+        if inserted:
+            # Buckets that have left their window
+            now = time.time()
+            conn.executemany(PRUNE_COUNTS_SQL, [
+                (resolution, int(now // resolution) - buckets) for resolution, buckets in COUNT_BUCKETS.items()
+            ])
+        return inserted
+    
+    def _apply_individually(self, conn, batch: list):
+        for kind, data, result in batch:
+            # Inserts are retried one row at a time, other operations as they are
+            ops = [(kind, [row], result) for row in data] if kind == _INSERT else [(kind, data, result)]
+            for op in ops:
+                try:
+                    with conn:
+                        self.committed += self._apply(conn, [op])
+                    self.transactions += 1
+                except Exception as e:
+                    self.dropped += 1
+                    logger.error(f"[THREAT-STORE] Dropped {kind} that failed to store: {str(e)}")
+    
+    def _submit(self, kind: str, data=None, wait=False, timeout=None) -> dict:
+        result = {"done": threading.Event()} if wait else None
+        self._queue.put((kind, data, result))
+        if wait:
+            result["done"].wait(timeout)
+        return result
+    
+    def append(self, entries: list):
+        """
+        Queue threat log entries for the next group commit
+        
+        Args:
+            entries (list): {"timestamp", "detection", "action"} dicts
+        """
+        if entries:
+            self._submit(_INSERT, [_row(entry) for entry in entries])
+    
+    def save_job(self, job: dict, max_jobs: int, wait=False):
+        """
+        Insert or update a countermeasure job record
+        
+        Args:
+            job (dict): Job with JOB_FIELDS ("steps" is a dict)
+            max_jobs (int): Job records kept (oldest are dropped first)
+            wait (bool): Block until committed, so other workers can read it at once
+        """
+        row = tuple(job[name] for name in JOB_FIELDS[:-1]) + (json.dumps(job["steps"]),)
+        self._submit(_JOB, (row, max_jobs), wait=wait, timeout=BUSY_TIMEOUT_MS / 1000 if wait else None)
+    
+    def get_job(self, job_id: str):
+        """
+        Read a countermeasure job record
+        
+        Args:
+            job_id (str): Job id
+        
+        Returns:
+            dict: Job record, or None if unknown
+        """
+        row = self._reader().execute(GET_JOB_SQL, (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_FIELDS, row))
+        job["steps"] = json.loads(job["steps"])
+        return job
+    
+    def job_counts(self) -> dict:
+        """
+        Count job records by status
+        
+        Returns:
+            dict: status -> job count
+        """
+        return dict(self._reader().execute(JOB_COUNTS_SQL).fetchall())
+    
+    def append_event(self, event_type: str, data: str, keep: int):
+        """
+        Queue a dashboard event for the next group commit (its id is assigned on commit)
+        
+        Args:
+            event_type (str): SSE event name
+            data (str): Encoded JSON payload
+            keep (int): Events kept for resume (oldest are dropped first)
+        """
+        self._submit(_EVENT, ((event_type, data), keep))
+    
+    def events_after(self, after: int, limit: int) -> list:
+        """
+        Read committed events in id order
+        
+        Args:
+            after (int): Return events with a larger id
+            limit (int): Maximum events returned
+        
+        Returns:
+            list: (id, event type, encoded data) tuples
+        """
+        return self._reader().execute(EVENTS_AFTER_SQL, (after, limit)).fetchall()
+    
+    def last_event_id(self) -> int:
+        """
+        Id of the newest committed event
+        
+        Returns:
+            int: Event id (0 when there are none)
+        """
+        return self._reader().execute(LAST_EVENT_ID_SQL).fetchone()[0]
+    
+    def flush(self, timeout=5.0):
+        """
+        Wait until everything queued so far is committed
+        
+        Args:
+            timeout (float): Maximum seconds to wait
+        """
+        self._submit(_FLUSH, wait=True, timeout=timeout)
+    
+    def clear(self) -> int:
+        """
+        Delete every entry (after committing anything queued before)
+        
+        Returns:
+            int: Number of entries removed
+        """
+        result = self._submit(_CLEAR, wait=True)
+        return result.get("deleted", 0)
+    
+    def close(self):
+        """Commit queued entries and stop the writer thread"""
+        if self._writer.is_alive():
+            self._submit(_STOP)
+            self._writer.join()
+    
+    def count(self) -> int:
+        """
+        Number of stored threats (a maintained counter - no table scan)
+        
+        Returns:
+            int: Entry count
+        """
+        return self._reader().execute(COUNT_SQL).fetchone()[0]
+    
+    def rolling_counts(self, resolution: int, buckets: int, now=None) -> list:
+        """
+        Detection counts over the newest buckets of one resolution (an index range read)
+        
+        Args:
+            resolution (int): Bucket seconds (a COUNT_BUCKETS key)
+            buckets (int): Buckets in the window, including the one in progress
+            now (float): Current time in seconds (defaults to now)
+        
+        Returns:
+            list: (zone or "", level index, countermeasure (0/1), count) tuples
+        """
+        if now is None:
+            now = time.time()
+        oldest = int(now // resolution) - buckets
+        return self._reader().execute(ROLLING_COUNTS_SQL, (resolution, oldest)).fetchall()
+    
+    def query(self, limit=100, cursor=None, since=None, until=None, filters=None, fields=None) -> tuple:
+        """
+        Page through threats newest first using keyset pagination on id
+        
+        Every filter is an indexed column, so a page costs an index range scan
+        of about `limit` rows no matter how deep the cursor is.
+        
+        Args:
+            limit (int): Page size (capped at MAX_PAGE_SIZE)
+            cursor (int): Return entries older than this id (next_cursor of the previous page)
+            since (float): Earliest handling time (epoch seconds, inclusive)
+            until (float): Latest handling time (epoch seconds, exclusive)
+            filters (dict): Column ("level", "class_name", "camera_id", "zone") -> accepted values
+            fields (set): Entry fields to return ("timestamp", "action", "detection" or
+                detection fields; "id" is always included); None returns whole entries
+        
+        Returns:
+            tuple: (entries newest first, next_cursor or None when this is the last page)
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        clauses = []
+        params = []
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(int(cursor))
+        # Time bounds filter on the handling time itself: ids only follow it within one
+        # writer process, so several workers or a clock step would make id bounds skip rows
+        if since is not None:
+            clauses.append("timestamp_s >= ?")
+            params.append(float(since))
+        if until is not None:
+            clauses.append("timestamp_s < ?")
+            params.append(float(until))
+        for column in FILTER_COLUMNS:
+            values = (filters or {}).get(column)
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        
+        # Projections of column fields only skip decoding the detection JSON
+        columns_only = fields is not None and all(
+            name in ENTRY_FIELDS or name in COLUMN_FIELDS for name in fields
+        )
+        detection_fields = sorted(set(fields).difference(ENTRY_FIELDS)) if columns_only else []
+        select = ["id", "timestamp", "action"] + (
+            [COLUMN_FIELDS[name] for name in detection_fields] if columns_only else ["detection"]
+        )
+        
+        # Statement text depends only on which filters are set, so it is reused from the statement cache
+        sql = f"SELECT {', '.join(select)} FROM threats"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        rows = self._reader().execute(sql, params).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        if columns_only:
+            entries = []
+            for row in rows:
+                entry = {"id": row[0], "timestamp": row[1], "action": row[2]}
+                if detection_fields:
+                    entry["detection"] = dict(zip(detection_fields, row[3:]))
+                entries.append(_project(entry, set(fields)))
+        else:
+            entries = [_entry(row) for row in rows]
+            if fields is not None:
+                entries = [_project(entry, set(fields)) for entry in entries]
+        
+        next_cursor = rows[-1][0] if has_more else None
+        return entries, next_cursor
+    
+    def get_stats(self) -> dict:
+        """
+        Get store statistics
+        
+        Returns:
+            dict: Database path, queued operations, commit and dropped-row counters
+        """
+        return {
+            "path": self.path,
+            "pending_writes": self._queue.qsize(),
+            "committed": self.committed,
+            "transactions": self.transactions,
+            "dropped": self.dropped
+        }
@@ -0,0 +1,177 @@
+"""
+Trigger Latency Benchmark for AeroGuard AI
+Compares per-trigger latency of a fresh connection per request (requests.post)
+against the threat engine's pooled keep-alive session and the in-process transport
+Runs against a local stub backend so only client/transport cost is measured
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+import statistics
+import threading
+from pathlib import Path
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+# Add parent directory to path for relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from logic import threat_engine
+
+
+SAMPLE_DETECTION = {
+    "class_name": "drone",
+    "confidence": 0.93,
+    "bbox": [120, 80, 180, 140],
+    "timestamp": "2024-01-01T00:00:00",
+    "frame_id": 1
+}
+
+
+class StubBackendHandler(BaseHTTPRequestHandler):
+    """Minimal keep-alive backend answering every request with 200 JSON"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length:
+            self.rfile.read(length)
+        body = json.dumps({"status": "success"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = _respond
+    do_POST = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_backend(handler=StubBackendHandler):
+    """
+    Start the stub backend on a free local port
+
+    Args:
+        handler (type): Request handler class
+
+    Returns:
+        tuple: (server, base_url)
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def summarize(samples: list) -> dict:
+    """
+    Summarize latency samples (seconds) in milliseconds
+
+    Args:
+        samples (list): Latency samples in seconds
+
+    Returns:
+        dict: mean, p50, p95, p99 and max in milliseconds
+    """
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+    return {
+        "mean": statistics.fmean(ordered) * 1000,
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1] * 1000
+    }
+
+
+def bench_fresh_connection(url: str, iterations: int) -> list:
+    """Per-trigger latency with a new TCP connection per request (previous behaviour)"""
+    samples = []
+    payload = {"threat_detected": True, "detection": SAMPLE_DETECTION}
+    for _ in range(iterations):
+        start = time.perf_counter()
+        requests.post(url, json=payload, timeout=threat_engine.API_TIMEOUT)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_keepalive_session(url: str, iterations: int) -> list:
+    """Per-trigger latency through trigger_flask_api and the pooled session"""
+    threat_engine.warm_up_api_connection(url)
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        threat_engine.trigger_flask_api(SAMPLE_DETECTION, url=url)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+class _NullService:
+    """Countermeasure service stand-in that accepts every trigger"""
+
+    def handle(self, detections, threat_detected=True):
+        return {"status": "success"}
+
+
+def bench_inprocess_transport(iterations: int) -> list:
+    """Per-trigger latency of the in-process transport (direct service call)"""
+    transport = threat_engine.InProcessTransport(service=_NullService())
+    transport.warm_up()
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        transport.send([SAMPLE_DETECTION])
+        samples.append(time.perf_counter() - start)
+    transport.close()
+    return samples
+
+
+def run_benchmark(iterations=500):
+    """
+    Run both benchmarks against a stub backend and print a comparison
+
+    Args:
+        iterations (int): Triggers per benchmark
+
+    Returns:
+        dict: Summary per mode
+    """
+    logging.getLogger(threat_engine.__name__).setLevel(logging.WARNING)
+    server, base_url = start_stub_backend()
+    url = f"{base_url}/api/trigger"
+
+    try:
+        results = {
+            "fresh_connection": summarize(bench_fresh_connection(url, iterations)),
+            "keepalive_session": summarize(bench_keepalive_session(url, iterations)),
+            "inprocess_queue": summarize(bench_inprocess_transport(iterations))
+        }
+    finally:
+        server.shutdown()
+
+    print(f"[BENCHMARK] Per-trigger latency over {iterations} requests (ms)")
+    print(f"  {'mode':<20} {'mean':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}")
+    for mode, stats in results.items():
+        print(f"  {mode:<20} {stats['mean']:8.3f} {stats['p50']:8.3f} "
+              f"{stats['p95']:8.3f} {stats['p99']:8.3f} {stats['max']:8.3f}")
+
+    speedup = results["fresh_connection"]["mean"] / results["keepalive_session"]["mean"]
+    print(f"[BENCHMARK] Keep-alive speedup: {speedup:.2f}x")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark threat trigger latency")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    run_benchmark(iterations=args.iterations)
@@ -0,0 +1,135 @@
+"""
+Wire Format Benchmark for AeroGuard AI
+Compares the JSON trigger payload with the binary wire format
+Reports encoded size and encode + decode time per batch size
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from datetime import datetime
+
+# Add parent directory to path for relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from logic.wire_format import encode_trigger, decode_trigger
+
+
+def sample_detection(index: int) -> dict:
+    """
+    Build a detection as the threat engine sends it (kinematics, zone, rule, reason)
+
+    Args:
+        index (int): Detection number (varies track id and position)
+
+    Returns:
+        dict: Trigger detection
+    """
+    now = time.time()
+    return {
+        "class_name": "drone",
+        "confidence": 0.93,
+        "bbox": [120 + index, 80, 220 + index, 150],
+        "timestamp": datetime.fromtimestamp(now).isoformat(),
+        "timestamp_s": now,
+        "frame_id": 1024 + index,
+        "camera_id": "0",
+        "track_id": index,
+        "zone_id": 2,
+        "zone": "core",
+        "smoothed_confidence": 0.91,
+        "track_age": 3.2,
+        "speed": 41.5,
+        "growth_rate": 0.12,
+        "time_to_contact": 16.7,
+        "time_to_zone": 0.0,
+        "threat_score": 0.96,
+        "threat_level": "HIGH",
+        "alert_reason": "NEW_OBJECT"
+    }
+
+
+def sample_payload(batch_size: int) -> dict:
+    """Trigger payload with batch_size detections"""
+    return {
+        "threat_detected": True,
+        "detections": [sample_detection(i) for i in range(batch_size)],
+        "timestamp": datetime.now().isoformat()
+    }
+
+
+def json_encode(payload: dict) -> bytes:
+    return json.dumps(payload).encode("utf-8")
+
+
+def json_decode(data: bytes) -> dict:
+    return json.loads(data)
+
+
+def bench_codec(encode, decode, payload: dict, repeats: int) -> dict:
+    """
+    Time encode + decode of one payload
+
+    Args:
+        encode (callable): payload -> bytes
+        decode (callable): bytes -> payload
+        payload (dict): Trigger payload
+        repeats (int): Timed round trips
+
+    Returns:
+        dict: Encoded size (bytes) and best encode / decode time (us)
+    """
+    data = encode(payload)
+    encode_best = decode_best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encode(payload)
+        middle = time.perf_counter()
+        decode(data)
+        end = time.perf_counter()
+        encode_best = min(encode_best, middle - start)
+        decode_best = min(decode_best, end - middle)
+    return {
+        "bytes": len(data),
+        "encode_us": encode_best * 1e6,
+        "decode_us": decode_best * 1e6
+    }
+
+
+def run_benchmark(batch_sizes=(1, 16, 256), repeats=200) -> dict:
+    """
+    Benchmark JSON against the binary wire format and print a comparison
+
+    Args:
+        batch_sizes (tuple): Detections per trigger
+        repeats (int): Timed round trips per measurement
+
+    Returns:
+        dict: batch_size -> {"json": stats, "binary": stats}
+    """
+    results = {}
+    print(f"[BENCHMARK] Trigger wire format, best of {repeats} round trips")
+    print(f"  {'batch':>6} {'format':<8} {'bytes':>9} {'encode us':>11} {'decode us':>11}")
+    for batch_size in batch_sizes:
+        payload = sample_payload(batch_size)
+        results[batch_size] = {
+            "json": bench_codec(json_encode, json_decode, payload, repeats),
+            "binary": bench_codec(encode_trigger, decode_trigger, payload, repeats)
+        }
+        for name, stats in results[batch_size].items():
+            print(f"  {batch_size:>6} {name:<8} {stats['bytes']:>9,} "
+                  f"{stats['encode_us']:>11.1f} {stats['decode_us']:>11.1f}")
+        ratio = results[batch_size]["json"]["bytes"] / results[batch_size]["binary"]["bytes"]
+        print(f"  {'':>6} binary is {ratio:.1f}x smaller")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark JSON vs binary trigger encoding")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 256])
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    run_benchmark(tuple(args.batch_sizes), args.repeats)
@@ -0,0 +1,289 @@
+"""
+Cross-Camera Detection Deduplication for AeroGuard AI
+Projects detections from each camera into a shared site plane via calibrated homographies
+Merges detections of the same object across cameras with a time-bucketed spatial hash grid
+Runs before threat evaluation so overlapping cameras raise a single threat per object
+"""
+
+import json
+import math
+import time
+import logging
+import threading
+from collections import deque
+from itertools import count
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+CELL_SIZE = 5.0        # site-plane units (metres) per grid cell
+TIME_BUCKET = 0.5      # seconds per time bucket
+MERGE_DISTANCE = 5.0   # max site-plane distance for two detections to be the same object
+OBJECT_TTL = 2.0       # seconds an object is remembered after its last sighting
+
+
+class CameraCalibration:
+    """
+    Homography from one camera's image plane into the shared site plane
+    """
+
+    def __init__(self, camera_id, homography):
+        """
+        Initialize camera calibration
+
+        Args:
+            camera_id (str): Camera identifier (matches detection "camera_id")
+            homography (list or np.ndarray): 3x3 image -> site plane homography
+        """
+        matrix = np.asarray(homography, dtype=np.float64)
+        if matrix.shape != (3, 3):
+            raise ValueError(f"Homography for camera {camera_id} must be 3x3, got {matrix.shape}")
+
+        self.camera_id = str(camera_id)
+        self.homography = matrix
+
+    def project(self, points) -> np.ndarray:
+        """
+        Project image points into the site plane
+
+        Args:
+            points (array-like): (N, 2) image coordinates
+
+        Returns:
+            np.ndarray: (N, 2) site-plane coordinates (non-finite where a point has no projection)
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        homogeneous = np.hstack([points, np.ones((len(points), 1))]) @ self.homography.T
+        # Points on the horizon line have w = 0 and project to inf / NaN
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return homogeneous[:, :2] / homogeneous[:, 2:3]
+
+    def project_boxes(self, boxes) -> np.ndarray:
+        """
+        Project bounding box centres into the site plane
+
+        Args:
+            boxes (array-like): (N, 4) boxes [x1, y1, x2, y2]
+
+        Returns:
+            np.ndarray: (N, 2) site-plane coordinates
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        centres = np.column_stack([(boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2])
+        return self.project(centres)
+
+
+def load_calibrations(path) -> dict:
+    """
+    Load per-camera homographies from a JSON file
+
+    Expected format:
+    {
+        "cam-north": [[h00, h01, h02], [h10, h11, h12], [h20, h21, h22]],
+        "cam-east": {"homography": [[...], [...], [...]]}
+    }
+
+    Args:
+        path (str or Path): Calibration file
+
+    Returns:
+        dict: camera_id -> CameraCalibration
+    """
+    with open(path) as f:
+        data = json.load(f)
+
+    calibrations = {}
+    for camera_id, entry in data.items():
+        homography = entry["homography"] if isinstance(entry, dict) else entry
+        calibrations[str(camera_id)] = CameraCalibration(camera_id, homography)
+    return calibrations
+
+
+class CrossCameraDeduplicator:
+    """
+    Merges detections of the same physical object reported by different cameras
+
+    Objects live in a spatial hash grid keyed by (time bucket, cell x, cell y).
+    A lookup only inspects the neighbouring cells of the recent time buckets,
+    so cost per detection is constant regardless of how many cameras or
+    objects are active. The first camera to report an object owns
+    it; reports from other cameras while the owner keeps seeing it are merged.
+    Detections of one camera frame (same frame_id, else same timestamp_s) never
+    share an object: a camera claims each object at most once per frame.
+    Thread-safe: camera pipelines of one detector process share an instance.
+    """
+
+    def __init__(self,
+                 calibrations: dict,
+                 cell_size=CELL_SIZE,
+                 time_bucket=TIME_BUCKET,
+                 merge_distance=MERGE_DISTANCE,
+                 object_ttl=OBJECT_TTL):
+        """
+        Initialize deduplicator
+
+        Args:
+            calibrations (dict): camera_id -> CameraCalibration
+            cell_size (float): Grid cell size in site-plane units
+            time_bucket (float): Time bucket length in seconds
+            merge_distance (float): Max distance for detections to merge
+            object_ttl (float): Seconds an object is remembered after last sighting
+        """
+        self.calibrations = calibrations
+        self.cell_size = cell_size
+        self.time_bucket = time_bucket
+        self.merge_distance = merge_distance
+        self.object_ttl = object_ttl
+
+        self._grid = {}             # (bucket, gx, gy) -> [object_id, ...]
+        self._buckets = deque()     # (bucket, key) insertion order for eviction
+        self._objects = {}          # object_id -> state dict
+        self._ids = count(1)
+        self._evicted_bucket = None
+        self._cell_reach = max(1, math.ceil(merge_distance / cell_size))
+        self._bucket_reach = max(1, math.ceil(object_ttl / time_bucket))
+
+        self.merged_count = 0
+        self._lock = threading.Lock()
+
+    def _evict(self, now_bucket):
+        if now_bucket == self._evicted_bucket:
+            return
+        self._evicted_bucket = now_bucket
+
+        while self._buckets and self._buckets[0][0] < now_bucket - self._bucket_reach:
+            _, key = self._buckets.popleft()
+            self._grid.pop(key, None)
+
+        stale = [oid for oid, obj in self._objects.items()
+                 if obj["last_bucket"] < now_bucket - self._bucket_reach]
+        for oid in stale:
+            del self._objects[oid]
+
+    def _insert(self, object_id, bucket, gx, gy):
+        key = (bucket, gx, gy)
+        cell = self._grid.get(key)
+        if cell is None:
+            cell = self._grid[key] = []
+            self._buckets.append((bucket, key))
+        if object_id not in cell:
+            cell.append(object_id)
+
+    def _find(self, x, y, bucket, gx, gy, camera_id, frame):
+        best_id = None
+        best_dist = self.merge_distance
+        reach = self._cell_reach
+        for b in range(bucket - self._bucket_reach, bucket + 1):
+            for dx in range(-reach, reach + 1):
+                for dy in range(-reach, reach + 1):
+                    for object_id in self._grid.get((b, gx + dx, gy + dy), ()):
+                        obj = self._objects.get(object_id)
+                        if obj is None or (frame is not None and obj["frames"].get(camera_id) == frame):
+                            continue
+                        dist = math.hypot(obj["x"] - x, obj["y"] - y)
+                        if dist <= best_dist:
+                            best_id, best_dist = object_id, dist
+        return best_id
+
+    def merge(self, detections: list, now=None) -> list:
+        """
+        Annotate detections with a shared object id and drop cross-camera duplicates
+
+        Each detection dict needs "camera_id" and "bbox"; "timestamp_s" (epoch
+        seconds) is used when present. Detections from uncalibrated cameras, or
+        whose box does not project onto the site plane, pass through unchanged.
+
+        Args:
+            detections (list): Detection dicts from one or more cameras
+            now (float): Fallback observation time in seconds (defaults to time.time())
+
+        Returns:
+            list: Detections to forward, each with "object_id", "site_position" and "cameras"
+        """
+        if not detections:
+            return []
+
+        if now is None:
+            now = time.time()
+        forwarded = []
+
+        # Group by camera so projection is a single matrix product per camera
+        by_camera = {}
+        for index, detection in enumerate(detections):
+            by_camera.setdefault(str(detection.get("camera_id")), []).append(index)
+
+        positions = [None] * len(detections)
+        for camera_id, indices in by_camera.items():
+            calibration = self.calibrations.get(camera_id)
+            if calibration is None:
+                continue
+            boxes = [detections[i].get("bbox", [0, 0, 0, 0]) for i in indices]
+            for i, point in zip(indices, calibration.project_boxes(boxes)):
+                positions[i] = point
+
+        with self._lock:
+            for detection, position in zip(detections, positions):
+                if position is None or not np.isfinite(position).all():
+                    forwarded.append(detection)
+                    continue
+
+                timestamp = detection.get("timestamp_s") or now
+                bucket = int(timestamp // self.time_bucket)
+                self._evict(bucket)
+
+                x, y = float(position[0]), float(position[1])
+                gx, gy = int(x // self.cell_size), int(y // self.cell_size)
+                camera_id = str(detection.get("camera_id"))
+                frame = detection.get("frame_id", detection.get("timestamp_s"))
+
+                object_id = self._find(x, y, bucket, gx, gy, camera_id, frame)
+                obj = self._objects.get(object_id)
+
+                if obj is None:
+                    object_id = next(self._ids)
+                    obj = self._objects[object_id] = {
+                        "owner": camera_id,
+                        "cameras": set(),
+                        "frames": {},
+                        "owner_bucket": bucket
+                    }
+
+                obj["cameras"].add(camera_id)
+                obj["frames"][camera_id] = frame
+                obj["last_bucket"] = bucket
+                self._insert(object_id, bucket, gx, gy)
+
+                duplicate = (obj["owner"] != camera_id
+                             and bucket - obj["owner_bucket"] <= self._bucket_reach)
+                if duplicate:
+                    self.merged_count += 1
+                    continue
+
+                # Owner (or a camera taking over a lost object) updates the position
+                obj.update(owner=camera_id, owner_bucket=bucket, x=x, y=y)
+
+                forwarded.append(dict(
+                    detection,
+                    object_id=object_id,
+                    site_position=[x, y],
+                    cameras=sorted(obj["cameras"])
+                ))
+
+        return forwarded
+
+    def get_stats(self) -> dict:
+        """
+        Get deduplication statistics
+
+        Returns:
+            dict: Active object count, grid cell count and merged detection count
+        """
+        with self._lock:
+            return {
+                "active_objects": len(self._objects),
+                "grid_cells": len(self._grid),
+                "merged_detections": self.merged_count,
+                "calibrated_cameras": sorted(self.calibrations)
+            }
@@ -0,0 +1,123 @@
+"""
+Temporal Confidence Smoothing for AeroGuard AI
+Per-track smoothing so a single noisy frame cannot fire countermeasures on its own
+Two O(1) smoothers: k-of-n order statistic (default) and exponential moving average
+Both keep a fixed amount of state per track and add at most a frame or two of latency
+"""
+
+from array import array
+
+
+# Smoothing modes
+SMOOTHING_NONE = "none"
+SMOOTHING_EMA = "ema"
+SMOOTHING_K_OF_N = "kofn"
+SMOOTHING_MODES = (SMOOTHING_NONE, SMOOTHING_EMA, SMOOTHING_K_OF_N)
+
+# Defaults
+SMOOTHING_K = 2         # frames that must reach a confidence ...
+SMOOTHING_N = 3         # ... within the last n frames
+SMOOTHING_ALPHA = 0.6   # EMA weight of the newest frame
+
+
+class KOfNSmoother:
+    """
+    k-th highest confidence among the last n frames of a track
+
+    A track only scores c once at least k of its last n frames reached c, so a
+    lone spike is ignored while a real target costs k - 1 extra frames.
+    """
+
+    __slots__ = ("values", "k", "n", "count", "head")
+
+    def __init__(self, k=SMOOTHING_K, n=SMOOTHING_N):
+        """
+        Initialize k-of-n smoother
+
+        Args:
+            k (int): Frames that must reach the reported confidence
+            n (int): Window size in frames
+        """
+        if not 1 <= k <= n:
+            raise ValueError(f"k-of-n smoothing needs 1 <= k <= n, got k={k}, n={n}")
+        self.values = array("d", bytes(8 * n))
+        self.k = k
+        self.n = n
+        self.count = 0
+        self.head = 0
+
+    def update(self, confidence: float) -> float:
+        """
+        Add a frame and return the smoothed confidence
+
+        Args:
+            confidence (float): Raw detection confidence (0-1)
+
+        Returns:
+            float: k-th highest confidence of the window (0 until k frames are seen)
+        """
+        self.values[self.head] = confidence
+        self.head = (self.head + 1) % self.n
+        self.count = min(self.count + 1, self.n)
+        if self.count < self.k:
+            return 0.0
+        window = sorted(self.values[:self.count] if self.count < self.n else self.values, reverse=True)
+        return window[self.k - 1]
+
+
+class EMASmoother:
+    """
+    Exponential moving average of confidence, starting from zero
+
+    Starting from zero means a new track needs a few consistent frames before
+    it reaches the higher thresholds; alpha sets how many.
+    """
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, alpha=SMOOTHING_ALPHA):
+        """
+        Initialize EMA smoother
+
+        Args:
+            alpha (float): Weight of the newest frame (0-1]
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError(f"EMA smoothing needs 0 < alpha <= 1, got {alpha}")
+        self.alpha = alpha
+        self.value = 0.0
+
+    def update(self, confidence: float) -> float:
+        """
+        Add a frame and return the smoothed confidence
+
+        Args:
+            confidence (float): Raw detection confidence (0-1)
+
+        Returns:
+            float: Moving average confidence
+        """
+        self.value += self.alpha * (confidence - self.value)
+        return self.value
+
+
+def create_smoother(mode=SMOOTHING_K_OF_N, k=SMOOTHING_K, n=SMOOTHING_N, alpha=SMOOTHING_ALPHA):
+    """
+    Build a per-track smoother
+
+    Args:
+        mode (str): "kofn", "ema" or "none"
+        k (int): k-of-n: frames that must reach the reported confidence
+        n (int): k-of-n: window size in frames
+        alpha (float): EMA: weight of the newest frame
+
+    Returns:
+        KOfNSmoother or EMASmoother: Smoother, or None when smoothing is disabled
+    """
+    if mode == SMOOTHING_K_OF_N:
+        return KOfNSmoother(k, n)
+    if mode == SMOOTHING_EMA:
+        return EMASmoother(alpha)
+    if mode == SMOOTHING_NONE:
+        return None
+    raise ValueError(f"Unknown confidence smoothing mode: {mode!r} (expected one of {SMOOTHING_MODES})")
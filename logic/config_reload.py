@@ -0,0 +1,106 @@
+"""
+Configuration File Watcher for AeroGuard AI
+Polls config files for changes and calls a reload hook when any of them changes
+Used to hot-swap threat thresholds and site rules without restarting the detector
+"""
+
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Configuration
+RELOAD_INTERVAL = 2.0  # seconds between file checks
+
+
+def file_signature(path):
+    """
+    Cheap change signature of a file
+
+    Args:
+        path (str): File path
+
+    Returns:
+        tuple: (mtime_ns, size), or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ConfigWatcher:
+    """
+    Background poller calling on_change when a watched file is created, modified or removed
+
+    Polling (rather than inotify) keeps this portable across Docker volume mounts.
+    on_change runs on the watcher thread; it should validate the new config and
+    leave the running one untouched if validation fails.
+    """
+
+    def __init__(self, paths, on_change, interval=RELOAD_INTERVAL):
+        """
+        Initialize config watcher
+
+        Args:
+            paths (list): Files to watch
+            on_change (callable): Called with no arguments after a change
+            interval (float): Seconds between checks
+        """
+        self.paths = [str(p) for p in paths if p]
+        self.on_change = on_change
+        self.interval = interval
+
+        self._signatures = {path: file_signature(path) for path in self.paths}
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self.reload_count = 0
+
+    def check(self) -> bool:
+        """
+        Check the watched files once and reload if any changed
+
+        Returns:
+            bool: True if a change was detected
+        """
+        changed = False
+        for path in self.paths:
+            signature = file_signature(path)
+            if signature != self._signatures[path]:
+                self._signatures[path] = signature
+                logger.info(f"[CONFIG] Change detected in {path}")
+                changed = True
+
+        if changed:
+            self.reload_count += 1
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error(f"[CONFIG] Reload failed: {str(e)}")
+        return changed
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Start polling on a daemon thread (no-op if already running)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+            self._thread.start()
+        logger.info(f"[CONFIG] Watching {len(self.paths)} file(s) every {self.interval}s")
+
+    def stop(self):
+        """Stop polling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
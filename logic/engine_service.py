@@ -0,0 +1,333 @@
+"""
+Threat Engine Service for AeroGuard AI
+Runs the threat engine as one long-lived local service on a Unix domain socket
+Every detector process streams detection batches to it, so all cameras share one
+view of tracks, cooldowns, dedup and fusion state instead of one engine per process
+
+Frames (both directions): u32 little-endian body length + body
+    request   detection batch in the binary trigger wire format (logic/wire_format.py)
+    response  one u8 threat level index per detection (0=NONE, 1=LOW, 2=MEDIUM, 3=HIGH)
+Requests on a connection may be pipelined; responses come back in order
+
+Usage:
+    python logic/engine_service.py [--socket PATH]
+    ENGINE_SOCKET=PATH python vision/detect_live.py
+"""
+
+import os
+import sys
+import socket
+import struct
+import asyncio
+import argparse
+import logging
+from pathlib import Path
+
+# Add parent directory to path for relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from logic.wire_format import encode_trigger, decode_trigger, WireFormatError
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+ENGINE_SOCKET = os.getenv("ENGINE_SOCKET", "/tmp/aeroguard-engine.sock")
+MAX_FRAME_SIZE = 16 * 1024 * 1024  # bytes; larger frames close the connection
+READ_SIZE = 256 * 1024             # bytes taken from the socket per read
+SOCKET_MODE = 0o660                # detectors and the engine share a group
+
+THREAT_LEVEL_NAMES = ("NONE", "LOW", "MEDIUM", "HIGH")
+_LEVEL_INDEX = {name: index for index, name in enumerate(THREAT_LEVEL_NAMES)}
+
+_LENGTH = struct.Struct("<I")
+
+
+class EngineService:
+    """
+    asyncio Unix socket server evaluating detection batches
+
+    Detections are evaluated on the event loop thread one frame at a time, so
+    the engine's track state sees a single ordered stream from all detectors
+    and needs no extra locking. Countermeasure triggers still leave through the
+    engine's priority dispatcher and never block the loop.
+    """
+
+    def __init__(self, socket_path=ENGINE_SOCKET, evaluate=None):
+        """
+        Initialize engine service
+
+        Args:
+            socket_path (str): Unix socket path
+            evaluate (callable): detection dict -> threat level name
+                (defaults to threat_engine.evaluate_threat, imported on start)
+        """
+        self.socket_path = str(socket_path)
+        self.evaluate = evaluate
+        self._server = None
+
+        self.clients = 0
+        self.frame_count = 0
+        self.detection_count = 0
+        self.error_count = 0
+
+    def evaluate_frame(self, body: bytes) -> bytes:
+        """
+        Evaluate one request frame
+
+        Args:
+            body (bytes): Detection batch in the binary wire format
+
+        Returns:
+            bytes: One threat level index per detection
+        """
+        detections = decode_trigger(body)["detections"]
+        evaluate = self.evaluate
+        levels = bytes([_LEVEL_INDEX[evaluate(detection)] for detection in detections])
+        self.frame_count += 1
+        self.detection_count += len(detections)
+        return levels
+
+    async def _handle_client(self, reader, writer):
+        self.clients += 1
+        buffer = bytearray()
+        try:
+            while True:
+                # Take whatever has arrived and answer every complete frame in it with one write,
+                # so pipelined detectors cost one await per read rather than per frame
+                chunk = await reader.read(READ_SIZE)
+                if not chunk:
+                    break
+                buffer += chunk
+
+                responses = []
+                offset = 0
+                while len(buffer) - offset >= _LENGTH.size:
+                    (length,) = _LENGTH.unpack_from(buffer, offset)
+                    if length > MAX_FRAME_SIZE:
+                        raise ConnectionError(f"Frame of {length} bytes exceeds limit")
+                    end = offset + _LENGTH.size + length
+                    if end > len(buffer):
+                        break
+                    try:
+                        levels = self.evaluate_frame(bytes(buffer[offset + _LENGTH.size:end]))
+                    except WireFormatError as e:
+                        # An empty response tells the client the frame was rejected
+                        self.error_count += 1
+                        logger.warning(f"[ENGINE-SERVICE] Rejected frame: {str(e)}")
+                        levels = b""
+                    except Exception as e:
+                        # An engine error fails this frame only; the connection stays up
+                        self.error_count += 1
+                        logger.exception(f"[ENGINE-SERVICE] Frame evaluation failed: {str(e)}")
+                        levels = b""
+                    responses.append(_LENGTH.pack(len(levels)) + levels)
+                    offset = end
+                del buffer[:offset]
+
+                if responses:
+                    writer.write(b"".join(responses))
+                    await writer.drain()
+        except ConnectionError as e:
+            logger.warning(f"[ENGINE-SERVICE] Closing connection: {str(e)}")
+        finally:
+            self.clients -= 1
+            writer.close()
+
+    def _prepare_engine(self):
+        from logic import threat_engine
+        if self.evaluate is None:
+            self.evaluate = threat_engine.evaluate_threat
+        threat_engine.warm_up_trigger_transport()
+        threat_engine.start_config_watcher()
+        threat_engine.start_stats_logger()
+
+    async def start(self):
+        """Bind the socket and start accepting detectors"""
+        if self.evaluate is None:
+            self._prepare_engine()
+
+        # A socket file left by a previous run would make bind fail
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, SOCKET_MODE)
+        logger.info(f"[ENGINE-SERVICE] Listening on {self.socket_path}")
+
+    async def serve_forever(self):
+        """Start (if needed) and serve until cancelled"""
+        if self._server is None:
+            await self.start()
+        try:
+            async with self._server:
+                await self._server.serve_forever()
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop accepting connections and remove the socket file"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def get_stats(self) -> dict:
+        """
+        Get service statistics
+
+        Returns:
+            dict: Connected clients and evaluated frames / detections
+        """
+        return {
+            "socket": self.socket_path,
+            "clients": self.clients,
+            "frames": self.frame_count,
+            "detections": self.detection_count,
+            "rejected_frames": self.error_count
+        }
+
+
+class EngineClient:
+    """
+    Blocking client used by detector processes to reach the engine service
+    """
+
+    def __init__(self, socket_path=ENGINE_SOCKET, timeout=5.0):
+        """
+        Initialize engine client
+
+        Args:
+            socket_path (str): Unix socket path of the engine service
+            timeout (float): Seconds to wait for a response
+        """
+        self.socket_path = str(socket_path)
+        self.timeout = timeout
+        self._sock = None
+
+    def connect(self):
+        """Connect to the engine service (no-op if already connected)"""
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._sock = sock
+
+    def _recv_exactly(self, size: int) -> bytes:
+        buffer = bytearray()
+        while len(buffer) < size:
+            chunk = self._sock.recv(size - len(buffer))
+            if not chunk:
+                raise ConnectionError("Engine service closed the connection")
+            buffer += chunk
+        return bytes(buffer)
+
+    def _round_trip(self, frame: bytes) -> bytes:
+        self.connect()
+        self._sock.sendall(frame)
+        (length,) = _LENGTH.unpack(self._recv_exactly(_LENGTH.size))
+        return self._recv_exactly(length)
+
+    def _send(self, frame: bytes) -> bytes:
+        try:
+            self.connect()
+            self._sock.sendall(frame)
+        except OSError:
+            # Stale connection (the service restarted): nothing was delivered, so resend once
+            self.close()
+            return self._round_trip(frame)
+        try:
+            (length,) = _LENGTH.unpack(self._recv_exactly(_LENGTH.size))
+            return self._recv_exactly(length)
+        except OSError:
+            # The frame was delivered and may have been evaluated - never resend it (track state
+            # would count its detections twice). Drop the connection so a late response cannot
+            # be read as the answer to the next frame.
+            self.close()
+            raise
+
+    def evaluate_batch(self, detections: list) -> list:
+        """
+        Evaluate a batch of detections in the engine service
+
+        Args:
+            detections (list): Detection dicts
+
+        Returns:
+            list: Threat level name per detection
+
+        Raises:
+            OSError: If the service is unreachable (after one reconnect) or did not
+                answer in time (a delivered frame is never resent)
+            ValueError: If the service rejected the batch
+        """
+        if not detections:
+            return []
+
+        body = encode_trigger({"threat_detected": False, "detections": detections})
+        levels = self._send(_LENGTH.pack(len(body)) + body)
+
+        if len(levels) != len(detections):
+            raise ValueError("Engine service rejected the detection batch")
+        return [THREAT_LEVEL_NAMES[index] for index in levels]
+
+    def evaluate_pipelined(self, batches: list) -> list:
+        """
+        Evaluate several batches with one write and no per-batch round trip
+
+        Args:
+            batches (list): Lists of detection dicts (each non-empty)
+
+        Returns:
+            list: Threat level names per batch
+        """
+        bodies = [encode_trigger({"threat_detected": False, "detections": batch}) for batch in batches]
+        self.connect()
+        self._sock.sendall(b"".join(_LENGTH.pack(len(body)) + body for body in bodies))
+
+        results = []
+        try:
+            for batch in batches:
+                (length,) = _LENGTH.unpack(self._recv_exactly(_LENGTH.size))
+                levels = self._recv_exactly(length)
+                if len(levels) != len(batch):
+                    raise ValueError("Engine service rejected a detection batch")
+                results.append([THREAT_LEVEL_NAMES[index] for index in levels])
+        except (OSError, ValueError):
+            # Responses still in flight would be read as answers to later frames
+            self.close()
+            raise
+        return results
+
+    def evaluate(self, detection: dict) -> str:
+        """
+        Evaluate one detection in the engine service
+
+        Args:
+            detection (dict): Detection information
+
+        Returns:
+            str: Threat level name
+        """
+        return self.evaluate_batch([detection])[0]
+
+    def close(self):
+        """Close the connection"""
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the threat engine as a Unix socket service")
+    parser.add_argument("--socket", default=ENGINE_SOCKET, help="Unix socket path")
+    parser.add_argument("--log-level", default="INFO", help="Logging level (per-detection logs are INFO)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] %(message)s')
+    logging.getLogger("logic.threat_engine").setLevel(args.log_level.upper())
+
+    service = EngineService(args.socket)
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        logger.info(f"[ENGINE-SERVICE] Stopped after {service.frame_count} frames")
@@ -0,0 +1,233 @@
+"""
+Geofence Zones for AeroGuard AI
+Per-camera polygon zones rasterized at load time into label images
+A box centre maps to its zone id with a single array index (also vectorized over batches)
+Zone names feed the rule engine, the threat log and alert payloads
+
+Zone file format (JSON, polygons in image pixel coordinates):
+{
+    "0": {
+        "width": 1280,
+        "height": 720,
+        "zones": [
+            {"name": "buffer", "polygon": [[100, 50], [1180, 50], [1180, 670], [100, 670]]},
+            {"name": "core", "polygon": [[440, 200], [840, 200], [840, 520], [440, 520]]}
+        ]
+    }
+}
+
+Later zones are painted over earlier ones, so list inner zones after outer ones.
+"""
+
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Zone id 0 is reserved for "outside every zone"
+NO_ZONE_ID = 0
+NO_ZONE_NAME = ""
+
+
+def rasterize_polygon(polygon, width: int, height: int) -> np.ndarray:
+    """
+    Rasterize a polygon into a boolean mask (pixel centres, even-odd rule)
+
+    Args:
+        polygon (list): [[x, y], ...] vertices in pixel coordinates
+        width (int): Mask width in pixels
+        height (int): Mask height in pixels
+
+    Returns:
+        np.ndarray: (height, width) boolean mask
+    """
+    vertices = np.asarray(polygon, dtype=np.float64).reshape(-1, 2)
+    mask = np.zeros((height, width), dtype=bool)
+    if len(vertices) < 3:
+        return mask
+
+    # Only scan the polygon's bounding box
+    x0 = max(0, int(np.floor(vertices[:, 0].min())))
+    x1 = min(width, int(np.ceil(vertices[:, 0].max())) + 1)
+    y0 = max(0, int(np.floor(vertices[:, 1].min())))
+    y1 = min(height, int(np.ceil(vertices[:, 1].max())) + 1)
+    if x0 >= x1 or y0 >= y1:
+        return mask
+
+    xs = np.arange(x0, x1) + 0.5
+    ys = (np.arange(y0, y1) + 0.5)[:, None]
+    inside = np.zeros((y1 - y0, x1 - x0), dtype=bool)
+
+    for (ax, ay), (bx, by) in zip(vertices, np.roll(vertices, -1, axis=0)):
+        if ay == by:
+            continue
+        crosses = (ay > ys) != (by > ys)
+        x_cross = ax + (ys - ay) * (bx - ax) / (by - ay)
+        inside ^= crosses & (xs < x_cross)
+
+    mask[y0:y1, x0:x1] = inside
+    return mask
+
+
+class CameraZoneMap:
+    """
+    Rasterized zone label image for one camera
+    """
+
+    def __init__(self, camera_id, width: int, height: int, zones: list, scale=1.0):
+        """
+        Rasterize a camera's zones
+
+        Args:
+            camera_id (str): Camera identifier
+            width (int): Frame width in pixels
+            height (int): Frame height in pixels
+            zones (list): Zone dicts with "name" and "polygon"
+            scale (float): Label image resolution relative to the frame (e.g. 0.5)
+        """
+        self.camera_id = str(camera_id)
+        self.width = width
+        self.height = height
+        self.scale = scale
+
+        mask_width = max(1, int(round(width * scale)))
+        mask_height = max(1, int(round(height * scale)))
+        dtype = np.uint8 if len(zones) < 255 else np.uint16
+        self.labels = np.zeros((mask_height, mask_width), dtype=dtype)
+
+        self.names = [NO_ZONE_NAME]
+        for zone in zones:
+            zone_id = len(self.names)
+            polygon = np.asarray(zone["polygon"], dtype=np.float64) * scale
+            self.labels[rasterize_polygon(polygon, mask_width, mask_height)] = zone_id
+            self.names.append(str(zone.get("name", zone_id)))
+        self.name_array = np.array(self.names)
+
+        # Zone centroids in frame coordinates (for time-to-zone estimates)
+        self.centroids = {}
+        for zone_id, name in enumerate(self.names[1:], start=1):
+            ys, xs = np.nonzero(self.labels == zone_id)
+            if len(xs):
+                self.centroids[name] = ((xs.mean() + 0.5) / scale, (ys.mean() + 0.5) / scale)
+
+    def zone_ids(self, boxes) -> np.ndarray:
+        """
+        Zone id of each box centre
+
+        Args:
+            boxes (array-like): (N, 4) boxes [x1, y1, x2, y2]
+
+        Returns:
+            np.ndarray: (N,) zone ids (0 = outside every zone)
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        cx = np.floor((boxes[:, 0] + boxes[:, 2]) * (0.5 * self.scale)).astype(np.intp)
+        cy = np.floor((boxes[:, 1] + boxes[:, 3]) * (0.5 * self.scale)).astype(np.intp)
+        height, width = self.labels.shape
+        inside = (cx >= 0) & (cx < width) & (cy >= 0) & (cy < height)
+        ids = np.zeros(len(boxes), dtype=self.labels.dtype)
+        ids[inside] = self.labels[cy[inside], cx[inside]]
+        return ids
+
+    def zone_names(self, zone_ids) -> np.ndarray:
+        """
+        Map zone ids to zone names
+
+        Args:
+            zone_ids (np.ndarray): Zone ids
+
+        Returns:
+            np.ndarray: Zone names ("" = outside every zone)
+        """
+        return self.name_array[zone_ids]
+
+
+class GeofenceMap:
+    """
+    Zone maps for every configured camera
+    """
+
+    def __init__(self, cameras: dict):
+        """
+        Initialize geofence map
+
+        Args:
+            cameras (dict): camera_id -> CameraZoneMap
+        """
+        self.cameras = cameras
+
+    def __len__(self):
+        return len(self.cameras)
+
+    @classmethod
+    def from_file(cls, path, scale=1.0):
+        """
+        Load and rasterize zones from a JSON file
+
+        Args:
+            path (str or Path): Zone file
+            scale (float): Label image resolution relative to the frame
+
+        Returns:
+            GeofenceMap: Rasterized zones
+        """
+        with open(path) as f:
+            data = json.load(f)
+
+        cameras = {}
+        for camera_id, entry in data.items():
+            cameras[str(camera_id)] = CameraZoneMap(
+                camera_id,
+                int(entry["width"]),
+                int(entry["height"]),
+                entry.get("zones", []),
+                scale=scale
+            )
+        return cls(cameras)
+
+    def lookup(self, camera_id, boxes) -> tuple:
+        """
+        Zone ids and names for a batch of boxes from one camera
+
+        Args:
+            camera_id (str): Camera identifier
+            boxes (array-like): (N, 4) boxes [x1, y1, x2, y2]
+
+        Returns:
+            tuple: (zone_ids, zone_names) arrays; all zeros / "" for unknown cameras
+        """
+        zone_map = self.cameras.get(str(camera_id))
+        count = len(np.asarray(boxes).reshape(-1, 4))
+        if zone_map is None:
+            return np.zeros(count, dtype=np.uint8), np.full(count, NO_ZONE_NAME)
+        ids = zone_map.zone_ids(boxes)
+        return ids, zone_map.zone_names(ids)
+
+    def zone_centroid(self, camera_id, zone_name):
+        """
+        Centroid of a named zone in a camera's frame
+
+        Args:
+            camera_id (str): Camera identifier
+            zone_name (str): Zone name
+
+        Returns:
+            tuple: (x, y) in pixels, or None if the camera or zone is unknown
+        """
+        zone_map = self.cameras.get(str(camera_id))
+        return zone_map.centroids.get(zone_name) if zone_map is not None else None
+
+    def annotate(self, detection_data: dict) -> dict:
+        """
+        Add "zone_id" and "zone" to a detection dict
+
+        Args:
+            detection_data (dict): Detection with "camera_id" and "bbox"
+
+        Returns:
+            dict: Copy of the detection with zone fields
+        """
+        ids, names = self.lookup(detection_data.get("camera_id"), [detection_data.get("bbox", [0, 0, 0, 0])])
+        return dict(detection_data, zone_id=int(ids[0]), zone=str(names[0]))
@@ -0,0 +1,134 @@
+"""
+Kinematic Threat Scoring for AeroGuard AI
+Keeps a compact fixed-size ring buffer of recent states (centre, area, time) per track
+Velocity, bbox growth rate and time-to-zone are updated incrementally on each sighting
+A drone whose bbox grows quickly is approaching - the combined score reflects that
+"""
+
+import math
+from array import array
+
+
+# Configuration
+HISTORY_SIZE = 8             # samples kept per track
+MIN_WINDOW = 0.05            # seconds of history needed before rates are reported
+
+# Combined score: confidence plus bounded kinematic boosts (capped at 1.0)
+GROWTH_WEIGHT = 0.08         # boost for bbox growth (approach)
+GROWTH_REFERENCE = 0.5       # relative area growth per second giving the full growth boost
+SPEED_WEIGHT = 0.02          # boost for fast image-plane motion
+SPEED_REFERENCE = 300.0      # pixels per second giving the full speed boost
+ZONE_WEIGHT = 0.05           # boost for imminent zone entry
+ZONE_HORIZON = 10.0          # seconds to zone entry below which the zone boost ramps up
+
+_FIELDS = 4  # cx, cy, area, t
+
+
+class KinematicHistory:
+    """
+    Fixed-size ring buffer of (cx, cy, area, t) samples for one track
+
+    Rates are computed between the newest sample and the oldest sample still
+    in the buffer, so each update is O(1) regardless of track length.
+    """
+
+    __slots__ = ("samples", "size", "count", "head", "vx", "vy", "growth_rate")
+
+    def __init__(self, size=HISTORY_SIZE):
+        """
+        Initialize kinematic history
+
+        Args:
+            size (int): Number of samples kept
+        """
+        self.samples = array("d", bytes(8 * _FIELDS * size))
+        self.size = size
+        self.count = 0
+        self.head = 0
+        self.vx = 0.0
+        self.vy = 0.0
+        self.growth_rate = 0.0
+
+    def update(self, cx: float, cy: float, area: float, t: float):
+        """
+        Add a sample and refresh velocity and growth rate
+
+        Args:
+            cx (float): Box centre x (pixels)
+            cy (float): Box centre y (pixels)
+            area (float): Box area (pixels^2)
+            t (float): Sample time (seconds)
+        """
+        samples = self.samples
+        base = self.head * _FIELDS
+        samples[base] = cx
+        samples[base + 1] = cy
+        samples[base + 2] = area
+        samples[base + 3] = t
+
+        self.count = min(self.count + 1, self.size)
+        oldest = ((self.head - self.count + 1) % self.size) * _FIELDS
+        self.head = (self.head + 1) % self.size
+
+        dt = t - samples[oldest + 3]
+        if dt >= MIN_WINDOW:
+            self.vx = (cx - samples[oldest]) / dt
+            self.vy = (cy - samples[oldest + 1]) / dt
+            old_area = samples[oldest + 2]
+            self.growth_rate = math.log(area / old_area) / dt if area > 0 and old_area > 0 else 0.0
+
+    @property
+    def speed(self) -> float:
+        """Image-plane speed in pixels per second"""
+        return math.hypot(self.vx, self.vy)
+
+    @property
+    def time_to_contact(self) -> float:
+        """
+        Seconds until the object would fill the view at the current approach rate
+        Area grows with the square of size, so tau = 2 / (relative area growth)
+        """
+        return 2.0 / self.growth_rate if self.growth_rate > 0 else math.inf
+
+    def time_to_point(self, cx: float, cy: float, tx: float, ty: float) -> float:
+        """
+        Seconds until the track reaches a target point at its current closing speed
+
+        Args:
+            cx (float): Current centre x
+            cy (float): Current centre y
+            tx (float): Target x
+            ty (float): Target y
+
+        Returns:
+            float: Time to target (inf if not closing in)
+        """
+        dx, dy = tx - cx, ty - cy
+        distance = math.hypot(dx, dy)
+        if distance == 0:
+            return 0.0
+        closing = (self.vx * dx + self.vy * dy) / distance
+        return distance / closing if closing > 0 else math.inf
+
+
+def kinematic_score(confidence: float, growth_rate: float, speed: float, time_to_zone: float) -> float:
+    """
+    Combine confidence with approach, speed and zone-entry urgency
+
+    A stationary detection outside the target zone scores exactly its
+    confidence, so the thresholds keep their meaning; kinematics only raise it.
+
+    Args:
+        confidence (float): Detection confidence (0-1)
+        growth_rate (float): Relative bbox area growth per second
+        speed (float): Image-plane speed (pixels per second)
+        time_to_zone (float): Seconds until zone entry (inf if not approaching)
+
+    Returns:
+        float: Threat score (0-1)
+    """
+    boost = GROWTH_WEIGHT * min(max(growth_rate / GROWTH_REFERENCE, 0.0), 1.0)
+    boost += SPEED_WEIGHT * min(speed / SPEED_REFERENCE, 1.0)
+    if time_to_zone < ZONE_HORIZON:
+        boost += ZONE_WEIGHT * (1.0 - time_to_zone / ZONE_HORIZON)
+    return min(confidence + boost, 1.0)
@@ -0,0 +1,227 @@
+"""
+Rolling Threat Statistics for AeroGuard AI
+Sliding-window counts per zone and threat level, maintained incrementally
+Each window is a circular array of time buckets plus a running total, so recording
+an event and reading a window total are O(1) - nothing scans a log
+
+Windows (bucket size x buckets):
+    last_minute   1 s x 60
+    last_hour     1 min x 60
+    last_day      1 h x 24
+A window covers its full buckets plus the bucket in progress
+Zone names can come from clients, so at most MAX_STAT_ZONES rows are kept; further
+zones (and zone values that are not names) are counted under "other"
+counts_snapshot() formats counts kept elsewhere (the backend's shared threat store) the same way
+"""
+
+import os
+import time
+import threading
+import numpy as np
+
+# Configuration: (window name, bucket seconds, buckets)
+WINDOWS = (
+    ("last_minute", 1.0, 60),
+    ("last_hour", 60.0, 60),
+    ("last_day", 3600.0, 24)
+)
+
+MAX_STAT_ZONES = int(os.getenv("MAX_STAT_ZONES", 64))  # zone rows kept before new zones count as "other"
+
+LEVEL_NAMES = ("NONE", "LOW", "MEDIUM", "HIGH")
+NO_ZONE = "unzoned"
+OTHER_ZONE = "other"
+
+
+def _zone_name(zone) -> str:
+    if zone is None or zone == "":
+        return NO_ZONE
+    if isinstance(zone, str):
+        return zone
+    if isinstance(zone, (int, float)) and not isinstance(zone, bool):
+        return str(zone)
+    return OTHER_ZONE
+
+
+class RollingCounter:
+    """
+    Counts per (row, level) over a ring of fixed-size time buckets
+
+    Rows are added on demand (one per zone). Moving to a new bucket clears the
+    bucket it reuses and subtracts it from the running totals, so the cost of
+    expiry is paid once per bucket rather than per read.
+    """
+
+    def __init__(self, resolution: float, slots: int, levels: int = len(LEVEL_NAMES)):
+        """
+        Initialize rolling counter
+
+        Args:
+            resolution (float): Bucket size in seconds
+            slots (int): Buckets in the ring (window = resolution * slots)
+            levels (int): Level columns
+        """
+        self.resolution = resolution
+        self.slots = slots
+        self.buckets = np.zeros((slots, 0, levels), dtype=np.int64)
+        self.totals = np.zeros((0, levels), dtype=np.int64)
+        self.current = None  # absolute number of the newest bucket
+
+    @property
+    def window(self) -> float:
+        return self.resolution * self.slots
+
+    def add_row(self):
+        """Append a zero row (a new zone)"""
+        levels = self.totals.shape[1]
+        self.buckets = np.concatenate((self.buckets, np.zeros((self.slots, 1, levels), dtype=np.int64)), axis=1)
+        self.totals = np.concatenate((self.totals, np.zeros((1, levels), dtype=np.int64)))
+
+    def advance(self, timestamp: float):
+        """
+        Move the ring forward to the bucket holding a time, expiring old buckets
+
+        Args:
+            timestamp (float): Current time (seconds)
+        """
+        bucket = int(timestamp // self.resolution)
+        if self.current is None:
+            self.current = bucket
+            return
+        steps = bucket - self.current
+        if steps <= 0:
+            return
+        if steps >= self.slots:
+            self.buckets[:] = 0
+            self.totals[:] = 0
+        else:
+            for expired in range(self.current + 1, bucket + 1):
+                slot = expired % self.slots
+                self.totals -= self.buckets[slot]
+                self.buckets[slot] = 0
+        self.current = bucket
+
+    def add(self, row: int, level: int, timestamp: float, count: int = 1):
+        """
+        Count events at a time
+
+        Args:
+            row (int): Row (zone) index
+            level (int): Level column
+            timestamp (float): Event time (seconds); events older than the window are ignored
+            count (int): Number of events
+        """
+        self.advance(timestamp)
+        bucket = int(timestamp // self.resolution)
+        if bucket <= self.current - self.slots:
+            return
+        self.buckets[bucket % self.slots, row, level] += count
+        self.totals[row, level] += count
+
+
+class ThreatStatistics:
+    """
+    Detection / threat counts per zone and level over rolling windows
+    Thread-safe: the detector thread records while the backend reads snapshots
+    """
+
+    def __init__(self, windows=WINDOWS, max_zones=MAX_STAT_ZONES):
+        """
+        Initialize threat statistics
+
+        Args:
+            windows (tuple): (name, bucket seconds, buckets) per window
+            max_zones (int): Zone rows kept (plus "other", where further zones are counted)
+        """
+        self.max_zones = max_zones
+        self._rows = {}
+        self._counters = {name: RollingCounter(resolution, slots) for name, resolution, slots in windows}
+        self._lock = threading.Lock()
+
+    def record(self, zone, level: int, timestamp=None, count: int = 1):
+        """
+        Count a detection
+
+        Args:
+            zone (str): Zone name (None = outside any zone / no geofence; anything but
+                a name, or a zone beyond max_zones, counts as "other")
+            level (int): Threat level index (0=NONE ... 3=HIGH)
+            timestamp (float): Event time in seconds (defaults to now)
+            count (int): Number of detections
+        """
+        zone = _zone_name(zone)
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            row = self._rows.get(zone)
+            if row is None and len(self._rows) >= self.max_zones:
+                zone = OTHER_ZONE
+                row = self._rows.get(zone)
+            if row is None:
+                row = self._rows[zone] = len(self._rows)
+                for counter in self._counters.values():
+                    counter.add_row()
+            for counter in self._counters.values():
+                counter.add(row, level, timestamp, count)
+
+    def snapshot(self, now=None) -> dict:
+        """
+        Read every window's totals (cost depends on zones and levels, not on events)
+
+        Args:
+            now (float): Current time in seconds (defaults to now)
+
+        Returns:
+            dict: window name -> {"window_s", "total", "per_minute", "by_level", "by_zone"}
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            zones = list(self._rows)
+            totals = {}
+            for name, counter in self._counters.items():
+                counter.advance(now)
+                totals[name] = (counter.window, counter.totals.copy())
+
+        return {name: _window_snapshot(window, counts, zones) for name, (window, counts) in totals.items()}
+
+
+def _window_snapshot(window: float, counts: np.ndarray, zones: list) -> dict:
+    total = int(counts.sum())
+    return {
+        "window_s": window,
+        "total": total,
+        "per_minute": round(total * 60.0 / window, 2),
+        "by_level": dict(zip(LEVEL_NAMES, counts.sum(axis=0).tolist())),
+        "by_zone": {
+            zone: dict(zip(LEVEL_NAMES, counts[row].tolist()))
+            for row, zone in enumerate(zones)
+            if counts[row].any()
+        }
+    }
+
+
+def counts_snapshot(window_counts: dict, max_zones=MAX_STAT_ZONES) -> dict:
+    """
+    Build a snapshot (the ThreatStatistics.snapshot shape) from counts aggregated elsewhere,
+    such as the shared threat store
+
+    Args:
+        window_counts (dict): window name -> (window seconds, [(zone, level index, count), ...])
+        max_zones (int): Zone rows kept; the least active further zones count as "other"
+
+    Returns:
+        dict: window name -> {"window_s", "total", "per_minute", "by_level", "by_zone"}
+    """
+    snapshot = {}
+    for name, (window, rows) in window_counts.items():
+        per_zone = {}
+        for zone, level, count in rows:
+            per_zone.setdefault(_zone_name(zone), np.zeros(len(LEVEL_NAMES), dtype=np.int64))[level] += count
+        kept = sorted((zone for zone in per_zone if zone != OTHER_ZONE), key=lambda zone: -int(per_zone[zone].sum()))
+        kept = kept[:max_zones]
+        other = sum((per_zone[zone] for zone in per_zone if zone not in kept), np.zeros(len(LEVEL_NAMES), dtype=np.int64))
+        zones = kept + [OTHER_ZONE]
+        counts = np.array([per_zone[zone] for zone in kept] + [other], dtype=np.int64)
+        snapshot[name] = _window_snapshot(window, counts, zones)
+    return snapshot
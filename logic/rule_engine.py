@@ -0,0 +1,327 @@
+"""
+Compiled Threat Rule Engine for AeroGuard AI
+Declarative site rules over class, zone, bbox size, time of day, track age and speed
+Rules are compiled once at load time into vectorized NumPy predicates
+Each rule set is evaluated over whole detection batches in a few array operations
+
+Rule file format (JSON list, evaluated in order - first matching rule wins):
+[
+    {
+        "name": "night-core-intrusion",
+        "level": "HIGH",
+        "when": {
+            "class_name": ["drone"],
+            "zone": ["core"],
+            "confidence": {"min": 0.5},
+            "bbox_area": {"min": 400},
+            "hour": {"between": [20, 6]},
+            "track_age": {"min": 1.0},
+            "speed": {"max": 40}
+        }
+    }
+]
+
+Detections matching no rule keep their confidence-threshold classification.
+"""
+
+import json
+import math
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Threat level names -> level index (matches threat_evaluation.THREAT_LEVELS)
+LEVEL_INDEX = {"NONE": 0, "LOW": 1, "MEDIUM": 2, "HIGH": 3}
+
+# Numeric fields usable with {"min": x, "max": y}
+NUMERIC_FIELDS = ("confidence", "bbox_area", "bbox_width", "bbox_height", "track_age", "speed")
+
+# Categorical fields usable with a list of allowed values
+CATEGORICAL_FIELDS = ("class_name", "zone", "camera_id")
+
+
+class RuleError(ValueError):
+    """Raised when a rule definition is invalid"""
+
+
+def _number(value, default: float) -> float:
+    # Column value of an optional numeric field: null, non-numeric or non-finite -> default
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        return default
+    try:
+        value = float(value)
+    except OverflowError:
+        return default
+    return value if math.isfinite(value) else default
+
+
+def _bbox(bbox) -> list:
+    if isinstance(bbox, (list, tuple)) and len(bbox) == 4:
+        return [_number(v, 0.0) for v in bbox]
+    return [0.0, 0.0, 0.0, 0.0]
+
+
+class DetectionColumns:
+    """
+    Column view over a detection batch
+    Derived columns (bbox area, hour of day, ...) are computed on first use and cached
+    """
+
+    def __init__(self, columns: dict):
+        """
+        Initialize detection columns
+
+        Args:
+            columns (dict): Field name -> array (one entry per detection). Must
+                contain "confidence"; "bbox" is an (N, 4) array.
+        """
+        self._columns = dict(columns)
+        self.size = len(self._columns["confidence"])
+
+    @classmethod
+    def from_dicts(cls, detections: list):
+        """
+        Build columns from detection dicts
+
+        The "confidence" column uses the per-track smoothed confidence when present.
+        Missing, null, non-numeric or non-finite numeric fields take the column default
+        (0, or the current time for timestamp_s); a timestamp_s of 0 is kept.
+
+        Args:
+            detections (list): Detection dicts as produced by the vision module
+
+        Returns:
+            DetectionColumns: Column view over the detections
+        """
+        get = lambda key, default: [d.get(key, default) for d in detections]
+        now = time.time()
+        return cls({
+            "confidence": np.array([
+                _number(d.get("smoothed_confidence"), _number(d.get("confidence"), 0.0)) for d in detections
+            ], dtype=np.float64),
+            "bbox": np.array([_bbox(b) for b in get("bbox", None)], dtype=np.float64).reshape(-1, 4),
+            "class_name": np.array([str(c) for c in get("class_name", "unknown")]),
+            "zone": np.array(["" if z is None else str(z) for z in get("zone", None)]),
+            "camera_id": np.array(["" if c is None else str(c) for c in get("camera_id", None)]),
+            "timestamp_s": np.array([_number(t, now) for t in get("timestamp_s", None)], dtype=np.float64),
+            "track_age": np.array([_number(v, 0.0) for v in get("track_age", None)], dtype=np.float64),
+            "speed": np.array([_number(v, 0.0) for v in get("speed", None)], dtype=np.float64)
+        })
+
+    def __getitem__(self, name):
+        column = self._columns.get(name)
+        if column is None:
+            column = self._columns[name] = self._derive(name)
+        return column
+
+    def _derive(self, name):
+        if name in ("bbox_width", "bbox_height", "bbox_area"):
+            bbox = self._columns.get("bbox")
+            if bbox is None:
+                bbox = self._columns["bbox"] = np.zeros((self.size, 4))
+            width = bbox[:, 2] - bbox[:, 0]
+            height = bbox[:, 3] - bbox[:, 1]
+            self._columns["bbox_width"] = width
+            self._columns["bbox_height"] = height
+            self._columns["bbox_area"] = width * height
+            return self._columns[name]
+
+        if name == "hour":
+            timestamps = self["timestamp_s"]
+            offset = time.localtime(float(timestamps[0]) if self.size else time.time()).tm_gmtoff
+            return ((timestamps + offset) % 86400) / 3600.0
+
+        if name == "timestamp_s":
+            return np.full(self.size, time.time())
+        if name in ("track_age", "speed"):
+            return np.zeros(self.size)
+        if name in CATEGORICAL_FIELDS:
+            return np.full(self.size, "")
+
+        raise KeyError(name)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value)
+
+
+def _compile_range(field, spec):
+    if not isinstance(spec, dict) or not spec or not set(spec) <= {"min", "max"}:
+        raise RuleError(f"'{field}' expects {{\"min\": x, \"max\": y}}, got {spec!r}")
+    for bound, value in spec.items():
+        if not _is_number(value):
+            raise RuleError(f"'{field}' {bound} must be a number, got {value!r}")
+    low = float(spec.get("min", -np.inf))
+    high = float(spec.get("max", np.inf))
+    if low > high:
+        raise RuleError(f"'{field}' min {low} is above max {high}")
+    return lambda cols: (cols[field] >= low) & (cols[field] <= high)
+
+
+def _compile_membership(field, spec):
+    values = spec if isinstance(spec, list) else [spec]
+    if not values or not all(isinstance(v, (str, int, float)) and not isinstance(v, bool) for v in values):
+        raise RuleError(f"'{field}' expects a value or a list of values, got {spec!r}")
+    allowed = np.array([str(v) for v in values])
+    return lambda cols: np.isin(cols[field], allowed)
+
+
+def _compile_hour(spec):
+    between = spec.get("between") if isinstance(spec, dict) else None
+    if (not isinstance(between, list) or len(between) != 2
+            or not all(_is_number(h) and 0 <= h <= 24 for h in between)):
+        raise RuleError(f"'hour' expects {{\"between\": [start, end]}} with hours 0-24, got {spec!r}")
+    start, end = (float(h) for h in between)
+    if start <= end:
+        return lambda cols: (cols["hour"] >= start) & (cols["hour"] < end)
+    # Window wraps past midnight (e.g. 20 -> 6)
+    return lambda cols: (cols["hour"] >= start) | (cols["hour"] < end)
+
+
+def compile_condition(field, spec):
+    """
+    Compile one rule condition into a vectorized predicate
+
+    Args:
+        field (str): Detection field the condition applies to
+        spec: Condition specification from the rule file
+
+    Returns:
+        callable: Function mapping DetectionColumns -> boolean mask
+    """
+    if field in NUMERIC_FIELDS:
+        return _compile_range(field, spec)
+    if field in CATEGORICAL_FIELDS:
+        return _compile_membership(field, spec)
+    if field == "hour":
+        return _compile_hour(spec)
+    raise RuleError(f"Unknown rule field: {field}")
+
+
+class CompiledRule:
+    """
+    A single rule compiled into a list of vectorized predicates
+    """
+
+    __slots__ = ("name", "level", "predicates")
+
+    def __init__(self, definition: dict):
+        """
+        Compile a rule definition
+
+        Args:
+            definition (dict): Rule with "name", "level" and "when" conditions
+
+        Raises:
+            RuleError: If the rule is not an object of the expected shape
+        """
+        if not isinstance(definition, dict):
+            raise RuleError(f"Rule must be an object, got {definition!r}")
+        self.name = str(definition.get("name", "unnamed"))
+        level = definition.get("level")
+        if not isinstance(level, str) or level.upper() not in LEVEL_INDEX:
+            raise RuleError(f"Rule '{self.name}' has invalid level: {level!r}")
+        self.level = LEVEL_INDEX[level.upper()]
+        conditions = definition.get("when", {})
+        if not isinstance(conditions, dict):
+            raise RuleError(f"Rule '{self.name}': 'when' must be an object, got {conditions!r}")
+        try:
+            self.predicates = [compile_condition(field, spec) for field, spec in conditions.items()]
+        except RuleError as e:
+            raise RuleError(f"Rule '{self.name}': {str(e)}") from None
+
+    def match(self, columns: DetectionColumns, candidates: np.ndarray) -> np.ndarray:
+        """
+        Evaluate the rule over a batch
+
+        Args:
+            columns (DetectionColumns): Detection batch
+            candidates (np.ndarray): Mask of detections still unassigned
+
+        Returns:
+            np.ndarray: Boolean mask of matching detections
+        """
+        mask = candidates.copy()
+        for predicate in self.predicates:
+            if not mask.any():
+                break
+            mask &= predicate(columns)
+        return mask
+
+
+class RuleSet:
+    """
+    Ordered, compiled rule set applied to detection batches
+    """
+
+    def __init__(self, definitions: list):
+        """
+        Compile a rule set
+
+        Args:
+            definitions (list): Rule definitions (first match wins)
+
+        Raises:
+            RuleError: If the definitions are not a list or any rule is invalid
+        """
+        if not isinstance(definitions, list):
+            raise RuleError(f"Rule file must contain a JSON list of rules, got {type(definitions).__name__}")
+        self.rules = [CompiledRule(definition) for definition in definitions]
+
+    def __len__(self):
+        return len(self.rules)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Load and compile a rule set from a JSON file
+
+        Args:
+            path (str or Path): Rule file
+
+        Returns:
+            RuleSet: Compiled rule set
+        """
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def apply(self, columns: DetectionColumns, levels: np.ndarray) -> tuple:
+        """
+        Apply rules on top of base threat levels
+
+        Args:
+            columns (DetectionColumns): Detection batch
+            levels (np.ndarray): Base level index per detection
+
+        Returns:
+            tuple: (levels, rule_index) - rule_index is -1 where no rule matched
+        """
+        levels = np.array(levels, copy=True)
+        rule_index = np.full(columns.size, -1, dtype=np.int32)
+        unassigned = np.ones(columns.size, dtype=bool)
+
+        for index, rule in enumerate(self.rules):
+            matched = rule.match(columns, unassigned)
+            if matched.any():
+                levels[matched] = rule.level
+                rule_index[matched] = index
+                unassigned &= ~matched
+                if not unassigned.any():
+                    break
+
+        return levels, rule_index
+
+    def rule_names(self, rule_index: np.ndarray) -> list:
+        """
+        Map rule indices to rule names
+
+        Args:
+            rule_index (np.ndarray): Rule index per detection (-1 = no rule)
+
+        Returns:
+            list: Rule name per detection (None where no rule matched)
+        """
+        return [self.rules[i].name if i >= 0 else None for i in rule_index]
@@ -0,0 +1,284 @@
+"""
+Multi-Sensor Fusion for AeroGuard AI
+Joins camera detections with RF / acoustic events over a sliding time window
+Events are bucketed by site-plane cell; each cell keeps a time-sorted index, so a
+window lookup is a bisect (O(log n)) plus the events actually in the window
+Joined events share a fusion id (one fused threat) and a noisy-OR combined score
+An event only joins observations from other sensors within the join radius, so two
+objects seen by one sensor are never fused, and the fusion id is an annotation: track
+state stays keyed by each sensor's own track / object id
+
+Event records use the detection dict shape, plus:
+    "source":        "camera" (default), "rf", "acoustic", ...
+    "sensor_id":     sensor identifier (defaults to camera_id for cameras)
+    "site_position": [x, y] in the shared site plane (from camera calibration or
+                     the sensor's own localisation); events without a position
+                     cannot be matched to an object and are never joined
+    "confidence":    detection confidence (0-1)
+    "timestamp_s":   event time (epoch seconds)
+"""
+
+import math
+import time
+import logging
+import threading
+from bisect import bisect_left, bisect_right
+from itertools import count
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+FUSION_WINDOW = 1.0      # seconds either side of an event that count as simultaneous
+FUSION_CELL_SIZE = 10.0  # site-plane units (metres) per spatial bucket; also the join radius
+
+# Weight of each source's confidence in the combined score
+SOURCE_WEIGHTS = {
+    "camera": 1.0,
+    "rf": 0.8,
+    "acoustic": 0.6
+}
+DEFAULT_SOURCE_WEIGHT = 0.5
+
+SOURCE_CAMERA = "camera"
+
+
+class TimeIndex:
+    """
+    Time-sorted event list with amortised O(1) eviction from the front
+
+    Events arrive almost in order, so inserts are usually appends; late events
+    are placed with a bisect. Window queries are two bisects.
+    """
+
+    __slots__ = ("times", "events", "head")
+
+    def __init__(self):
+        self.times = []
+        self.events = []
+        self.head = 0
+
+    def __len__(self):
+        return len(self.times) - self.head
+
+    def insert(self, timestamp: float, event):
+        """
+        Insert an event keeping time order
+
+        Args:
+            timestamp (float): Event time
+            event: Stored entry
+        """
+        if not self.times or timestamp >= self.times[-1]:
+            self.times.append(timestamp)
+            self.events.append(event)
+        else:
+            index = bisect_right(self.times, timestamp, self.head)
+            self.times.insert(index, timestamp)
+            self.events.insert(index, event)
+
+    def evict_before(self, timestamp: float):
+        """
+        Drop events older than a time
+
+        Args:
+            timestamp (float): Oldest time to keep
+        """
+        self.head = bisect_left(self.times, timestamp, self.head)
+        # Compact once the dead prefix dominates, keeping eviction amortised O(1)
+        if self.head > 64 and self.head * 2 > len(self.times):
+            del self.times[:self.head]
+            del self.events[:self.head]
+            self.head = 0
+
+    def window(self, start: float, end: float) -> list:
+        """
+        Events with start <= time <= end
+
+        Args:
+            start (float): Window start
+            end (float): Window end
+
+        Returns:
+            list: Stored entries in time order
+        """
+        low = bisect_left(self.times, start, self.head)
+        high = bisect_right(self.times, end, low)
+        return self.events[low:high]
+
+
+class FusionEvent:
+    """
+    Compact entry stored in the fusion indexes
+    """
+
+    __slots__ = ("timestamp", "source", "sensor", "score", "x", "y", "fusion_id")
+
+    def __init__(self, timestamp, source, sensor, score, x, y, fusion_id):
+        self.timestamp = timestamp
+        self.source = source
+        self.sensor = sensor
+        self.score = score
+        self.x = x
+        self.y = y
+        self.fusion_id = fusion_id
+
+
+class SensorFusion:
+    """
+    Time-windowed, spatially bucketed join of events from several sensors
+
+    Every event is matched against other sensors' events from the last/next
+    `window` seconds within `cell_size` of it (neighbouring cells only). The
+    best match lends its fusion id, so all sensors observing one object report
+    one fused threat. Support from other source types is combined with noisy-OR:
+        support = 1 - prod(1 - weight_s * confidence_s)
+    Thread-safe: camera pipelines of one detector process share an instance.
+    """
+
+    def __init__(self, window=FUSION_WINDOW, cell_size=FUSION_CELL_SIZE, source_weights=None):
+        """
+        Initialize sensor fusion
+
+        Args:
+            window (float): Seconds either side of an event considered simultaneous
+            cell_size (float): Spatial bucket size and join radius (site-plane units)
+            source_weights (dict): Source -> weight of its confidence (0-1)
+        """
+        self.window = window
+        self.cell_size = cell_size
+        self.source_weights = dict(SOURCE_WEIGHTS, **(source_weights or {}))
+
+        self._cells = {}             # (gx, gy) -> TimeIndex of positioned events
+        self._ids = count(1)
+        self._latest = -math.inf
+        self._evicted_at = -math.inf
+
+        self.fused_count = 0
+        self.event_count = 0
+        self._lock = threading.Lock()
+
+    def _weight(self, source: str) -> float:
+        return self.source_weights.get(source, DEFAULT_SOURCE_WEIGHT)
+
+    def _evict(self, now: float):
+        # Late events may still arrive up to one window after newer ones
+        cutoff = now - 2 * self.window
+        if cutoff - self._evicted_at < self.window:
+            return
+        self._evicted_at = cutoff
+
+        for key in list(self._cells):
+            index = self._cells[key]
+            index.evict_before(cutoff)
+            if not len(index):
+                del self._cells[key]
+
+    def _candidates(self, timestamp: float, sensor: str, x: float, y: float) -> list:
+        # Other sensors' events in the time window within the join radius
+        start, end = timestamp - self.window, timestamp + self.window
+        candidates = []
+        gx, gy = int(x // self.cell_size), int(y // self.cell_size)
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                index = self._cells.get((gx + dx, gy + dy))
+                if index is not None:
+                    candidates += [
+                        event for event in index.window(start, end)
+                        if event.sensor != sensor and math.hypot(event.x - x, event.y - y) <= self.cell_size
+                    ]
+        return candidates
+
+    def fuse(self, event: dict) -> dict:
+        """
+        Add an event to the window and annotate it with its fused threat
+
+        Events without a site position cannot be placed and are returned unchanged.
+
+        Args:
+            event (dict): Event record (see module docstring)
+
+        Returns:
+            dict: Copy of the event with "fusion_id", "fused_sources" and
+                  "fusion_support" (combined score contributed by other sources)
+        """
+        source = event.get("source", SOURCE_CAMERA)
+        position = event.get("site_position")
+        if position is None:
+            return event
+
+        timestamp = event.get("timestamp_s")
+        if timestamp is None:
+            timestamp = time.time()
+        sensor = str(event.get("sensor_id", event.get("camera_id", source)))
+        score = self._weight(source) * float(event.get("confidence", 0))
+        x, y = float(position[0]), float(position[1])
+
+        with self._lock:
+            self._latest = max(self._latest, timestamp)
+            self._evict(self._latest)
+            candidates = self._candidates(timestamp, sensor, x, y)
+
+            # Strongest observation per other source type, and the best match overall for the id
+            best_by_source = {}
+            best = None
+            for candidate in candidates:
+                if candidate.source != source and candidate.score > best_by_source.get(candidate.source, -1.0):
+                    best_by_source[candidate.source] = candidate.score
+                if best is None or candidate.score > best.score:
+                    best = candidate
+
+            fusion_id = best.fusion_id if best is not None else next(self._ids)
+            miss = 1.0
+            for other_score in best_by_source.values():
+                miss *= 1.0 - other_score
+            support = 1.0 - miss
+
+            entry = FusionEvent(timestamp, source, sensor, score, x, y, fusion_id)
+            key = (int(x // self.cell_size), int(y // self.cell_size))
+            index = self._cells.get(key)
+            if index is None:
+                index = self._cells[key] = TimeIndex()
+            index.insert(timestamp, entry)
+
+            self.event_count += 1
+            if best_by_source:
+                self.fused_count += 1
+
+        return dict(
+            event,
+            source=source,
+            fusion_id=fusion_id,
+            fused_sources=sorted({source, *best_by_source}),
+            fusion_support=round(support, 4)
+        )
+
+    def get_stats(self) -> dict:
+        """
+        Get fusion statistics
+
+        Returns:
+            dict: Window configuration, indexed events and fused event count
+        """
+        with self._lock:
+            return {
+                "window_s": self.window,
+                "cell_size": self.cell_size,
+                "active_cells": len(self._cells),
+                "indexed_events": sum(len(index) for index in self._cells.values()),
+                "events": self.event_count,
+                "fused_events": self.fused_count
+            }
+
+
+def combine_scores(score: float, support: float) -> float:
+    """
+    Noisy-OR of an event's own threat score with support from other sensors
+
+    Args:
+        score (float): The event's own threat score (0-1)
+        support (float): Combined support from other sources (0-1)
+
+    Returns:
+        float: Fused threat score (0-1)
+    """
+    return 1.0 - (1.0 - score) * (1.0 - support)
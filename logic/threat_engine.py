@@ -5,167 +5,974 @@ Triggers Flask API endpoint for confirmed threats
 Implements SEE-THINK-ACT decision pipeline
 """
 
+import os
 import sys
+import math
+import time
+import json
+import atexit
+import threading
+from collections import deque
 from pathlib import Path
 from datetime import datetime
+from urllib.parse import urljoin
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 import logging
 
+# Add parent directory to path for relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from logic.camera_dedup import CrossCameraDeduplicator, load_calibrations
+from logic.track_state import TrackStateStore, TrackAssociator, track_key, has_track_identity
+from logic.kinematics import kinematic_score
+from logic.geofence import GeofenceMap
+from logic.sensor_fusion import SensorFusion, combine_scores
+# Classification lives in a side-effect-free module (the backend imports it); re-exported here
+from logic.threat_evaluation import (
+    ThreatEvaluator, THREAT_LEVELS, THREAT_ACTIONS, THREAT_API_TRIGGERED,
+    CONFIDENCE_THRESHOLD, MEDIUM_THREAT_CONFIDENCE, HIGH_THREAT_CONFIDENCE,
+    THREAT_CONFIG_FILE, THREAT_RULES_FILE,
+    load_threat_rules, load_threat_thresholds, load_threat_evaluator, default_threat_evaluator
+)
+from logic.config_reload import ConfigWatcher
+from logic.rolling_stats import ThreatStatistics
+from logic.wire_format import encode_trigger, CONTENT_TYPE_JSON, CONTENT_TYPE_BINARY
+from logic.trigger_delivery import CircuitBreaker, TriggerSpool, ReliableTriggerSender
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
     format='[%(asctime)s] [%(levelname)s] %(message)s'
 )
 logger = logging.getLogger(__name__)
-
-# Configuration
-CONFIDENCE_THRESHOLD = 0.75
-HIGH_THREAT_CONFIDENCE = 0.90
-MEDIUM_THREAT_CONFIDENCE = 0.80
+# Own logger for the periodic stats line, so quieting per-detection logs keeps it
+stats_logger = logging.getLogger("logic.engine_stats")
 
 # Flask API endpoint
-FLASK_API_URL = "http://localhost:5000/trigger"
+FLASK_API_URL = os.getenv("FLASK_API_URL", "http://localhost:5000/api/trigger")
 API_TIMEOUT = 5  # seconds
 
+# Trigger transport: "http" (split deployment) or "inprocess" (engine and backend in one process)
+TRIGGER_TRANSPORT = os.getenv("TRIGGER_TRANSPORT", "http")
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+# Keep-alive HTTP client settings
+API_POOL_SIZE = int(os.getenv("API_POOL_SIZE", 4))                    # pooled connections to the backend
+API_CONNECT_TIMEOUT = float(os.getenv("API_CONNECT_TIMEOUT", 1.0))    # seconds to establish TCP connection
+API_READ_TIMEOUT = float(os.getenv("API_READ_TIMEOUT", API_TIMEOUT))  # seconds to wait for the response
+API_WARMUP_PATH = "/api/health"
+
+# Trigger wire format: "auto" (binary if the backend advertises it), "json" or "binary"
+WIRE_FORMAT = os.getenv("WIRE_FORMAT", "auto")
+
+# Per-track alert state
+ALERT_COOLDOWN = float(os.getenv("ALERT_COOLDOWN", 30.0))  # seconds between repeat triggers per object
+TRACK_TTL = float(os.getenv("TRACK_TTL", 60.0))            # seconds before an unseen track is forgotten
+MAX_TRACKS = int(os.getenv("MAX_TRACKS", 10000))           # upper bound on remembered tracks
+TRACK_ASSOCIATION_GATE = float(os.getenv("TRACK_ASSOCIATION_GATE", 160.0))  # px an untracked box may move per sighting
+TRACK_ASSOCIATION_TTL = float(os.getenv("TRACK_ASSOCIATION_TTL", 2.0))      # s unseen before an untracked object is new
+
+# Temporal confidence smoothing per track ("kofn", "ema" or "none")
+CONFIDENCE_SMOOTHING = os.getenv("CONFIDENCE_SMOOTHING", "kofn")
+SMOOTHING_K = int(os.getenv("SMOOTHING_K", 2))              # kofn: frames that must reach a confidence ...
+SMOOTHING_N = int(os.getenv("SMOOTHING_N", 3))              # ... within the last n frames of the track
+SMOOTHING_ALPHA = float(os.getenv("SMOOTHING_ALPHA", 0.6))  # ema: weight of the newest frame
+
+# Kinematic scoring: zone whose entry time raises the threat score
+KINEMATIC_TARGET_ZONE = os.getenv("KINEMATIC_TARGET_ZONE", "core")
+
+# Multi-sensor fusion of camera, RF and acoustic events (opt-in)
+SENSOR_FUSION = os.getenv("SENSOR_FUSION", "false").lower() == "true"
+FUSION_WINDOW = float(os.getenv("FUSION_WINDOW", 1.0))        # seconds either side counted as simultaneous
+FUSION_CELL_SIZE = float(os.getenv("FUSION_CELL_SIZE", 10.0))  # site-plane join radius / bucket size
+
+# Trigger coalescing for MEDIUM/LOW lanes (HIGH triggers never wait for a window)
+# Batching only pays off over HTTP, so the in-process transport defaults to no window
+TRIGGER_BATCH_WINDOW = float(os.getenv(
+    "TRIGGER_BATCH_WINDOW",
+    0.1 if TRIGGER_TRANSPORT == "http" else 0.0
+))  # seconds to collect a batch
+TRIGGER_BATCH_SIZE = int(os.getenv("TRIGGER_BATCH_SIZE", 16))         # flush early at this many triggers
+
+# Priority dispatch (DISPATCH_WORKERS=0 sends every trigger synchronously on the detector thread)
+DISPATCH_WORKERS = int(os.getenv("DISPATCH_WORKERS", 4))      # concurrent sends across all lanes
+DISPATCH_CAPACITY = int(os.getenv("DISPATCH_CAPACITY", 256))  # queued triggers before shedding
+DISPATCH_CONCURRENCY = {                                       # max concurrent sends per lane (by level index)
+    3: int(os.getenv("DISPATCH_HIGH_CONCURRENCY", 4)),
+    2: int(os.getenv("DISPATCH_MEDIUM_CONCURRENCY", 2)),
+    1: int(os.getenv("DISPATCH_LOW_CONCURRENCY", 1))
+}
+
+# Backend outage handling
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", 3))  # failures before failing fast
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", 10.0))     # seconds before a half-open probe
+TRIGGER_SPOOL_FILE = os.getenv(
+    "TRIGGER_SPOOL_FILE",
+    str(Path(__file__).parent.parent / "threat_logs" / "trigger_spool.jsonl")
+)
+
+# Periodic log of every stage's statistics (ENGINE_STATS_INTERVAL=0 disables)
+ENGINE_STATS_INTERVAL = float(os.getenv("ENGINE_STATS_INTERVAL", 60.0))  # seconds between stats lines
+
+# Threshold and rule files are hot-reloaded (CONFIG_RELOAD_INTERVAL=0 disables)
+CONFIG_RELOAD_INTERVAL = float(os.getenv("CONFIG_RELOAD_INTERVAL", 2.0))  # seconds between file checks
+
+# Geofence zones (enabled when the zone file exists)
+GEOFENCE_FILE = os.getenv(
+    "GEOFENCE_FILE",
+    str(Path(__file__).parent.parent / "config" / "geofence_zones.json")
+)
+
+# Cross-camera deduplication (enabled when the calibration file exists)
+CAMERA_CALIBRATION_FILE = os.getenv(
+    "CAMERA_CALIBRATION_FILE",
+    str(Path(__file__).parent.parent / "config" / "camera_calibration.json")
+)
+
+
+# Global threat evaluator instance (swapped as a whole on config reload)
+threat_evaluator = default_threat_evaluator()
+
+
+def reload_threat_evaluator() -> bool:
+    """
+    Rebuild the threat evaluator from the config files and swap it in
+    
+    The new evaluator is fully validated before the swap; an invalid config
+    leaves the running evaluator in place. Track state (cooldowns, history,
+    smoothing) lives outside the evaluator and is preserved.
+    
+    Returns:
+        bool: True if the new configuration is now active
+    """
+    global threat_evaluator
+    
+    try:
+        evaluator = load_threat_evaluator()
+    except (OSError, ValueError) as e:
+        logger.error(f"[CONFIG] Rejected threat config - keeping current configuration: {str(e)}")
+        return False
+    
+    # Single reference assignment: each evaluation sees either the old or the new evaluator
+    threat_evaluator = evaluator
+    logger.info(
+        f"[CONFIG] Threat configuration reloaded: thresholds "
+        f"{evaluator.low_threshold}/{evaluator.medium_threshold}/{evaluator.high_threshold}, "
+        f"{len(evaluator.rules) if evaluator.rules else 0} rule(s)"
+    )
+    return True
+
+
+# Global config watcher (None = hot reload disabled)
+config_watcher = ConfigWatcher(
+    [THREAT_CONFIG_FILE, THREAT_RULES_FILE],
+    reload_threat_evaluator,
+    interval=CONFIG_RELOAD_INTERVAL
+) if CONFIG_RELOAD_INTERVAL > 0 else None
+
+
+def start_config_watcher():
+    """Start hot reloading of thresholds and rules (no-op when disabled or already running)"""
+    if config_watcher is not None:
+        config_watcher.start()
+
+
+# Global per-track alert state (cooldown / escalation)
+track_states = TrackStateStore(
+    cooldown=ALERT_COOLDOWN,
+    ttl=TRACK_TTL,
+    max_tracks=MAX_TRACKS,
+    smoothing=CONFIDENCE_SMOOTHING,
+    smoothing_options={"k": SMOOTHING_K, "n": SMOOTHING_N, "alpha": SMOOTHING_ALPHA}
+)
+
+# Stable identities for boxes without a tracker id (nearest-neighbour association)
+track_associator = TrackAssociator(gate=TRACK_ASSOCIATION_GATE, ttl=TRACK_ASSOCIATION_TTL, max_objects=MAX_TRACKS)
+
+
+def load_camera_deduplicator(path=CAMERA_CALIBRATION_FILE):
+    """
+    Build the cross-camera deduplicator from a calibration file
+    
+    Args:
+        path (str): Camera homography calibration file (JSON)
+    
+    Returns:
+        CrossCameraDeduplicator: Deduplicator, or None if no calibration is available
+    """
+    if not path or not os.path.exists(path):
+        return None
+    
+    try:
+        calibrations = load_calibrations(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"[DEDUP] Failed to load camera calibration {path}: {str(e)}")
+        return None
+    
+    logger.info(f"[DEDUP] Cross-camera deduplication enabled for {len(calibrations)} camera(s)")
+    return CrossCameraDeduplicator(calibrations)
+
+
+def load_geofence(path=GEOFENCE_FILE):
+    """
+    Load and rasterize geofence zones
+    
+    Args:
+        path (str): Zone file (JSON)
+    
+    Returns:
+        GeofenceMap: Rasterized zones, or None if no valid zone file is available
+    """
+    if not path or not os.path.exists(path):
+        return None
+    
+    try:
+        geofence = GeofenceMap.from_file(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.error(f"[GEOFENCE] Failed to load zones {path}: {str(e)}")
+        return None
+    
+    logger.info(f"[GEOFENCE] Zones loaded for {len(geofence)} camera(s)")
+    return geofence
+
+
+# Global geofence zones (None = no zones configured)
+geofence = load_geofence()
+
+# Global rolling detection counts per zone and level (in the periodic stats log)
+threat_stats = ThreatStatistics()
+
+
+# Global sensor fusion stage (None = camera-only)
+sensor_fusion = SensorFusion(window=FUSION_WINDOW, cell_size=FUSION_CELL_SIZE) if SENSOR_FUSION else None
+
+
+# Global cross-camera deduplicator (None = single camera / uncalibrated)
+camera_deduplicator = load_camera_deduplicator()
+
+
+def create_api_session(pool_size=API_POOL_SIZE) -> requests.Session:
+    """
+    Create a pooled keep-alive HTTP session for backend calls
+    
+    Args:
+        pool_size (int): Maximum number of pooled connections per host
+    
+    Returns:
+        requests.Session: Session reusing TCP connections between triggers
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Global keep-alive session used for all backend calls
+api_session = create_api_session()
+
+
+def fetch_backend_health(url=None):
+    """
+    Query the backend health endpoint over the keep-alive session
+    
+    Args:
+        url (str): Backend URL (defaults to FLASK_API_URL)
+    
+    Returns:
+        dict: Health response ({} if not JSON), or None if the backend is unreachable
+    """
+    health_url = urljoin(url or FLASK_API_URL, API_WARMUP_PATH)
+    try:
+        response = api_session.get(health_url, timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT))
+    except requests.exceptions.RequestException:
+        logger.warning(f"[API] Backend not reachable at {health_url} - will connect on first trigger")
+        return None
+    
+    logger.info(f"[API] Connection to backend pre-opened ({response.status_code})")
+    try:
+        return response.json()
+    except ValueError:
+        return {}
+
+
+def warm_up_api_connection(url=None) -> bool:
+    """
+    Pre-open the pooled connection to the backend
+    Called at startup so the first real trigger skips TCP connection setup
+    
+    Args:
+        url (str): Backend URL (defaults to FLASK_API_URL)
+    
+    Returns:
+        bool: True if the backend answered
+    """
+    return fetch_backend_health(url) is not None
+
+
+def negotiate_wire_format(health, preference=WIRE_FORMAT) -> str:
+    """
+    Pick the trigger content type
+    
+    Args:
+        health (dict): Backend health response (may list "wire_formats")
+        preference (str): "auto", "json" or "binary"
+    
+    Returns:
+        str: Content type to send triggers with
+    """
+    if preference == "json":
+        return CONTENT_TYPE_JSON
+    if preference == "binary":
+        return CONTENT_TYPE_BINARY
+    if preference != "auto":
+        raise ValueError(f"Unknown wire format: {preference!r} (expected 'auto', 'json' or 'binary')")
+    
+    advertised = (health or {}).get("wire_formats", [])
+    return CONTENT_TYPE_BINARY if CONTENT_TYPE_BINARY in advertised else CONTENT_TYPE_JSON
+
+
+def _post_trigger(payload: dict, url: str, content_type=CONTENT_TYPE_JSON) -> bool:
+    """
+    POST a trigger payload to the backend over the keep-alive session
+    
+    Args:
+        payload (dict): Trigger payload
+        url (str): Trigger endpoint
+        content_type (str): CONTENT_TYPE_JSON or CONTENT_TYPE_BINARY
+    
+    Returns:
+        bool: True if API call successful, False otherwise
+    """
+    try:
+        if content_type == CONTENT_TYPE_BINARY:
+            response = api_session.post(
+                url,
+                data=encode_trigger(payload),
+                headers={"Content-Type": CONTENT_TYPE_BINARY},
+                timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+            )
+        else:
+            response = api_session.post(
+                url,
+                json=payload,
+                timeout=(API_CONNECT_TIMEOUT, API_READ_TIMEOUT)
+            )
+        
+        # 202: the backend queued the countermeasure (see /api/jobs/<job_id>)
+        if response.status_code in (200, 202):
+            logger.info(f"[API] Successfully triggered: {response.json()}")
+            return True
+        else:
+            logger.warning(f"[API] Unexpected status code: {response.status_code}")
+            return False
+    
+    except requests.exceptions.ConnectTimeout:
+        logger.error(f"[API] Connect timeout after {API_CONNECT_TIMEOUT}s")
+        return False
+    except requests.exceptions.ConnectionError:
+        logger.error(f"[API] Connection failed - Flask server not running")
+        return False
+    except requests.exceptions.Timeout:
+        logger.error(f"[API] Request timeout after {API_READ_TIMEOUT}s")
+        return False
+    except Exception as e:
+        logger.error(f"[API] Error: {str(e)}")
+        return False
+
+
+def trigger_flask_api(detection_data: dict, url=None, content_type=CONTENT_TYPE_JSON) -> bool:
+    """
+    Trigger Flask API endpoint with detection and threat data
+    
+    Args:
+        detection_data (dict): Detection information
+        url (str): Trigger endpoint (defaults to FLASK_API_URL)
+        content_type (str): Wire format (CONTENT_TYPE_JSON or CONTENT_TYPE_BINARY)
+    
+    Returns:
+        bool: True if API call successful, False otherwise
+    """
+    url = url or FLASK_API_URL
+    payload = {
+        "threat_detected": True,
+        "detection": detection_data,
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    logger.info(f"[API] Sending threat trigger to {url}")
+    return _post_trigger(payload, url, content_type)
+
+
+def trigger_flask_api_batch(detections: list, url=None, content_type=CONTENT_TYPE_JSON) -> bool:
+    """
+    Trigger Flask API endpoint once for a batch of detections
+    The backend handles the batch as a single countermeasure decision
+    
+    Args:
+        detections (list): Detection information dicts
+        url (str): Trigger endpoint (defaults to FLASK_API_URL)
+        content_type (str): Wire format (CONTENT_TYPE_JSON or CONTENT_TYPE_BINARY)
+    
+    Returns:
+        bool: True if API call successful, False otherwise
+    """
+    if len(detections) == 1:
+        return trigger_flask_api(detections[0], url=url, content_type=content_type)
+    
+    url = url or FLASK_API_URL
+    payload = {
+        "threat_detected": True,
+        "detections": detections,
+        "timestamp": datetime.now().isoformat()
+    }
+    
+    logger.info(f"[API] Sending batched threat trigger ({len(detections)} detections) to {url}")
+    return _post_trigger(payload, url, content_type)
+
 
-class ThreatEvaluator:
+class HttpTransport:
     """
-    Evaluates detection data and classifies threat level
-    Implements threat classification logic
+    Delivers triggers to the Flask backend over the keep-alive HTTP session
+    Used when the engine and the backend run as separate processes or hosts
     """
     
-    def __init__(self, 
-                 low_threshold=CONFIDENCE_THRESHOLD,
-                 medium_threshold=MEDIUM_THREAT_CONFIDENCE,
-                 high_threshold=HIGH_THREAT_CONFIDENCE):
+    def __init__(self, url=None, wire_format=WIRE_FORMAT):
         """
-        Initialize threat evaluator with confidence thresholds
+        Initialize HTTP transport
         
         Args:
-            low_threshold (float): Confidence above which threat is confirmed
-            medium_threshold (float): Confidence for MEDIUM threat classification
-            high_threshold (float): Confidence for HIGH threat classification
+            url (str): Trigger endpoint (defaults to FLASK_API_URL)
+            wire_format (str): "auto" (negotiated at warm-up), "json" or "binary"
         """
-        self.low_threshold = low_threshold
-        self.medium_threshold = medium_threshold
-        self.high_threshold = high_threshold
+        self.url = url or FLASK_API_URL
+        self.wire_format = wire_format
+        # Until the backend has been asked, "auto" sends JSON, which every backend accepts
+        self.content_type = negotiate_wire_format({}, wire_format)
     
-    def classify_threat(self, confidence: float) -> str:
+    def send(self, detections: list) -> bool:
         """
-        Classify threat level based on detection confidence
+        Send a trigger
         
         Args:
-            confidence (float): Detection confidence (0-1)
+            detections (list): Detection information dicts
         
         Returns:
-            str: Threat level - "LOW", "MEDIUM", or "HIGH"
-        """
-        if confidence >= self.high_threshold:
-            return "HIGH"
-        elif confidence >= self.medium_threshold:
-            return "MEDIUM"
-        elif confidence >= self.low_threshold:
-            return "LOW"
-        else:
-            return "NONE"
+            bool: True if the backend accepted the trigger
+        """
+        return trigger_flask_api_batch(detections, url=self.url, content_type=self.content_type)
+    
+    def warm_up(self) -> bool:
+        """Pre-open the pooled connection to the backend and negotiate the wire format"""
+        health = fetch_backend_health(self.url)
+        if health is None:
+            return False
+        self.content_type = negotiate_wire_format(health, self.wire_format)
+        logger.info(f"[API] Trigger wire format: {self.content_type}")
+        return True
+    
+    def close(self):
+        """Nothing to release - the pooled session is shared"""
+    
+    def get_stats(self) -> dict:
+        return {"transport": "http", "url": self.url, "content_type": self.content_type}
+
+
+class InProcessTransport:
+    """
+    Hands triggers to the backend countermeasure service in the same process
     
-    def evaluate_detection(self, detection_data: dict) -> dict:
+    send() calls the service directly - no serialization and no socket
+    round-trip. It runs the countermeasure sequence on the calling thread, so
+    triggers should go through the priority dispatcher (the default), whose
+    workers keep the detector loop from waiting on the jammer or the email.
+    """
+    
+    def __init__(self, service=None):
         """
-        Comprehensive threat evaluation from detection data
+        Initialize in-process transport
         
         Args:
-            detection_data (dict): Detection information including:
-                - confidence: float
-                - class_name: str
-                - bbox: list [x1, y1, x2, y2]
-                - timestamp: str (ISO format)
+            service: Object with handle(detections) (defaults to the backend's
+                countermeasure_service, imported on first use)
+        """
+        self.service = service
+        self._lock = threading.Lock()
+        
+        self.sent_count = 0
+        self.failed_count = 0
+        self.handle_total = 0.0
+    
+    def _resolve_service(self):
+        with self._lock:
+            if self.service is None:
+                # Same module name as when backend/app.py runs, so both share one service
+                sys.path.insert(0, str(BACKEND_DIR))
+                from countermeasures import countermeasure_service
+                self.service = countermeasure_service
+        return self.service
+    
+    def send(self, detections: list) -> bool:
+        """
+        Run the countermeasure sequence for a trigger
+        
+        Args:
+            detections (list): Detection information dicts
         
         Returns:
-            dict: Threat evaluation result with threat_level and action
-        """
-        confidence = detection_data.get("confidence", 0)
-        class_name = detection_data.get("class_name", "unknown")
-        bbox = detection_data.get("bbox", [0, 0, 0, 0])
-        timestamp = detection_data.get("timestamp", datetime.now().isoformat())
-        
-        # Classify threat
-        threat_level = self.classify_threat(confidence)
-        
-        # Determine action
-        action = "MONITOR"  # Default action
-        api_triggered = False
-        
-        if threat_level == "HIGH":
-            action = "ACTIVATE_COUNTERMEASURE"
-            api_triggered = True
-        elif threat_level == "MEDIUM":
-            action = "ESCALATE_ALERT"
-            api_triggered = True
-        elif threat_level == "LOW":
-            action = "LOG_DETECTION"
-        
-        result = {
-            "threat_level": threat_level,
-            "confidence": confidence,
-            "class_name": class_name,
-            "bbox": bbox,
-            "timestamp": timestamp,
-            "action": action,
-            "api_triggered": api_triggered
-        }
+            bool: True if the service handled the trigger
+        """
+        service = self.service or self._resolve_service()
+        start = time.perf_counter()
+        try:
+            service.handle(detections)
+        except Exception as e:
+            self.failed_count += 1
+            logger.error(f"[TRANSPORT] Countermeasure service error: {str(e)}")
+            return False
+        self.sent_count += 1
+        self.handle_total += time.perf_counter() - start
+        return True
+    
+    def warm_up(self) -> bool:
+        """Import the countermeasure service ahead of the first trigger"""
+        self._resolve_service()
+        logger.info(f"[TRANSPORT] In-process countermeasure service ready")
+        return True
+    
+    def close(self):
+        """Nothing to release - the service is shared with the backend"""
+    
+    def get_stats(self) -> dict:
+        """
+        Get transport metrics
         
-        return result
-
-
-# Global threat evaluator instance
-threat_evaluator = ThreatEvaluator(
-    low_threshold=CONFIDENCE_THRESHOLD,
-    medium_threshold=MEDIUM_THREAT_CONFIDENCE,
-    high_threshold=HIGH_THREAT_CONFIDENCE
-)
+        Returns:
+            dict: Counts and average countermeasure handling time (ms)
+        """
+        return {
+            "transport": "inprocess",
+            "sent": self.sent_count,
+            "failed": self.failed_count,
+            "avg_handle_ms": self.handle_total / self.sent_count * 1000 if self.sent_count else 0.0
+        }
 
 
-def trigger_flask_api(detection_data: dict) -> bool:
+def create_trigger_transport(kind=TRIGGER_TRANSPORT):
     """
-    Trigger Flask API endpoint with detection and threat data
+    Create the configured trigger transport
     
     Args:
-        detection_data (dict): Detection information
+        kind (str): "http" or "inprocess"
     
     Returns:
-        bool: True if API call successful, False otherwise
+        HttpTransport or InProcessTransport: Transport with send(detections) -> bool
     """
-    try:
-        payload = {
-            "threat_detected": True,
-            "detection": detection_data,
-            "timestamp": datetime.now().isoformat()
+    if kind == "http":
+        return HttpTransport()
+    if kind == "inprocess":
+        return InProcessTransport()
+    raise ValueError(f"Unknown trigger transport: {kind!r} (expected 'http' or 'inprocess')")
+
+
+# Global trigger transport (closed at exit after the dispatcher has drained - atexit runs in reverse order)
+trigger_transport = create_trigger_transport()
+atexit.register(trigger_transport.close)
+
+
+def warm_up_trigger_transport() -> bool:
+    """
+    Prepare the trigger transport at startup so the first real trigger is fast
+    
+    Returns:
+        bool: True if the backend is reachable / ready
+    """
+    return trigger_transport.warm_up()
+
+
+# Global reliable sender: circuit breaker + disk spool in front of the backend
+trigger_sender = ReliableTriggerSender(
+    trigger_transport.send,
+    breaker=CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT),
+    spool=TriggerSpool(TRIGGER_SPOOL_FILE)
+)
+
+
+class DispatchLane:
+    """
+    Queue and counters for one threat level
+    """
+    
+    __slots__ = ("level", "name", "concurrency", "window", "items", "in_flight",
+                 "submitted", "sent", "batches", "failed", "shed", "spooled", "waits", "wait_max")
+    
+    def __init__(self, level: int, concurrency: int, window: float):
+        self.level = level
+        self.name = str(THREAT_LEVELS[level])
+        self.concurrency = max(1, concurrency)
+        self.window = window
+        self.items = deque()        # (detection, enqueued_at), oldest first
+        self.in_flight = 0
+        
+        self.submitted = 0
+        self.sent = 0
+        self.batches = 0
+        self.failed = 0
+        self.shed = 0
+        self.spooled = 0
+        self.waits = deque(maxlen=1024)  # recent queue waits (seconds) for percentiles
+        self.wait_max = 0.0
+    
+    def get_stats(self) -> dict:
+        waits = np.fromiter(self.waits, dtype=np.float64) * 1000 if self.waits else None
+        return {
+            "pending": len(self.items),
+            "in_flight": self.in_flight,
+            "concurrency": self.concurrency,
+            "window_ms": self.window * 1000,
+            "submitted": self.submitted,
+            "sent": self.sent,
+            "batches": self.batches,
+            "failed_batches": self.failed,
+            "shed": self.shed,
+            "spooled": self.spooled,
+            "wait_avg_ms": float(waits.mean()) if waits is not None else 0.0,
+            "wait_p95_ms": float(np.percentile(waits, 95)) if waits is not None else 0.0,
+            "wait_max_ms": self.wait_max * 1000
         }
+
+
+class PriorityDispatcher:
+    """
+    Bounded, priority-aware dispatch queue for outbound triggers
+    
+    Each threat level has its own lane. Workers always serve the highest
+    level that has work and spare concurrency, so a burst of MEDIUM
+    escalations can occupy at most its lane's concurrency limit and a HIGH
+    trigger is sent as soon as any worker is free. MEDIUM/LOW lanes coalesce
+    triggers for up to their batch window; the HIGH lane never waits.
+    
+    When the queue is full the oldest trigger of the lowest non-empty lane
+    (at or below the incoming level) is shed. HIGH triggers are never shed:
+    a HIGH trigger that finds the queue full of HIGH work goes to the
+    overflow (the reliable sender's disk spool) and is replayed from there.
+    """
+    
+    def __init__(self,
+                 send=trigger_sender,
+                 workers=DISPATCH_WORKERS,
+                 capacity=DISPATCH_CAPACITY,
+                 concurrency=None,
+                 window=TRIGGER_BATCH_WINDOW,
+                 max_batch=TRIGGER_BATCH_SIZE,
+                 overflow=trigger_sender.defer):
+        """
+        Initialize priority dispatcher
         
-        logger.info(f"[API] Sending threat trigger to {FLASK_API_URL}")
+        Args:
+            send (callable): Function sending a list of detections, returning bool
+            workers (int): Worker threads (concurrent sends across all lanes)
+            capacity (int): Maximum queued triggers across all lanes
+            concurrency (dict): Level index -> max concurrent sends for that lane
+            window (float): Batch window (seconds) of the MEDIUM and LOW lanes
+            max_batch (int): Maximum triggers per send
+            overflow (callable): Takes a list of HIGH detections the full queue cannot
+                hold (None = queue them beyond capacity)
+        """
+        self.send = send
+        self.overflow = overflow
+        self.workers = workers
+        self.capacity = capacity
+        self.max_batch = max_batch
         
-        response = requests.post(
-            FLASK_API_URL,
-            json=payload,
-            timeout=API_TIMEOUT
-        )
+        concurrency = concurrency or DISPATCH_CONCURRENCY
+        high = len(THREAT_LEVELS) - 1
+        self.lanes = {
+            level: DispatchLane(level, concurrency.get(level, workers), 0.0 if level == high else window)
+            for level in range(1, len(THREAT_LEVELS))
+        }
+        self._by_priority = sorted(self.lanes.values(), key=lambda lane: -lane.level)
         
-        if response.status_code == 200:
-            logger.info(f"[API] Successfully triggered: {response.json()}")
-            return True
-        else:
-            logger.warning(f"[API] Unexpected status code: {response.status_code}")
-            return False
+        self._queued = 0
+        self._condition = threading.Condition()
+        self._threads = []
+        self._running = False
     
-    except requests.exceptions.ConnectionError:
-        logger.error(f"[API] Connection failed - Flask server not running")
-        return False
-    except requests.exceptions.Timeout:
-        logger.error(f"[API] Request timeout after {API_TIMEOUT}s")
+    def _ensure_started(self):
+        if not self._threads:
+            self._running = True
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"trigger-dispatch-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def _shed_for(self, level: int) -> bool:
+        # The HIGH lane is never shed
+        for lane in reversed(self._by_priority):
+            if lane.level > level or lane.level == len(THREAT_LEVELS) - 1:
+                break
+            if lane.items:
+                lane.items.popleft()
+                lane.shed += 1
+                self._queued -= 1
+                logger.warning(f"[DISPATCH] Queue full - shed oldest {lane.name} trigger")
+                return True
         return False
+    
+    def submit(self, detection_data: dict, level: int) -> bool:
+        """
+        Queue a trigger in its level's lane
+        
+        Args:
+            detection_data (dict): Detection information
+            level (int): Threat level index (1=LOW .. 3=HIGH)
+        
+        Returns:
+            bool: True if queued (or, for HIGH, spooled), False if shed because only
+                higher-priority work is queued
+        """
+        high = len(THREAT_LEVELS) - 1
+        lane = self.lanes[min(max(level, 1), high)]
+        spool = False
+        with self._condition:
+            self._ensure_started()
+            lane.submitted += 1
+            if self._queued >= self.capacity and not self._shed_for(lane.level):
+                if lane.level < high:
+                    lane.shed += 1
+                    logger.warning(f"[DISPATCH] Queue full of higher-priority work - {lane.name} trigger shed")
+                    return False
+                if self.overflow is not None:
+                    lane.spooled += 1
+                    spool = True
+            if not spool:
+                lane.items.append((detection_data, time.monotonic()))
+                self._queued += 1
+                self._condition.notify()
+        if spool:
+            # Outside the lock: the spool write is a disk sync
+            logger.warning(f"[DISPATCH] Queue full of {lane.name} triggers - trigger spooled for replay")
+            self.overflow([detection_data])
+        return True
+    
+    def _next_batch(self):
+        now = time.monotonic()
+        timeout = None
+        for lane in self._by_priority:
+            if not lane.items or lane.in_flight >= lane.concurrency:
+                continue
+            remaining = lane.items[0][1] + lane.window - now
+            if remaining <= 0 or len(lane.items) >= self.max_batch or not self._running:
+                count = min(len(lane.items), self.max_batch)
+                batch = [lane.items.popleft() for _ in range(count)]
+                lane.in_flight += 1
+                self._queued -= count
+                return lane, batch, None
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return None, None, timeout
+    
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    lane, batch, timeout = self._next_batch()
+                    if lane is not None:
+                        break
+                    if not self._running and self._queued == 0:
+                        return
+                    self._condition.wait(timeout)
+            self._send(lane, batch)
+    
+    def _send(self, lane: DispatchLane, batch: list):
+        dequeued_at = time.monotonic()
+        try:
+            success = self.send([detection for detection, _ in batch])
+        except Exception as e:
+            logger.error(f"[DISPATCH] Send error: {str(e)}")
+            success = False
+        
+        with self._condition:
+            lane.in_flight -= 1
+            for _, enqueued_at in batch:
+                lane.waits.append(dequeued_at - enqueued_at)
+            lane.wait_max = max(lane.wait_max, dequeued_at - batch[0][1])
+            if success:
+                lane.sent += len(batch)
+                lane.batches += 1
+            else:
+                lane.failed += 1
+            self._condition.notify_all()
+    
+    def close(self):
+        """Send everything still queued (ignoring batch windows), then stop the workers"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+    
+    def get_stats(self) -> dict:
+        """
+        Get dispatch metrics
+        
+        Returns:
+            dict: Queue depth and per-lane counters and queue wait (avg / p95 / max, ms)
+        """
+        with self._condition:
+            return {
+                "workers": self.workers,
+                "capacity": self.capacity,
+                "queued": self._queued,
+                "lanes": {lane.name: lane.get_stats() for lane in self._by_priority}
+            }
+
+
+# Global trigger dispatcher (None = send each trigger synchronously)
+trigger_dispatcher = PriorityDispatcher() if DISPATCH_WORKERS > 0 else None
+if trigger_dispatcher is not None:
+    atexit.register(trigger_dispatcher.close)
+
+
+def get_engine_stats() -> dict:
+    """
+    Collect the statistics of every engine stage
+    
+    Returns:
+        dict: Track state, dispatch lanes (queue waits, batches), trigger delivery
+              (breaker, spool), transport, dedup and fusion stats (None when disabled)
+              and rolling detection counts
+    """
+    return {
+        "tracks": track_states.get_stats(),
+        "dispatch": trigger_dispatcher.get_stats() if trigger_dispatcher is not None else None,
+        "delivery": trigger_sender.get_stats(),
+        "transport": trigger_transport.get_stats(),
+        "dedup": camera_deduplicator.get_stats() if camera_deduplicator is not None else None,
+        "fusion": sensor_fusion.get_stats() if sensor_fusion is not None else None,
+        "detections": threat_stats.snapshot()
+    }
+
+
+def log_engine_stats():
+    """Write get_engine_stats() to the log as one "[ENGINE-STATS] {json}" line"""
+    try:
+        stats_logger.info(f"[ENGINE-STATS] {json.dumps(get_engine_stats(), separators=(',', ':'))}")
     except Exception as e:
-        logger.error(f"[API] Error: {str(e)}")
-        return False
+        stats_logger.error(f"[ENGINE-STATS] Failed to collect stats: {str(e)}")
+
+
+def _log_engine_stats(interval: float):
+    while True:
+        time.sleep(interval)
+        log_engine_stats()
+
+
+_stats_thread = None
+_stats_lock = threading.Lock()
+
+
+def start_stats_logger(interval=ENGINE_STATS_INTERVAL):
+    """
+    Log get_engine_stats() every interval seconds (no-op when disabled or already running)
+    
+    Args:
+        interval (float): Seconds between stats lines (0 = disabled)
+    """
+    global _stats_thread
+    if interval <= 0:
+        return
+    with _stats_lock:
+        if _stats_thread is None:
+            _stats_thread = threading.Thread(
+                target=_log_engine_stats, args=(interval,), name="engine-stats", daemon=True
+            )
+            _stats_thread.start()
+
+
+def _finite_or_none(value: float):
+    return round(value, 3) if math.isfinite(value) else None
+
+
+def annotate_smoothing(detection_data: dict, key, now: float) -> dict:
+    """
+    Record a sighting's confidence in its track and attach the smoothed value
+    
+    Args:
+        detection_data (dict): Detection information
+        key (tuple): Track key (see track_key)
+        now (float): Observation time in seconds
+    
+    Returns:
+        dict: Copy of the detection with smoothed_confidence (confidence stays raw)
+    """
+    smoothed = track_states.smooth_confidence(key, detection_data.get("confidence", 0), now)
+    return dict(detection_data, smoothed_confidence=round(smoothed, 4))
+
+
+def annotate_kinematics(detection_data: dict, key, now: float) -> dict:
+    """
+    Record a sighting in its track history and attach kinematic features
+    
+    Args:
+        detection_data (dict): Detection information
+        key (tuple): Track key (see track_key)
+        now (float): Observation time in seconds
+    
+    Returns:
+        dict: Copy of the detection with track_age, speed, growth_rate,
+              time_to_contact, time_to_zone and threat_score
+    """
+    x1, y1, x2, y2 = detection_data.get("bbox", [0, 0, 0, 0])
+    state = track_states.update_kinematics(key, (x1, y1, x2, y2), now)
+    history = state.history
+    
+    # Time until the track enters the target zone at its current closing speed
+    time_to_zone = math.inf
+    if geofence is not None and "camera_id" in detection_data:
+        if detection_data.get("zone") == KINEMATIC_TARGET_ZONE:
+            time_to_zone = 0.0
+        else:
+            target = geofence.zone_centroid(detection_data["camera_id"], KINEMATIC_TARGET_ZONE)
+            if target is not None:
+                time_to_zone = history.time_to_point((x1 + x2) / 2, (y1 + y2) / 2, *target)
+    
+    speed = history.speed
+    confidence = detection_data.get("smoothed_confidence", detection_data.get("confidence", 0))
+    score = kinematic_score(confidence, history.growth_rate, speed, time_to_zone)
+    
+    return dict(
+        detection_data,
+        track_age=detection_data.get("track_age", now - state.first_seen),
+        speed=detection_data.get("speed", round(speed, 3)),
+        growth_rate=round(history.growth_rate, 4),
+        time_to_contact=_finite_or_none(history.time_to_contact),
+        time_to_zone=_finite_or_none(time_to_zone),
+        threat_score=score
+    )
+
+
+def annotate_fusion(detection_data: dict) -> dict:
+    """
+    Combine a detection's threat score with support from other sensors
+    
+    Args:
+        detection_data (dict): Fused detection (see SensorFusion.fuse)
+    
+    Returns:
+        dict: Copy of the detection with the combined threat_score
+              (the single-sensor score is kept as sensor_score)
+    """
+    score = detection_data.get("threat_score")
+    if score is None:
+        score = detection_data.get("smoothed_confidence", detection_data.get("confidence", 0))
+    return dict(
+        detection_data,
+        sensor_score=score,
+        threat_score=round(combine_scores(score, detection_data["fusion_support"]), 4)
+    )
 
 
 def evaluate_threat(detection_data: dict) -> str:
@@ -185,24 +992,75 @@ def evaluate_threat(detection_data: dict) -> str:
     
     logger.info(f"[THREAT-ENGINE] Evaluating detection...")
     
-    # THINK: Evaluate threat
-    evaluation = threat_evaluator.evaluate_detection(detection_data)
+    # SEE: Merge detections of the same object seen by overlapping cameras
+    duplicate = False
+    if camera_deduplicator is not None and "camera_id" in detection_data:
+        merged = camera_deduplicator.merge([detection_data])
+        if merged:
+            detection_data = merged[0]
+        else:
+            duplicate = True
+    
+    # SEE: Locate the detection within the site geofence
+    if geofence is not None and "camera_id" in detection_data:
+        detection_data = geofence.annotate(detection_data)
+        if detection_data["zone"]:
+            logger.info(f"[THREAT-ENGINE] Zone: {detection_data['zone']}")
+    
+    # SEE: Join with RF / acoustic events of the same object (one fused threat per object)
+    if sensor_fusion is not None and not duplicate:
+        detection_data = sensor_fusion.fuse(detection_data)
+        if len(detection_data.get("fused_sources", ())) > 1:
+            logger.info(f"[THREAT-ENGINE] Fused with {', '.join(detection_data['fused_sources'])}")
+    
+    # THINK: Smooth confidence over the track, update its history and derive kinematic features
+    # (kinematics only for real track ids - associated boxes are too noisy for rates)
+    now = detection_data.get("timestamp_s") or time.time()
+    key = track_key(detection_data, associator=track_associator, now=now)
+    if not duplicate:
+        detection_data = annotate_smoothing(detection_data, key, now)
+        if "bbox" in detection_data and has_track_identity(key):
+            detection_data = annotate_kinematics(detection_data, key, now)
+        if detection_data.get("fusion_support"):
+            detection_data = annotate_fusion(detection_data)
+    
+    # THINK: Evaluate threat (one evaluator reference per detection, safe against hot reload)
+    evaluator = threat_evaluator
+    evaluation = evaluator.evaluate_detection(detection_data)
     
     threat_level = evaluation["threat_level"]
     action = evaluation["action"]
     api_triggered = evaluation["api_triggered"]
     
-    logger.info(f"[THREAT-ENGINE] Threat level: {threat_level}")
+    logger.info(
+        f"[THREAT-ENGINE] Threat level: {threat_level} (score {evaluation['threat_score']:.2f}, "
+        f"raw {evaluation['confidence']:.2f}, smoothed {evaluation['smoothed_confidence']:.2f})"
+    )
     logger.info(f"[THREAT-ENGINE] Action: {action}")
+    if evaluation["rule"]:
+        logger.info(f"[THREAT-ENGINE] Matched rule: {evaluation['rule']}")
+    
+    # THINK: Only fire on a new object, an escalation, or after the cooldown
+    fire_reason = None
+    if not duplicate:
+        fire_reason = track_states.observe(key, evaluation["level_index"], api_triggered, now=now)
+        threat_stats.record(detection_data.get("zone"), evaluation["level_index"], now)
     
     # ACT: Trigger API if threat confirmed
-    if api_triggered:
-        logger.info(f"[THREAT-ENGINE] INITIATING COUNTERMEASURE SEQUENCE...")
-        success = trigger_flask_api(detection_data)
-        if success:
+    if duplicate:
+        logger.info(f"[THREAT-ENGINE] Object already reported by another camera - merged, no action")
+    elif api_triggered and fire_reason is None:
+        logger.info(f"[THREAT-ENGINE] Object already handled - cooldown active, no action")
+    elif api_triggered:
+        logger.info(f"[THREAT-ENGINE] INITIATING COUNTERMEASURE SEQUENCE ({fire_reason})...")
+        trigger_data = dict(detection_data, threat_level=threat_level, alert_reason=fire_reason)
+        if trigger_dispatcher is not None:
+            if trigger_dispatcher.submit(trigger_data, evaluation["level_index"]):
+                logger.info(f"[THREAT-ENGINE] Countermeasure trigger queued ({threat_level} lane)")
+        elif trigger_sender([trigger_data]):
             logger.info(f"[THREAT-ENGINE] Countermeasure triggered successfully")
         else:
-            logger.warning(f"[THREAT-ENGINE] Countermeasure trigger failed")
+            logger.warning(f"[THREAT-ENGINE] Countermeasure trigger failed - spooled for replay")
     else:
         logger.info(f"[THREAT-ENGINE] No countermeasure action required")
     
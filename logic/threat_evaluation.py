@@ -0,0 +1,294 @@
+"""
+Threat Evaluation for AeroGuard AI
+Pure threat classification: confidence thresholds, site rules and the config
+files they are loaded from
+Importing this module has no side effects (no threads, sockets, sessions or
+spool files), so the backend can classify detections without starting the
+threat engine's trigger delivery
+"""
+
+import os
+import json
+import logging
+from pathlib import Path
+from datetime import datetime
+import numpy as np
+
+from logic.rule_engine import RuleSet, DetectionColumns
+
+logger = logging.getLogger(__name__)
+
+# Confidence thresholds (overridable by THREAT_CONFIG_FILE)
+CONFIDENCE_THRESHOLD = 0.75
+HIGH_THREAT_CONFIDENCE = 0.90
+MEDIUM_THREAT_CONFIDENCE = 0.80
+
+# Threshold overrides
+THREAT_CONFIG_FILE = os.getenv(
+    "THREAT_CONFIG_FILE",
+    str(Path(__file__).parent.parent / "config" / "threat_thresholds.json")
+)
+
+# Site threat rules (enabled when the rule file exists)
+THREAT_RULES_FILE = os.getenv(
+    "THREAT_RULES_FILE",
+    str(Path(__file__).parent.parent / "config" / "threat_rules.json")
+)
+
+
+# Threat levels and actions, indexed by level (NONE < LOW < MEDIUM < HIGH)
+THREAT_LEVELS = np.array(["NONE", "LOW", "MEDIUM", "HIGH"])
+THREAT_ACTIONS = np.array(["MONITOR", "LOG_DETECTION", "ESCALATE_ALERT", "ACTIVATE_COUNTERMEASURE"])
+THREAT_API_TRIGGERED = np.array([False, False, True, True])
+
+
+class ThreatEvaluator:
+    """
+    Evaluates detection data and classifies threat level
+    Implements threat classification logic
+    """
+    
+    def __init__(self, 
+                 low_threshold=CONFIDENCE_THRESHOLD,
+                 medium_threshold=MEDIUM_THREAT_CONFIDENCE,
+                 high_threshold=HIGH_THREAT_CONFIDENCE,
+                 rules=None):
+        """
+        Initialize threat evaluator with confidence thresholds
+        
+        Args:
+            low_threshold (float): Confidence above which threat is confirmed
+            medium_threshold (float): Confidence for MEDIUM threat classification
+            high_threshold (float): Confidence for HIGH threat classification
+            rules (RuleSet): Compiled site rules applied on top of the thresholds
+        
+        Raises:
+            ValueError: If the thresholds are not ordered within 0-1
+        """
+        if not 0 <= low_threshold <= medium_threshold <= high_threshold <= 1:
+            raise ValueError(
+                f"Thresholds must satisfy 0 <= low <= medium <= high <= 1, "
+                f"got {low_threshold}/{medium_threshold}/{high_threshold}"
+            )
+        
+        self.low_threshold = low_threshold
+        self.medium_threshold = medium_threshold
+        self.high_threshold = high_threshold
+        self.rules = rules
+        self.thresholds = np.array([low_threshold, medium_threshold, high_threshold], dtype=np.float64)
+    
+    def classify_levels(self, confidences) -> np.ndarray:
+        """
+        Classify a batch of confidences into threat level indices
+        
+        Args:
+            confidences (array-like): Detection confidences (0-1)
+        
+        Returns:
+            np.ndarray: Level index per detection (0=NONE, 1=LOW, 2=MEDIUM, 3=HIGH);
+                a NaN or infinite confidence is NONE
+        """
+        confidences = np.asarray(confidences, dtype=np.float64)
+        levels = np.searchsorted(self.thresholds, confidences, side="right")
+        return np.where(np.isfinite(confidences), levels, 0)
+    
+    def classify_threat(self, confidence: float) -> str:
+        """
+        Classify threat level based on detection confidence
+        
+        Args:
+            confidence (float): Detection confidence (0-1)
+        
+        Returns:
+            str: Threat level - "LOW", "MEDIUM", or "HIGH"
+        """
+        return str(THREAT_LEVELS[self.classify_levels(confidence)])
+    
+    def evaluate_batch(self, confidences, boxes=None, columns=None) -> dict:
+        """
+        Vectorized threat evaluation over a batch of detections
+        
+        Args:
+            confidences (array-like): (N,) confidences, or a structured array with a
+                "confidence" field (and optionally x1/y1/x2/y2 box fields)
+            boxes (array-like): (N, 4) boxes [x1, y1, x2, y2] (optional)
+            columns (DetectionColumns): Extra per-detection fields for site rules
+                (class_name, zone, track_age, ...) (optional)
+        
+        Returns:
+            dict: Arrays keyed by level_index, threat_level, action, api_triggered,
+                  rule_index, confidence and bbox
+        """
+        confidences = np.asarray(confidences)
+        if confidences.dtype.names:
+            records = confidences
+            confidences = records["confidence"]
+            if boxes is None and "x1" in records.dtype.names:
+                boxes = np.column_stack([records["x1"], records["y1"], records["x2"], records["y2"]])
+        
+        confidences = confidences.astype(np.float64, copy=False).reshape(-1)
+        if boxes is None:
+            boxes = np.zeros((len(confidences), 4))
+        else:
+            boxes = np.asarray(boxes).reshape(-1, 4)
+        
+        levels = self.classify_levels(confidences)
+        rule_index = np.full(len(levels), -1, dtype=np.int32)
+        
+        if self.rules:
+            if columns is None:
+                columns = DetectionColumns({"confidence": confidences, "bbox": boxes})
+            levels, rule_index = self.rules.apply(columns, levels)
+        
+        return {
+            "level_index": levels,
+            "rule_index": rule_index,
+            "threat_level": THREAT_LEVELS[levels],
+            "action": THREAT_ACTIONS[levels],
+            "api_triggered": THREAT_API_TRIGGERED[levels],
+            "confidence": confidences,
+            "bbox": boxes
+        }
+    
+    def evaluate_detection(self, detection_data: dict) -> dict:
+        """
+        Comprehensive threat evaluation from detection data
+        Thin wrapper over evaluate_batch for a single detection
+        
+        Args:
+            detection_data (dict): Detection information including:
+                - confidence: float
+                - class_name: str
+                - bbox: list [x1, y1, x2, y2]
+                - timestamp: str (ISO format)
+                - smoothed_confidence: float (optional per-track smoothed confidence)
+                - threat_score: float (optional kinematic score, used instead of confidence)
+        
+        Returns:
+            dict: Threat evaluation result with threat_level and action
+        """
+        confidence = detection_data.get("confidence", 0)
+        smoothed = detection_data.get("smoothed_confidence", confidence)
+        bbox = detection_data.get("bbox", [0, 0, 0, 0])
+        
+        # Kinematic threat score (when available) or smoothed confidence drives classification
+        score = detection_data.get("threat_score", smoothed)
+        
+        columns = DetectionColumns.from_dicts([detection_data]) if self.rules else None
+        batch = self.evaluate_batch([score], columns=columns)
+        rule_index = int(batch["rule_index"][0])
+        
+        result = {
+            "threat_level": str(batch["threat_level"][0]),
+            "level_index": int(batch["level_index"][0]),
+            "confidence": confidence,
+            "smoothed_confidence": smoothed,
+            "threat_score": score,
+            "class_name": detection_data.get("class_name", "unknown"),
+            "bbox": bbox,
+            "timestamp": detection_data.get("timestamp", datetime.now().isoformat()),
+            "action": str(batch["action"][0]),
+            "api_triggered": bool(batch["api_triggered"][0]),
+            "rule": self.rules.rules[rule_index].name if rule_index >= 0 else None
+        }
+        
+        return result
+
+
+def load_threat_rules(path=THREAT_RULES_FILE, strict=False):
+    """
+    Load and compile site threat rules
+    
+    Args:
+        path (str): Rule file (JSON)
+        strict (bool): Raise on an invalid rule file instead of logging it
+    
+    Returns:
+        RuleSet: Compiled rules, or None if no valid rule file is available
+    """
+    if not path or not os.path.exists(path):
+        return None
+    
+    try:
+        rules = RuleSet.from_file(path)
+    except (OSError, ValueError) as e:
+        if strict:
+            raise
+        logger.error(f"[RULES] Failed to load threat rules {path}: {str(e)}")
+        return None
+    
+    logger.info(f"[RULES] Loaded {len(rules)} threat rule(s) from {path}")
+    return rules
+
+
+def load_threat_thresholds(path=THREAT_CONFIG_FILE) -> dict:
+    """
+    Load threshold overrides
+    
+    File format (JSON, every key optional): {"low": 0.75, "medium": 0.80, "high": 0.90}
+    
+    Args:
+        path (str): Threshold file (JSON)
+    
+    Returns:
+        dict: ThreatEvaluator threshold keyword arguments (module defaults where not overridden)
+    
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not valid JSON or has unknown keys
+    """
+    thresholds = {
+        "low_threshold": CONFIDENCE_THRESHOLD,
+        "medium_threshold": MEDIUM_THREAT_CONFIDENCE,
+        "high_threshold": HIGH_THREAT_CONFIDENCE
+    }
+    if not path or not os.path.exists(path):
+        return thresholds
+    
+    with open(path) as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"Threshold file must contain a JSON object, got {type(data).__name__}")
+    unknown = set(data) - {"low", "medium", "high"}
+    if unknown:
+        raise ValueError(f"Unknown threshold key(s): {', '.join(sorted(unknown))}")
+    
+    for name, value in data.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"Threshold '{name}' must be a number, got {value!r}")
+        thresholds[f"{name}_threshold"] = float(value)
+    return thresholds
+
+
+def load_threat_evaluator(thresholds_path=THREAT_CONFIG_FILE, rules_path=THREAT_RULES_FILE) -> ThreatEvaluator:
+    """
+    Build a fully validated threat evaluator from the config files
+    
+    Args:
+        thresholds_path (str): Threshold file (JSON)
+        rules_path (str): Rule file (JSON)
+    
+    Returns:
+        ThreatEvaluator: New evaluator
+    
+    Raises:
+        OSError: If a config file cannot be read
+        ValueError: If thresholds or rules are invalid
+    """
+    thresholds = load_threat_thresholds(thresholds_path)
+    return ThreatEvaluator(**thresholds, rules=load_threat_rules(rules_path, strict=True))
+
+
+def default_threat_evaluator() -> ThreatEvaluator:
+    """
+    Build the threat evaluator from the config files, falling back to the
+    built-in thresholds (and any valid rule file) when the config is invalid
+    
+    Returns:
+        ThreatEvaluator: New evaluator
+    """
+    try:
+        return load_threat_evaluator()
+    except (OSError, ValueError) as e:
+        logger.error(f"[CONFIG] Invalid threat config - using built-in thresholds: {str(e)}")
+        return ThreatEvaluator(rules=load_threat_rules())
@@ -0,0 +1,388 @@
+"""
+Per-Track Alert State for AeroGuard AI
+Remembers each tracked object so countermeasures fire once per object
+Fires on a new object, on escalation, or after a configurable cooldown
+Each track also carries its kinematic history and confidence smoother
+State is bounded (max tracks) with TTL eviction so memory stays flat
+Detections without a tracker id are associated with the nearest recent untracked
+box of the same camera, so a moving object keeps one identity across the image
+"""
+
+import math
+import time
+import threading
+from collections import OrderedDict
+
+from logic.kinematics import KinematicHistory, HISTORY_SIZE
+from logic.confidence_smoothing import create_smoother, SMOOTHING_K_OF_N, SMOOTHING_NONE
+
+
+# Configuration
+ALERT_COOLDOWN = 30.0     # seconds before the same object may re-trigger at the same level
+TRACK_TTL = 60.0          # seconds after the last sighting before a track is forgotten
+MAX_TRACKS = 10000        # hard upper bound on remembered tracks
+TRACK_CELL_SIZE = 64      # pixels per spatial cell when no track id (and no associator) is available
+ASSOCIATION_GATE = 160.0  # pixels a box centre may move between sightings of one untracked object
+ASSOCIATION_TTL = 2.0     # seconds an untracked object may go unseen before a new identity starts
+
+# Reasons a trigger is allowed through
+FIRE_NEW_OBJECT = "NEW_OBJECT"
+FIRE_ESCALATION = "ESCALATION"
+FIRE_COOLDOWN_EXPIRED = "COOLDOWN_EXPIRED"
+
+
+def track_key(detection_data: dict, cell_size=TRACK_CELL_SIZE, associator=None, now=None) -> tuple:
+    """
+    Derive the state key for a detection
+
+    Uses the cross-camera object id, then a per-camera tracker id (or the sensor
+    id for non-camera events). A fusion_id is not a key: it only annotates which
+    sensors agree, and distinct objects must keep their own cooldown and history.
+    Untracked camera boxes get an id from the nearest-neighbour associator; only
+    without one does the key fall back to the spatial cell of the box centre.
+
+    Args:
+        detection_data (dict): Detection information
+        cell_size (int): Cell size in pixels for the spatial fallback
+        associator (TrackAssociator): Associator for untracked boxes (optional)
+        now (float): Observation time in seconds (defaults to time.time())
+
+    Returns:
+        tuple: Hashable track key
+    """
+    if detection_data.get("object_id") is not None:
+        return ("object", detection_data["object_id"])
+
+    camera_id = detection_data.get("camera_id")
+    if detection_data.get("track_id") is not None:
+        return ("track", camera_id, detection_data["track_id"])
+
+    source = detection_data.get("source", "camera")
+    if source != "camera":
+        return ("sensor", source, detection_data.get("sensor_id"))
+
+    x1, y1, x2, y2 = detection_data.get("bbox", [0, 0, 0, 0])
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    if associator is not None:
+        if now is None:
+            now = time.time()
+        object_id = associator.associate(camera_id, cx, cy, now, detection_data.get("frame_id"))
+        return ("assoc", camera_id, object_id)
+    return ("cell", camera_id, int(cx // cell_size), int(cy // cell_size))
+
+
+def has_track_identity(key: tuple) -> bool:
+    """
+    Whether a key identifies a real track (tracker, cross-camera or sensor id)
+    rather than an associated or spatial-cell guess
+    """
+    return key[0] not in ("assoc", "cell")
+
+
+class _Association:
+    __slots__ = ("camera_id", "cx", "cy", "last_seen", "frame_id", "cell")
+
+    def __init__(self, camera_id, cx, cy, now, frame_id, cell):
+        self.camera_id = camera_id
+        self.cx = cx
+        self.cy = cy
+        self.last_seen = now
+        self.frame_id = frame_id
+        self.cell = cell
+
+
+class TrackAssociator:
+    """
+    Stable ids for untracked boxes by nearest-neighbour association per camera
+
+    A box continues the nearest recent object of its camera whose centre is
+    within the gate (and which has not already been matched in the same frame);
+    otherwise it starts a new object. Objects are bucketed in a grid of
+    gate-sized cells, so a lookup only inspects the 3x3 neighbouring cells.
+    """
+
+    def __init__(self, gate=ASSOCIATION_GATE, ttl=ASSOCIATION_TTL, max_objects=MAX_TRACKS):
+        """
+        Initialize track associator
+
+        Args:
+            gate (float): Maximum centre movement in pixels between sightings
+            ttl (float): Seconds unseen before an object is forgotten
+            max_objects (int): Upper bound on remembered objects
+        """
+        self.gate = gate
+        self.ttl = ttl
+        self.max_objects = max_objects
+        self.next_id = 0
+        self._objects = OrderedDict()  # id -> _Association, in last-seen order
+        self._grid = {}                # (camera_id, gx, gy) -> set of ids
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._objects)
+
+    def _cell(self, camera_id, cx, cy) -> tuple:
+        return (camera_id, int(cx // self.gate), int(cy // self.gate))
+
+    def _forget(self, object_id):
+        obj = self._objects.pop(object_id)
+        bucket = self._grid[obj.cell]
+        bucket.discard(object_id)
+        if not bucket:
+            del self._grid[obj.cell]
+
+    def associate(self, camera_id, cx: float, cy: float, now: float, frame_id=None) -> int:
+        """
+        Get the object id of an untracked box
+
+        Args:
+            camera_id: Camera the box was seen by
+            cx (float): Box centre x (pixels)
+            cy (float): Box centre y (pixels)
+            now (float): Observation time in seconds
+            frame_id (int): Frame of the box (two boxes of one frame never share an id)
+
+        Returns:
+            int: Object id
+        """
+        with self._lock:
+            # Expire unseen objects (oldest first)
+            while self._objects:
+                object_id, obj = next(iter(self._objects.items()))
+                if now - obj.last_seen <= self.ttl and len(self._objects) < self.max_objects:
+                    break
+                self._forget(object_id)
+
+            cell = self._cell(camera_id, cx, cy)
+            best_id, best_distance = None, self.gate
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    for object_id in self._grid.get((camera_id, cell[1] + dx, cell[2] + dy), ()):
+                        obj = self._objects[object_id]
+                        if frame_id is not None and obj.frame_id == frame_id:
+                            continue
+                        distance = math.hypot(cx - obj.cx, cy - obj.cy)
+                        if distance <= best_distance:
+                            best_id, best_distance = object_id, distance
+
+            if best_id is None:
+                best_id = self.next_id
+                self.next_id += 1
+                obj = self._objects[best_id] = _Association(camera_id, cx, cy, now, frame_id, cell)
+                self._grid.setdefault(cell, set()).add(best_id)
+                return best_id
+
+            obj = self._objects[best_id]
+            self._objects.move_to_end(best_id)
+            if obj.cell != cell:
+                self._grid[obj.cell].discard(best_id)
+                if not self._grid[obj.cell]:
+                    del self._grid[obj.cell]
+                self._grid.setdefault(cell, set()).add(best_id)
+                obj.cell = cell
+            obj.cx, obj.cy = cx, cy
+            obj.last_seen = max(obj.last_seen, now)
+            obj.frame_id = frame_id
+            return best_id
+
+
+class TrackState:
+    """
+    Alert state of a single tracked object
+    """
+
+    __slots__ = ("first_seen", "last_seen", "level", "last_action_time", "last_action_level", "history", "smoother")
+
+    def __init__(self, now):
+        self.first_seen = now
+        self.last_seen = now
+        self.level = 0
+        self.last_action_time = None
+        self.last_action_level = 0
+        self.history = None
+        self.smoother = None
+
+    def to_dict(self) -> dict:
+        return {
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "level": self.level,
+            "last_action_time": self.last_action_time,
+            "last_action_level": self.last_action_level
+        }
+
+
+class TrackStateStore:
+    """
+    Bounded, TTL-evicted map of track key -> TrackState
+
+    Entries are kept in last-seen order, so eviction only ever inspects the
+    oldest entries and each update is O(1).
+    """
+
+    def __init__(self, cooldown=ALERT_COOLDOWN, ttl=TRACK_TTL, max_tracks=MAX_TRACKS, history_size=HISTORY_SIZE,
+                 smoothing=SMOOTHING_K_OF_N, smoothing_options=None):
+        """
+        Initialize track state store
+
+        Args:
+            cooldown (float): Seconds before the same object may re-trigger
+            ttl (float): Seconds after the last sighting before a track is dropped
+            max_tracks (int): Maximum number of remembered tracks
+            history_size (int): Kinematic samples kept per track
+            smoothing (str): Confidence smoothing mode ("kofn", "ema" or "none")
+            smoothing_options (dict): Smoother parameters (k, n, alpha)
+        """
+        self.cooldown = cooldown
+        self.ttl = ttl
+        self.max_tracks = max_tracks
+        self.history_size = history_size
+        self.smoothing = smoothing
+        self.smoothing_options = smoothing_options or {}
+
+        # Fail on bad smoothing settings at startup rather than on the first detection
+        create_smoother(smoothing, **self.smoothing_options)
+
+        self._tracks = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.fired_count = 0
+        self.suppressed_count = 0
+        self.evicted_count = 0
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def get(self, key):
+        """
+        Get the state of a track
+
+        Args:
+            key (tuple): Track key
+
+        Returns:
+            TrackState: State, or None if the track is unknown
+        """
+        return self._tracks.get(key)
+
+    def _touch(self, key, now):
+        state = self._tracks.get(key)
+        if state is None:
+            state = self._tracks[key] = TrackState(now)
+        else:
+            self._tracks.move_to_end(key)
+        state.last_seen = now
+        return state
+
+    def update_kinematics(self, key, bbox, now=None) -> TrackState:
+        """
+        Record the box of a sighting in the track's kinematic history
+
+        Args:
+            key (tuple): Track key (see track_key)
+            bbox (list): Box [x1, y1, x2, y2]
+            now (float): Observation time in seconds (defaults to time.time())
+
+        Returns:
+            TrackState: Updated track state (history holds velocity and growth rate)
+        """
+        if now is None:
+            now = time.time()
+
+        x1, y1, x2, y2 = bbox
+        with self._lock:
+            state = self._touch(key, now)
+            if state.history is None:
+                state.history = KinematicHistory(self.history_size)
+            state.history.update((x1 + x2) / 2, (y1 + y2) / 2, max(x2 - x1, 0) * max(y2 - y1, 0), now)
+            self._evict(now)
+        return state
+
+    def smooth_confidence(self, key, confidence: float, now=None) -> float:
+        """
+        Record a sighting's confidence and return the track's smoothed confidence
+
+        Args:
+            key (tuple): Track key (see track_key)
+            confidence (float): Raw detection confidence (0-1)
+            now (float): Observation time in seconds (defaults to time.time())
+
+        Returns:
+            float: Smoothed confidence (the raw value when smoothing is disabled)
+        """
+        if self.smoothing == SMOOTHING_NONE:
+            return confidence
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            state = self._touch(key, now)
+            if state.smoother is None:
+                state.smoother = create_smoother(self.smoothing, **self.smoothing_options)
+            smoothed = state.smoother.update(confidence)
+            self._evict(now)
+        return smoothed
+
+    def _evict(self, now):
+        tracks = self._tracks
+        while tracks:
+            key, state = next(iter(tracks.items()))
+            if now - state.last_seen <= self.ttl and len(tracks) <= self.max_tracks:
+                break
+            del tracks[key]
+            self.evicted_count += 1
+
+    def observe(self, key, level: int, wants_action: bool, now=None):
+        """
+        Record a sighting and decide whether it should trigger an action
+
+        Args:
+            key (tuple): Track key (see track_key)
+            level (int): Current threat level index (0=NONE .. 3=HIGH)
+            wants_action (bool): Whether the evaluator asked for an action
+            now (float): Observation time in seconds (defaults to time.time())
+
+        Returns:
+            str: Fire reason (NEW_OBJECT, ESCALATION, COOLDOWN_EXPIRED), or None to suppress
+        """
+        if now is None:
+            now = time.time()
+
+        with self._lock:
+            state = self._touch(key, now)
+            state.level = level
+
+            reason = None
+            if wants_action:
+                if state.last_action_time is None:
+                    reason = FIRE_NEW_OBJECT
+                elif level > state.last_action_level:
+                    reason = FIRE_ESCALATION
+                elif now - state.last_action_time >= self.cooldown:
+                    reason = FIRE_COOLDOWN_EXPIRED
+
+                if reason is not None:
+                    state.last_action_time = now
+                    state.last_action_level = level
+                    self.fired_count += 1
+                else:
+                    self.suppressed_count += 1
+
+            self._evict(now)
+
+        return reason
+
+    def get_stats(self) -> dict:
+        """
+        Get track state statistics
+
+        Returns:
+            dict: Active tracks and fired/suppressed/evicted counters
+        """
+        return {
+            "active_tracks": len(self._tracks),
+            "max_tracks": self.max_tracks,
+            "fired": self.fired_count,
+            "suppressed": self.suppressed_count,
+            "evicted": self.evicted_count
+        }
@@ -0,0 +1,372 @@
+"""
+Reliable Trigger Delivery for AeroGuard AI
+Circuit breaker that fails fast while the backend is down and probes for recovery
+Append-only spool file holding undelivered triggers, replayed in order on recovery
+Keeps the detector loop fast during outages without losing confirmed threats
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# Configuration
+BREAKER_FAILURE_THRESHOLD = 3   # consecutive failures before the breaker opens
+BREAKER_RESET_TIMEOUT = 10.0    # seconds the breaker stays open before a half-open probe
+SPOOL_FILE = Path(__file__).parent.parent / "threat_logs" / "trigger_spool.jsonl"
+
+# Circuit breaker states
+STATE_CLOSED = "CLOSED"
+STATE_OPEN = "OPEN"
+STATE_HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitBreaker:
+    """
+    Classic three-state circuit breaker
+
+    CLOSED: requests flow, consecutive failures are counted
+    OPEN: requests fail fast until reset_timeout has elapsed
+    HALF_OPEN: a single probe request is allowed; success closes, failure re-opens
+    """
+
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_timeout=BREAKER_RESET_TIMEOUT):
+        """
+        Initialize circuit breaker
+
+        Args:
+            failure_threshold (int): Consecutive failures before opening
+            reset_timeout (float): Seconds to stay open before probing
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.open_count = 0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a request may be attempted now
+
+        Returns:
+            bool: True if the request should be sent
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        """Record a successful request"""
+        with self._lock:
+            if self.state != STATE_CLOSED:
+                logger.info(f"[BREAKER] Backend recovered - circuit closed")
+            self.state = STATE_CLOSED
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Record a failed request"""
+        with self._lock:
+            self.failures += 1
+            self._probe_in_flight = False
+            if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != STATE_OPEN:
+                    logger.warning(f"[BREAKER] Circuit opened after {self.failures} failure(s) - failing fast")
+                    self.open_count += 1
+                self.state = STATE_OPEN
+                self.opened_at = time.monotonic()
+
+    def get_status(self) -> dict:
+        """
+        Get circuit breaker status
+
+        Returns:
+            dict: State, consecutive failures and times opened
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "open_count": self.open_count
+        }
+
+
+class TriggerSpool:
+    """
+    Append-only on-disk queue of undelivered trigger batches
+
+    Each batch is one JSON line. A sidecar offset file records how far replay
+    has progressed, so delivery resumes in order after a restart. Once every
+    entry has been delivered both files are truncated.
+
+    A crash during an append can leave a partial last line; it is cut off when
+    the spool is opened (the append never completed). A line that still cannot
+    be decoded is moved to a ".bad" quarantine file so replay moves past it.
+    """
+
+    def __init__(self, path=SPOOL_FILE):
+        """
+        Initialize trigger spool
+
+        Args:
+            path (str or Path): Spool file location
+        """
+        self.path = Path(path)
+        self.offset_path = self.path.with_name(self.path.name + ".offset")
+        self.quarantine_path = self.path.with_name(self.path.name + ".bad")
+        self._lock = threading.Lock()
+        self.quarantined = 0
+
+        self._repair_tail()
+        self._offset = self._read_offset()
+        self._pending = self._count_pending()
+
+    def __len__(self):
+        return self._pending
+
+    def _read_offset(self) -> int:
+        try:
+            return int(self.offset_path.read_text().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int):
+        tmp_path = self.offset_path.with_name(self.offset_path.name + ".tmp")
+        tmp_path.write_text(str(offset))
+        os.replace(tmp_path, self.offset_path)
+
+    def _repair_tail(self):
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            keep = data.rfind(b"\n") + 1
+            logger.warning(f"[SPOOL] Dropping partial last line ({len(data) - keep} bytes) of {self.path}")
+            f.truncate(keep)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _count_pending(self) -> int:
+        if not self.path.exists():
+            return 0
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            return sum(1 for line in f if line.strip())
+
+    def append(self, detections: list):
+        """
+        Durably append an undelivered batch
+
+        Args:
+            detections (list): Detection dicts of the failed trigger
+        """
+        line = json.dumps({"spooled_at": time.time(), "detections": detections}) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._pending += 1
+
+    def peek(self):
+        """
+        Read the oldest undelivered batch (quarantining lines that cannot be decoded)
+
+        Returns:
+            tuple: (detections, next_offset), or None if the spool is empty
+        """
+        with self._lock:
+            while self._pending and self.path.exists():
+                with open(self.path, "rb") as f:
+                    f.seek(self._offset)
+                    line = f.readline()
+                    next_offset = f.tell()
+                if not line:
+                    return None
+                if not line.strip():
+                    self._offset = next_offset
+                    continue
+                try:
+                    detections = json.loads(line)["detections"]
+                    if not isinstance(detections, list):
+                        raise ValueError("detections is not a list")
+                    return detections, next_offset
+                except (ValueError, KeyError, TypeError) as e:
+                    self._quarantine(line, e)
+                    self._advance(next_offset)
+            return None
+
+    def _quarantine(self, line: bytes, error: Exception):
+        with open(self.quarantine_path, "ab") as f:
+            f.write(line if line.endswith(b"\n") else line + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self.quarantined += 1
+        logger.error(f"[SPOOL] Unreadable spool entry moved to {self.quarantine_path}: {str(error)}")
+
+    def _advance(self, next_offset: int):
+        self._offset = next_offset
+        self._pending = max(0, self._pending - 1)
+        if self._pending == 0:
+            # Everything delivered - reclaim disk space
+            open(self.path, "w").close()
+            self._offset = 0
+        self._write_offset(self._offset)
+
+    def commit(self, next_offset: int):
+        """
+        Mark the oldest batch as delivered
+
+        Args:
+            next_offset (int): Offset returned by peek()
+        """
+        with self._lock:
+            self._advance(next_offset)
+
+
+class ReliableTriggerSender:
+    """
+    Sends trigger batches through a circuit breaker, spooling what cannot be delivered
+
+    While the spool holds undelivered batches, new batches are appended behind
+    them so the backend always receives triggers in their original order. A
+    replay thread drains the spool whenever the breaker allows a request.
+    """
+
+    def __init__(self, send, breaker=None, spool=None, replay_interval=1.0):
+        """
+        Initialize reliable sender
+
+        Args:
+            send (callable): Function sending a list of detections, returning bool
+            breaker (CircuitBreaker): Circuit breaker (a default one is created if None)
+            spool (TriggerSpool): Spool for undelivered batches (created if None)
+            replay_interval (float): Seconds between replay attempts while the spool is non-empty
+        """
+        self.send = send
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.spool = spool if spool is not None else TriggerSpool()
+        self.replay_interval = replay_interval
+
+        self.delivered = 0
+        self.spooled = 0
+        self.replayed = 0
+
+        self._wakeup = threading.Event()
+        self._replay_thread = None
+        self._start_lock = threading.Lock()
+
+        if len(self.spool):
+            logger.info(f"[SPOOL] {len(self.spool)} undelivered trigger batch(es) pending replay")
+            self._schedule_replay()
+
+    def _schedule_replay(self):
+        with self._start_lock:
+            if self._replay_thread is None:
+                self._replay_thread = threading.Thread(target=self._replay_loop, name="trigger-replay", daemon=True)
+                self._replay_thread.start()
+        self._wakeup.set()
+
+    def __call__(self, detections: list) -> bool:
+        """
+        Deliver a trigger batch, spooling it on failure
+
+        Args:
+            detections (list): Detection dicts
+
+        Returns:
+            bool: True if delivered now, False if spooled for later replay
+        """
+        if not len(self.spool) and self.breaker.allow_request():
+            if self._try_send(detections):
+                self.breaker.record_success()
+                self.delivered += 1
+                return True
+            self.breaker.record_failure()
+
+        self.defer(detections)
+        return False
+
+    def defer(self, detections: list):
+        """
+        Spool a trigger batch for the replay thread without trying to send it now
+
+        Args:
+            detections (list): Detection dicts
+        """
+        self.spool.append(detections)
+        self.spooled += 1
+        logger.warning(f"[SPOOL] Trigger spooled for replay ({len(self.spool)} pending)")
+        self._schedule_replay()
+
+    def _try_send(self, detections: list) -> bool:
+        # A raising transport counts as a failure, so the breaker always hears back
+        try:
+            return bool(self.send(detections))
+        except Exception as e:
+            logger.error(f"[SPOOL] Trigger send raised: {str(e)}")
+            return False
+
+    def _replay_once(self) -> bool:
+        entry = self.spool.peek()
+        if entry is None:
+            return False
+        if not self.breaker.allow_request():
+            return False
+
+        detections, next_offset = entry
+        if self._try_send(detections):
+            self.breaker.record_success()
+            self.spool.commit(next_offset)
+            self.replayed += 1
+            return True
+
+        self.breaker.record_failure()
+        return False
+
+    def _replay_loop(self):
+        while True:
+            self._wakeup.wait(self.replay_interval)
+            self._wakeup.clear()
+            try:
+                while self._replay_once():
+                    pass
+            except Exception as e:
+                # The replay thread must survive anything one entry or send can raise
+                logger.exception(f"[SPOOL] Replay attempt failed: {str(e)}")
+                continue
+            if len(self.spool) == 0:
+                self._wakeup.wait()
+
+    def get_stats(self) -> dict:
+        """
+        Get delivery statistics
+
+        Returns:
+            dict: Breaker status, spool depth and delivery counters
+        """
+        return {
+            "breaker": self.breaker.get_status(),
+            "spool_pending": len(self.spool),
+            "spool_quarantined": self.spool.quarantined,
+            "delivered": self.delivered,
+            "spooled": self.spooled,
+            "replayed": self.replayed
+        }
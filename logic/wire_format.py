@@ -0,0 +1,308 @@
+"""
+Binary Wire Format for AeroGuard AI
+Compact fixed-layout encoding of trigger messages (engine -> backend)
+Known numeric fields are packed into fixed-size records, repeated strings (class,
+camera, zone, level, ...) go into a per-message string table, and anything else
+rides along as a small JSON extras blob so no field is ever lost
+JSON stays the format for the dashboard and for clients that do not negotiate binary
+
+Message layout (little endian):
+    header    <4sBBHdH   magic b"AGW1", version, flags (bit 0 = threat_detected),
+                         detection count, timestamp (epoch s), string count
+    strings   per string: u8 length + UTF-8 bytes
+    records   per detection: present mask, null mask, bbox (4 x i32), NUMERIC_FIELDS,
+              one u16 string index per STRING_FIELDS entry, u16 extras index
+    extras    u16 count, then per entry: u32 length + JSON object
+"""
+
+import json
+import math
+import struct
+from datetime import datetime
+
+# Content types negotiated over HTTP
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_BINARY = "application/x-aeroguard-trigger"
+WIRE_FORMATS = (CONTENT_TYPE_JSON, CONTENT_TYPE_BINARY)
+
+MAGIC = b"AGW1"
+VERSION = 1
+FLAG_THREAT_DETECTED = 0x01
+
+# Fixed numeric fields in record order: (name, struct code)
+NUMERIC_FIELDS = (
+    ("confidence", "d"),
+    ("smoothed_confidence", "d"),
+    ("threat_score", "d"),
+    ("timestamp_s", "d"),
+    ("frame_id", "i"),
+    ("track_id", "i"),
+    ("object_id", "i"),
+    ("zone_id", "H"),
+    ("track_age", "d"),
+    ("speed", "d"),
+    ("growth_rate", "d"),
+    ("time_to_contact", "d"),
+    ("time_to_zone", "d"),
+)
+
+# String fields stored as indices into the message string table
+STRING_FIELDS = ("class_name", "camera_id", "zone", "threat_level", "alert_reason", "rule")
+
+NO_INDEX = 0xFFFF
+MAX_STRINGS = NO_INDEX
+
+_NUMERIC_NAMES = tuple(name for name, _ in NUMERIC_FIELDS)
+_NUMERIC_BITS = tuple((name, 1 << bit) for bit, name in enumerate(_NUMERIC_NAMES))
+_BBOX_BIT = 1 << len(NUMERIC_FIELDS)
+_ALL_NUMERIC = (1 << len(NUMERIC_FIELDS)) - 1
+
+_HEADER = struct.Struct("<4sBBHdH")
+_RECORD = struct.Struct(
+    "<II4i" + "".join(code for _, code in NUMERIC_FIELDS) + "H" * len(STRING_FIELDS) + "H"
+)
+_FIELD_STRUCTS = {name: struct.Struct("<" + code) for name, code in NUMERIC_FIELDS}
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+
+_N = len(NUMERIC_FIELDS)
+_S = len(STRING_FIELDS)
+_KNOWN = frozenset(("bbox",) + _NUMERIC_NAMES + STRING_FIELDS)
+_EMPTY_BBOX = (0, 0, 0, 0)
+_MISSING = object()
+
+
+class WireFormatError(ValueError):
+    """Raised when a binary message cannot be decoded"""
+
+
+def _numeric_values(detection: dict, extras: dict, validate: bool) -> tuple:
+    present = null = 0
+    values = []
+    for name, bit in _NUMERIC_BITS:
+        value = detection.get(name, _MISSING)
+        if value is _MISSING:
+            values.append(0)
+            continue
+        if value is None:
+            present |= bit
+            null |= bit
+            values.append(0)
+            continue
+        if validate:
+            try:
+                _FIELD_STRUCTS[name].pack(value)
+            except struct.error:
+                extras[name] = value
+                values.append(0)
+                continue
+        present |= bit
+        values.append(value)
+    return present, null, values
+
+
+def _derived_timestamp(timestamp_s, iso_cache: dict):
+    # The ISO timestamp decoding rebuilds from timestamp_s (None when it cannot be rebuilt)
+    if type(timestamp_s) not in (int, float):
+        return None
+    iso = iso_cache.get(timestamp_s, _MISSING)
+    if iso is _MISSING:
+        try:
+            iso = datetime.fromtimestamp(timestamp_s).isoformat()
+        except (ValueError, OverflowError, OSError):
+            iso = None
+        iso_cache[timestamp_s] = iso
+    return iso
+
+
+def _encode_detection(detection: dict, strings: dict, extras_list: list, iso_cache: dict) -> bytes:
+    extras = {}
+
+    bbox = detection.get("bbox")
+    present_bbox = 0
+    if bbox is not None:
+        if len(bbox) == 4 and all(type(c) is int and -2**31 <= c < 2**31 for c in bbox):
+            present_bbox = _BBOX_BIT
+        else:
+            extras["bbox"] = bbox
+            bbox = None
+
+    indices = []
+    for name in STRING_FIELDS:
+        value = detection.get(name)
+        if type(value) is str:
+            index = strings.get(value)
+            if index is None:
+                encoded = value.encode("utf-8")
+                if len(encoded) <= 255 and len(strings) < MAX_STRINGS:
+                    index = strings[value] = len(strings)
+            if index is not None:
+                indices.append(index)
+                continue
+        if name in detection:
+            extras[name] = value
+        indices.append(NO_INDEX)
+
+    for name in detection.keys() - _KNOWN:
+        # The ISO timestamp is rebuilt from timestamp_s on decode - carried only when it differs
+        if name == "timestamp" and detection[name] == _derived_timestamp(detection.get("timestamp_s"), iso_cache):
+            continue
+        extras[name] = detection[name]
+
+    present, null, values = _numeric_values(detection, extras, validate=False)
+    try:
+        record_args = [present | present_bbox, null, *(bbox or _EMPTY_BBOX), *values, *indices]
+        record = _RECORD.pack(*record_args, NO_INDEX)
+    except struct.error:
+        # Out-of-range or non-numeric values travel in the extras blob instead
+        present, null, values = _numeric_values(detection, extras, validate=True)
+        record_args = [present | present_bbox, null, *(bbox or _EMPTY_BBOX), *values, *indices]
+        record = None
+
+    if extras:
+        extras_list.append(json.dumps(extras, separators=(",", ":")).encode("utf-8"))
+        record = _RECORD.pack(*record_args, len(extras_list) - 1)
+    elif record is None:
+        record = _RECORD.pack(*record_args, NO_INDEX)
+    return record
+
+
+def encode_trigger(payload: dict) -> bytes:
+    """
+    Encode a trigger payload into the binary wire format
+
+    Args:
+        payload (dict): {"threat_detected", "detections" or "detection", "timestamp"}
+
+    Returns:
+        bytes: Encoded message
+    """
+    detections = payload.get("detections") or [payload.get("detection", {})]
+    if len(detections) > 0xFFFF:
+        raise ValueError(f"Too many detections for one message: {len(detections)}")
+
+    strings = {}
+    extras_list = []
+    iso_cache = {}
+    records = [_encode_detection(detection, strings, extras_list, iso_cache) for detection in detections]
+
+    timestamp = payload.get("timestamp")
+    epoch = datetime.fromisoformat(timestamp).timestamp() if timestamp else datetime.now().timestamp()
+    flags = FLAG_THREAT_DETECTED if payload.get("threat_detected") else 0
+
+    parts = [_HEADER.pack(MAGIC, VERSION, flags, len(detections), epoch, len(strings))]
+    for value in strings:
+        encoded = value.encode("utf-8")
+        parts.append(_U8.pack(len(encoded)))
+        parts.append(encoded)
+    parts.extend(records)
+    parts.append(_U16.pack(len(extras_list)))
+    for blob in extras_list:
+        parts.append(_U32.pack(len(blob)))
+        parts.append(blob)
+    return b"".join(parts)
+
+
+def _isoformat(epoch) -> str:
+    if not math.isfinite(epoch):
+        raise WireFormatError(f"Invalid timestamp: {epoch}")
+    return datetime.fromtimestamp(epoch).isoformat()
+
+
+def _decode_records(view, strings: list, extras_list: list) -> list:
+    detections = []
+    iso_cache = {}
+    for record in _RECORD.iter_unpack(view):
+        present, null = record[0], record[1]
+        values = record[6:6 + _N]
+
+        if present & _ALL_NUMERIC == _ALL_NUMERIC:
+            detection = dict(zip(_NUMERIC_NAMES, values))
+        else:
+            detection = {name: value for (name, bit), value in zip(_NUMERIC_BITS, values) if present & bit}
+        if null:
+            for name, bit in _NUMERIC_BITS:
+                if null & bit:
+                    detection[name] = None
+
+        if present & _BBOX_BIT:
+            detection["bbox"] = list(record[2:6])
+
+        for name, index in zip(STRING_FIELDS, record[6 + _N:6 + _N + _S]):
+            if index != NO_INDEX:
+                detection[name] = strings[index]
+
+        extras_index = record[-1]
+        if extras_index != NO_INDEX:
+            detection.update(extras_list[extras_index])
+
+        timestamp_s = detection.get("timestamp_s")
+        if timestamp_s is not None and "timestamp" not in detection:
+            iso = iso_cache.get(timestamp_s)
+            if iso is None:
+                iso = iso_cache[timestamp_s] = _isoformat(timestamp_s)
+            detection["timestamp"] = iso
+
+        detections.append(detection)
+    return detections
+
+
+def decode_trigger(data: bytes) -> dict:
+    """
+    Decode a binary trigger message
+
+    Args:
+        data (bytes): Encoded message
+
+    Returns:
+        dict: {"threat_detected", "detections", "timestamp"} (same shape as the JSON payload)
+
+    Raises:
+        WireFormatError: If the message is truncated or not a trigger message
+    """
+    view = memoryview(data)
+    try:
+        magic, version, flags, count, epoch, string_count = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise WireFormatError(f"Not an AeroGuard trigger message (magic {magic!r}, version {version})")
+        offset = _HEADER.size
+
+        strings = []
+        for _ in range(string_count):
+            (length,) = _U8.unpack_from(view, offset)
+            offset += _U8.size
+            strings.append(str(view[offset:offset + length], "utf-8"))
+            offset += length
+
+        records_end = offset + count * _RECORD.size
+        if records_end > len(view):
+            raise WireFormatError("Truncated trigger message (records)")
+        records = view[offset:records_end]
+        offset = records_end
+
+        (extras_count,) = _U16.unpack_from(view, offset)
+        offset += _U16.size
+        extras_list = []
+        for _ in range(extras_count):
+            (length,) = _U32.unpack_from(view, offset)
+            offset += _U32.size
+            extras_list.append(json.loads(bytes(view[offset:offset + length])))
+            offset += length
+
+        if offset != len(view):
+            raise WireFormatError(f"Trailing bytes in trigger message ({len(view) - offset})")
+
+        detections = _decode_records(records, strings, extras_list)
+        timestamp = _isoformat(epoch)
+    except WireFormatError:
+        raise
+    except (struct.error, IndexError, TypeError, ValueError, OverflowError, OSError) as e:
+        # OverflowError / OSError: timestamps outside the platform's datetime range
+        raise WireFormatError(f"Malformed trigger message: {str(e)}") from e
+
+    return {
+        "threat_detected": bool(flags & FLAG_THREAT_DETECTED),
+        "detections": detections,
+        "timestamp": timestamp
+    }
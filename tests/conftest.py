@@ -0,0 +1,20 @@
+"""
+Shared pytest setup for AeroGuard AI
+Puts the project root (and backend/, whose modules import each other by name) on the path
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+sys.path.insert(0, str(PROJECT_ROOT))
+sys.path.insert(1, str(PROJECT_ROOT / "backend"))
+
+# Backend services and the engine open their default database / spool on import - keep them
+# out of the project tree
+TEST_DATA_DIR = Path(tempfile.mkdtemp(prefix="aeroguard-tests-"))
+os.environ.setdefault("THREAT_DB_FILE", str(TEST_DATA_DIR / "threats.db"))
+os.environ.setdefault("TRIGGER_SPOOL_FILE", str(TEST_DATA_DIR / "trigger_spool.jsonl"))
@@ -0,0 +1,140 @@
+"""
+Tests for the Flask API input validation and shared countermeasure jobs
+"""
+
+import os
+import sys
+import subprocess
+
+import pytest
+
+import app as backend_app
+import countermeasures
+from threat_store import ThreatStore
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # Jobs run on the worker pool - keep the jammer and mail steps instant and offline
+    monkeypatch.setattr(countermeasures, "activate_jammer", lambda: None)
+    monkeypatch.setattr(countermeasures, "send_alert", lambda detection: True)
+    return backend_app.app.test_client()
+
+
+DETECTION = {"class_name": "drone", "confidence": 0.9, "bbox": [0, 0, 10, 10]}
+
+
+@pytest.mark.parametrize("body", [
+    [DETECTION],
+    {"threat_detected": True, "detection": {"confidence": "x"}},
+    {"threat_detected": True, "detections": ["a"]},
+    {"threat_detected": True, "detections": {"confidence": 0.9}},
+    {"threat_detected": "yes", "detection": DETECTION},
+    {"threat_detected": True, "detection": dict(DETECTION, bbox=[1, 2])},
+    {"threat_detected": True, "detection": dict(DETECTION, smoothed_confidence="a")},
+    {"threat_detected": True, "detection": dict(DETECTION, threat_score="x")},
+    {"threat_detected": True, "detection": dict(DETECTION, speed=[1])},
+    {"threat_detected": True}
+])
+def test_trigger_rejects_malformed_payloads(client, body):
+    response = client.post("/api/trigger", json=body)
+    assert response.status_code == 400
+    assert response.get_json()["status"] == "error"
+
+
+def test_trigger_accepts_valid_payloads(client):
+    response = client.post("/api/trigger", json={"threat_detected": False})
+    assert response.status_code == 200
+
+    response = client.post("/api/trigger", json={"threat_detected": True, "detection": DETECTION})
+    assert response.status_code == 202
+    assert client.get(response.get_json()["job_url"]).status_code == 200
+
+
+@pytest.mark.parametrize("body", [
+    {"detections": "a"},
+    {"detections": []},
+    [{"confidence": 2}],
+    ["a", None]
+])
+def test_batch_ingest_rejects_malformed_payloads(client, body):
+    assert client.post("/api/detections/batch", json=body).status_code == 400
+
+
+@pytest.mark.parametrize("field,value", [
+    ("threat_score", "NaN"), ("threat_score", '"x"'), ("smoothed_confidence", "Infinity"),
+    ("track_age", '"old"'), ("speed", "true"), ("timestamp_s", "[1]")
+])
+def test_batch_ingest_rejects_bad_score_fields(client, field, value):
+    # Raw JSON: Python's encoder and parser both allow NaN/Infinity
+    body = '{"detections": [{"confidence": 0.1, "%s": %s}, {"confidence": 0.2, "%s": null}]}' % (field, value, field)
+    response = client.post("/api/detections/batch", data=body, content_type="application/json")
+    assert response.status_code == 200
+    result = response.get_json()
+    assert "job_id" not in result
+    assert [entry["index"] for entry in result["rejected"]] == [0]
+    assert field in result["rejected"][0]["error"]
+
+
+def test_jobs_are_visible_to_other_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(countermeasures, "activate_jammer", lambda: None)
+    monkeypatch.setattr(countermeasures, "send_alert", lambda detection: True)
+    path = tmp_path / "threats.db"
+    worker_a = countermeasures.CountermeasureService(store=ThreatStore(path))
+    worker_b = countermeasures.CountermeasureService(store=ThreatStore(path))
+
+    response, queued = worker_a.submit([dict(DETECTION)])
+    assert queued
+    job = worker_b.get_job(response["job_id"])
+    assert job is not None and job["threats"] == 1
+
+    worker_a._executor.shutdown(wait=True)
+    worker_a.store.flush()
+    assert worker_b.get_job(response["job_id"])["status"] == countermeasures.JOB_COMPLETED
+    assert worker_b.get_job_stats()[countermeasures.JOB_COMPLETED] == 1
+
+    for worker in (worker_a, worker_b):
+        worker.store.close()
+
+
+def test_status_stats_are_shared_by_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(countermeasures, "activate_jammer", lambda: None)
+    monkeypatch.setattr(countermeasures, "send_alert", lambda detection: True)
+    path = tmp_path / "threats.db"
+    worker_a = countermeasures.CountermeasureService(store=ThreatStore(path))
+    worker_b = countermeasures.CountermeasureService(store=ThreatStore(path))
+
+    worker_a.ingest([dict(DETECTION, zone="core"), {"confidence": 0.1, "zone": "core"}])
+    worker_a.submit([dict(DETECTION, threat_level="MEDIUM")])
+    worker_a._executor.shutdown(wait=True)
+    worker_a.store.flush()
+
+    stats = worker_b.rolling_stats()
+    assert stats == worker_a.rolling_stats()
+    for window in ("last_minute", "last_hour", "last_day"):
+        assert stats["detection_stats"][window]["total"] == 3
+        assert stats["threat_stats"][window]["by_level"] == {"NONE": 0, "LOW": 0, "MEDIUM": 1, "HIGH": 1}
+    assert stats["detection_stats"]["last_minute"]["by_zone"]["core"] == {"NONE": 1, "LOW": 0, "MEDIUM": 0, "HIGH": 1}
+
+    for worker in (worker_a, worker_b):
+        worker.store.close()
+
+
+@pytest.mark.parametrize("query", ["since=nan", "until=inf", "since=-inf", "since=yesterday"])
+def test_threat_log_rejects_invalid_times(client, query):
+    assert client.get(f"/api/threat-log?{query}").status_code == 400
+
+
+def test_batch_ingest_does_not_start_the_threat_engine(tmp_path):
+    # The engine's import-time globals (trigger spool replayer, dispatcher, HTTP session)
+    # must not start in backend workers - checked in a fresh interpreter
+    script = (
+        "import sys, countermeasures\n"
+        "levels, triggered = countermeasures.evaluate_detections([{'confidence': 0.95}, {'confidence': 0.1}])\n"
+        "assert levels.tolist() == [3, 0] and triggered.tolist() == [True, False]\n"
+        "assert 'logic.threat_engine' not in sys.modules\n"
+    )
+    env = dict(os.environ, THREAT_DB_FILE=str(tmp_path / "threats.db"),
+               PYTHONPATH=os.pathsep.join(sys.path))
+    result = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,72 @@
+"""
+Tests for cross-camera detection deduplication
+"""
+
+from logic.camera_dedup import CameraCalibration, CrossCameraDeduplicator
+
+IDENTITY = [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+# Maps image row y = 100 onto the horizon (w = 0)
+HORIZON = [[1, 0, 0], [0, 1, 0], [0, -0.01, 1]]
+
+
+def deduplicator(**calibrations):
+    return CrossCameraDeduplicator({
+        camera_id: CameraCalibration(camera_id, homography) for camera_id, homography in calibrations.items()
+    })
+
+
+def detection(camera_id, x, frame_id=1, **extra):
+    return dict({"camera_id": camera_id, "bbox": [x, 0, x + 2, 2], "frame_id": frame_id, "timestamp_s": 100.0}, **extra)
+
+
+def test_cross_camera_duplicates_are_merged():
+    dedup = deduplicator(north=IDENTITY, east=IDENTITY)
+    assert len(dedup.merge([detection("north", 10)])) == 1
+    assert dedup.merge([detection("east", 11)]) == []
+
+
+def test_same_camera_detections_of_one_frame_are_not_merged():
+    dedup = deduplicator(north=IDENTITY)
+    forwarded = dedup.merge([detection("north", 10), detection("north", 12)])
+    assert len({d["object_id"] for d in forwarded}) == 2
+
+    # The next frame keeps following each object
+    nxt = dedup.merge([detection("north", 10.5, frame_id=2), detection("north", 12.5, frame_id=2)])
+    assert [d["object_id"] for d in nxt] == [d["object_id"] for d in forwarded]
+
+
+def test_unprojectable_detections_pass_through():
+    dedup = deduplicator(north=HORIZON)
+    on_horizon = dict(detection("north", 10), bbox=[10, 99, 12, 101])
+    assert dedup.merge([on_horizon]) == [on_horizon]
+    assert "object_id" in dedup.merge([detection("north", 10)])[0]
+
+
+def test_concurrent_camera_threads_share_one_deduplicator():
+    import sys
+    import threading
+
+    dedup = CrossCameraDeduplicator({
+        camera_id: CameraCalibration(camera_id, IDENTITY) for camera_id in ("a", "b", "c", "d")
+    }, object_ttl=0.01, time_bucket=0.01)
+    errors = []
+
+    def camera(camera_id):
+        try:
+            for frame_id in range(400):
+                dedup.merge([dict(detection(camera_id, (frame_id * 7 + i * 50) % 1000, frame_id=frame_id),
+                                  timestamp_s=100.0 + frame_id * 0.01) for i in range(5)])
+        except Exception as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=camera, args=(camera_id,)) for camera_id in "abcd"]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert errors == []
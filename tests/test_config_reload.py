@@ -0,0 +1,76 @@
+"""
+Tests for hot reloading of threat thresholds and rules
+"""
+
+import functools
+import json
+import os
+import time
+
+from logic import threat_engine
+from logic.config_reload import ConfigWatcher
+from logic.threat_evaluation import load_threat_evaluator
+
+
+def touch(path, text):
+    # Distinct size or mtime, so the change is seen even on coarse-mtime filesystems
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_watcher_reports_create_modify_and_delete(tmp_path):
+    path = tmp_path / "thresholds.json"
+    calls = []
+    watcher = ConfigWatcher([path, None], lambda: calls.append(1), interval=60)
+    assert watcher.paths == [str(path)]
+    assert not watcher.check()
+
+    touch(path, "{}")
+    assert watcher.check() and not watcher.check()
+    touch(path, '{"high": 0.95}')
+    assert watcher.check()
+    path.unlink()
+    assert watcher.check()
+    assert len(calls) == watcher.reload_count == 3
+
+
+def test_failing_reload_hook_keeps_the_watcher_running(tmp_path):
+    path = tmp_path / "rules.json"
+
+    def fail():
+        raise ValueError("bad config")
+
+    watcher = ConfigWatcher([path], fail, interval=0.01)
+    watcher.start()
+    try:
+        touch(path, "[]")
+        deadline = time.monotonic() + 2
+        while watcher.reload_count == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert watcher.reload_count == 1
+        assert watcher._thread.is_alive()
+    finally:
+        watcher.stop()
+
+
+def test_engine_swaps_valid_config_and_keeps_the_old_one_on_error(tmp_path, monkeypatch):
+    thresholds = tmp_path / "thresholds.json"
+    rules = tmp_path / "rules.json"
+    monkeypatch.setattr(threat_engine, "load_threat_evaluator",
+                        functools.partial(load_threat_evaluator, thresholds_path=thresholds, rules_path=rules))
+    monkeypatch.setattr(threat_engine, "threat_evaluator", threat_engine.threat_evaluator)
+
+    thresholds.write_text(json.dumps({"low": 0.3, "medium": 0.4, "high": 0.5}))
+    rules.write_text(json.dumps([{"name": "core", "level": "HIGH", "when": {"zone": ["core"]}}]))
+    assert threat_engine.reload_threat_evaluator()
+    evaluator = threat_engine.threat_evaluator
+    assert evaluator.high_threshold == 0.5 and len(evaluator.rules) == 1
+    assert evaluator.classify_threat(0.45) == "MEDIUM"
+
+    for path, text in ((thresholds, '{"high": "x"}'), (rules, "[{]")):
+        original = path.read_text()
+        path.write_text(text)
+        assert not threat_engine.reload_threat_evaluator()
+        assert threat_engine.threat_evaluator is evaluator
+        path.write_text(original)
@@ -0,0 +1,123 @@
+"""
+Tests for the streaming detection generator API
+"""
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from vision import detection_stream
+from vision.detection_stream import DetectionStream, FrameDetections, DETECTION_DTYPE, stream_detections
+
+
+class FakeCapture:
+    """VideoCapture stand-in serving a fixed number of blank frames"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.reads = 0
+        self.released = False
+
+    def isOpened(self):
+        return True
+
+    def read(self):
+        if self.reads >= self.frames:
+            return False, None
+        self.reads += 1
+        return True, np.zeros((4, 4, 3), dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class Tensor:
+    def __init__(self, values):
+        self.values = np.asarray(values)
+
+    def cpu(self):
+        return self
+
+    def numpy(self):
+        return self.values
+
+
+class Boxes:
+    def __init__(self, xyxy, conf, cls, ids=None):
+        self.xyxy = Tensor(xyxy)
+        self.conf = Tensor(conf)
+        self.cls = Tensor(cls)
+        self.id = Tensor(ids) if ids is not None else None
+
+    def __len__(self):
+        return len(self.xyxy.values)
+
+
+class Result:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class FakeModel:
+    """Detects one drone on every odd frame"""
+
+    names = {0: "drone"}
+
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, source, **kwargs):
+        self.calls += 1
+        if self.calls % 2 == 0:
+            return [Result(None)]
+        return [Result(Boxes([[10.6, 20.2, 30.9, 40.0]], [0.91], [0]))]
+
+    def track(self, source, **kwargs):
+        self.calls += 1
+        return [Result(Boxes([[1, 2, 3, 4], [5, 6, 7, 8]], [0.8, 0.85], [0, 0], ids=[7, 9]))]
+
+
+@pytest.fixture
+def capture(monkeypatch):
+    cap = FakeCapture(frames=5)
+    monkeypatch.setattr(detection_stream.cv2, "VideoCapture", lambda source: cap)
+    return cap
+
+
+def test_stream_reads_lazily_and_releases_the_source(capture):
+    model = FakeModel()
+    stream = iter(DetectionStream(source="cam-1", model=model))
+    first = next(stream)
+    assert capture.reads == 1 and model.calls == 1
+    assert first.frame_id == 1 and len(first) == 1
+
+    rest = list(stream)
+    assert [f.frame_id for f in rest] == [2, 3, 4, 5]
+    assert capture.released
+
+
+def test_skip_empty_and_max_frames(capture):
+    frames = list(stream_detections(source=0, model=FakeModel(), skip_empty=True, max_frames=4))
+    assert [f.frame_id for f in frames] == [1, 3]
+    assert capture.reads == 4 and capture.released
+
+
+def test_to_dicts_matches_the_engine_format(capture):
+    with DetectionStream(source="cam-1", model=FakeModel(), track=True) as stream:
+        frame = stream.read()
+    assert capture.released
+    assert frame.boxes.shape == (2, 4) and frame.confidences.dtype == np.float32
+    first, second = frame.to_dicts()
+    assert first["class_name"] == "drone" and first["camera_id"] == "cam-1"
+    assert first["bbox"] == [1, 2, 3, 4] and first["track_id"] == 7 and second["track_id"] == 9
+    assert first["timestamp_s"] == frame.timestamp and first["frame_id"] == 1
+
+
+def test_untracked_boxes_carry_no_track_id():
+    detections = np.zeros(1, dtype=DETECTION_DTYPE)
+    detections["track_id"] = -1
+    frame = FrameDetections(1, 1700000000.0, detections, {}, source=2)
+    (detection,) = frame.to_dicts()
+    assert "track_id" not in detection
+    assert detection["class_name"] == "unknown" and detection["camera_id"] == "2"
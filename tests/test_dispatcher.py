@@ -0,0 +1,66 @@
+"""
+Tests for the threat engine's priority dispatcher load shedding and stats reporting
+"""
+
+import json
+import logging
+
+from logic import threat_engine
+from logic.threat_engine import PriorityDispatcher
+
+LOW, MEDIUM, HIGH = 1, 2, 3
+
+
+def dispatcher(overflow):
+    # No workers: submitted triggers stay queued, so the queue state is deterministic
+    return PriorityDispatcher(send=lambda detections: True, workers=0, capacity=2, overflow=overflow)
+
+
+def queued(dispatcher):
+    return {lane.name: [d["n"] for d, _ in lane.items] for lane in dispatcher.lanes.values() if lane.items}
+
+
+def test_full_queue_sheds_lower_lanes_first():
+    spooled = []
+    d = dispatcher(spooled.append)
+    d.submit({"n": 1}, MEDIUM)
+    d.submit({"n": 2}, LOW)
+    assert d.submit({"n": 3}, HIGH)
+    assert queued(d) == {"HIGH": [3], "MEDIUM": [1]}
+    assert not d.submit({"n": 4}, LOW)
+    assert spooled == []
+
+
+def test_high_triggers_are_spooled_not_shed():
+    spooled = []
+    d = dispatcher(spooled.append)
+    d.submit({"n": 1}, HIGH)
+    d.submit({"n": 2}, HIGH)
+
+    assert d.submit({"n": 3}, HIGH)
+    assert queued(d) == {"HIGH": [1, 2]}
+    assert spooled == [[{"n": 3}]]
+    assert d.get_stats()["lanes"]["HIGH"]["shed"] == 0
+    assert d.get_stats()["lanes"]["HIGH"]["spooled"] == 1
+
+    # Lower levels still give way
+    assert not d.submit({"n": 4}, MEDIUM)
+
+
+def test_high_triggers_queue_over_capacity_without_overflow():
+    d = dispatcher(None)
+    for n in range(3):
+        assert d.submit({"n": n}, HIGH)
+    assert queued(d) == {"HIGH": [0, 1, 2]}
+
+
+def test_engine_stats_are_logged(caplog):
+    stats = threat_engine.get_engine_stats()
+    assert set(stats) == {"tracks", "dispatch", "delivery", "transport", "dedup", "fusion", "detections"}
+    assert "breaker" in stats["delivery"]
+
+    with caplog.at_level(logging.INFO, logger="logic.engine_stats"):
+        threat_engine.log_engine_stats()
+    line = caplog.records[-1].getMessage()
+    assert line.startswith("[ENGINE-STATS] ")
+    assert json.loads(line[len("[ENGINE-STATS] "):])["tracks"] == json.loads(json.dumps(stats["tracks"]))
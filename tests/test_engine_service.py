@@ -0,0 +1,66 @@
+"""
+Tests for the threat engine Unix socket service and its client
+"""
+
+import time
+import asyncio
+import threading
+
+import pytest
+
+from logic.engine_service import EngineService, EngineClient
+
+
+@pytest.fixture
+def service(tmp_path):
+    calls = []
+
+    def evaluate(detection):
+        calls.append(detection)
+        if detection["confidence"] == 0.5:
+            raise OverflowError("engine failure")
+        if detection["confidence"] == 0.6:
+            time.sleep(0.5)
+        return "HIGH"
+
+    service = EngineService(tmp_path / "engine.sock", evaluate=evaluate)
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(service.serve_forever())
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if (tmp_path / "engine.sock").exists():
+            break
+        time.sleep(0.01)
+    yield service, calls
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(2)
+
+
+def test_engine_error_rejects_frame_and_keeps_connection(service):
+    service, calls = service
+    client = EngineClient(service.socket_path)
+    with pytest.raises(ValueError):
+        client.evaluate_batch([{"confidence": 0.5}])
+    assert client.evaluate_batch([{"confidence": 0.9}]) == ["HIGH"]
+    assert service.get_stats()["rejected_frames"] == 1
+    client.close()
+
+
+def test_timed_out_frame_is_not_resent(service):
+    service, calls = service
+    client = EngineClient(service.socket_path, timeout=0.1)
+    with pytest.raises(OSError):
+        client.evaluate_batch([{"confidence": 0.6}])
+    time.sleep(0.6)
+    assert len(calls) == 1
+    # The late response is not mistaken for the next frame's
+    assert client.evaluate_batch([{"confidence": 0.9}]) == ["HIGH"]
+    client.close()
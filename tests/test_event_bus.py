@@ -0,0 +1,79 @@
+"""
+Tests for the dashboard event bus shared between backend workers
+"""
+
+import pytest
+
+from event_bus import EventBus
+from threat_store import ThreatStore
+
+
+@pytest.fixture
+def workers(tmp_path):
+    # Two backend workers: each has its own store connection and bus on the same database
+    stores = [ThreatStore(tmp_path / "threats.db") for _ in range(2)]
+    buses = []
+    for store in stores:
+        bus = EventBus(history=10, poll_interval=0.01)
+        bus.attach(store)
+        buses.append(bus)
+    yield buses
+    for store in stores:
+        store.close()
+
+
+def read_all(bus, after, local_after=0, attempts=50):
+    # Shared events arrive on the poller's schedule - read until something shows up
+    for _ in range(attempts):
+        frames, last_id, local_after = bus.read(after, local_after, timeout=0.05)
+        if frames:
+            return frames, last_id
+    return frames, last_id
+
+
+def test_events_reach_subscribers_of_every_worker(workers):
+    worker_a, worker_b = workers
+    after, _ = worker_b.subscribe()
+
+    worker_a.publish("threat", {"n": 1})
+    frames, last_id = read_all(worker_b, after)
+
+    assert frames == [b'id: 1\nevent: threat\ndata: {"n":1}\n\n']
+    assert last_id == 1
+
+
+def test_resume_on_another_worker(workers):
+    worker_a, worker_b = workers
+    for n in range(3):
+        worker_a.publish("job", {"n": n})
+    worker_a.store.flush()
+
+    # Worker B never polled these events; the client's id from worker A still resumes
+    worker_b.subscribe()
+    frames, last_id = read_all(worker_b, 1)
+    assert [frame.split(b"\n")[0] for frame in frames] == [b"id: 2", b"id: 3"]
+    assert last_id == 3
+
+
+def test_unknown_or_expired_ids_resync(workers):
+    worker_a, worker_b = workers
+    for n in range(15):
+        worker_a.publish("job", {"n": n})
+    worker_a.store.flush()
+    worker_b.subscribe()
+    read_all(worker_b, 14)
+
+    assert worker_b.read(99, 0, timeout=0)[0] is None   # never issued
+    assert worker_b.read(1, 0, timeout=0)[0] is None    # older than the kept history
+
+
+def test_status_frames_stay_local(workers):
+    worker_a, worker_b = workers
+    worker_a.subscribe()
+    after, local_after = worker_b.subscribe()
+
+    worker_a.publish_local("status", {"jammer": "on"})
+    frames, _, _ = worker_b.read(after, local_after, timeout=0.05)
+    assert frames == []
+    frames, _, _ = worker_a.read(0, 0, timeout=0)
+    assert frames == [b'event: status\ndata: {"jammer":"on"}\n\n']
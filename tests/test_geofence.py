@@ -0,0 +1,66 @@
+"""
+Tests for rasterized geofence zone lookup
+"""
+
+import json
+
+import numpy as np
+
+from logic.geofence import GeofenceMap, CameraZoneMap, rasterize_polygon
+
+ZONES = [
+    {"name": "buffer", "polygon": [[10, 10], [90, 10], [90, 70], [10, 70]]},
+    {"name": "core", "polygon": [[40, 30], [60, 30], [60, 50], [40, 50]]}
+]
+
+
+def box_at(x, y):
+    return [x - 2, y - 2, x + 2, y + 2]
+
+
+def test_rasterized_triangle_matches_point_in_polygon():
+    triangle = [[2, 2], [30, 5], [10, 25]]
+    mask = rasterize_polygon(triangle, 32, 32)
+
+    def contains(px, py):
+        inside = False
+        for (ax, ay), (bx, by) in zip(triangle, triangle[1:] + triangle[:1]):
+            if (ay > py) != (by > py) and px < ax + (py - ay) * (bx - ax) / (by - ay):
+                inside = not inside
+        return inside
+
+    expected = np.array([[contains(x + 0.5, y + 0.5) for x in range(32)] for y in range(32)])
+    assert (mask == expected).all()
+    assert not rasterize_polygon([[0, 0], [5, 5]], 8, 8).any()
+    assert not rasterize_polygon([[100, 100], [120, 100], [110, 120]], 8, 8).any()
+
+
+def test_inner_zones_are_painted_over_outer_ones():
+    zone_map = CameraZoneMap("0", 100, 80, ZONES)
+    boxes = [box_at(50, 40), box_at(20, 20), box_at(95, 75), box_at(-50, 40)]
+    assert zone_map.zone_names(zone_map.zone_ids(boxes)).tolist() == ["core", "buffer", "", ""]
+    assert np.allclose(zone_map.centroids["core"], (50, 40))
+
+
+def test_scaled_labels_give_the_same_zones():
+    full = CameraZoneMap("0", 100, 80, ZONES)
+    half = CameraZoneMap("0", 100, 80, ZONES, scale=0.5)
+    assert half.labels.shape == (40, 50)
+    boxes = [box_at(x, y) for x in range(0, 100, 7) for y in range(0, 80, 7)]
+    assert (full.zone_ids(boxes) == half.zone_ids(boxes)).all()
+
+
+def test_geofence_file_lookup_and_annotate(tmp_path):
+    path = tmp_path / "zones.json"
+    path.write_text(json.dumps({"cam-1": {"width": 100, "height": 80, "zones": ZONES}}))
+    geofence = GeofenceMap.from_file(path)
+    assert len(geofence) == 1
+
+    ids, names = geofence.lookup("cam-1", [box_at(50, 40), box_at(20, 20)])
+    assert ids.tolist() == [2, 1] and names.tolist() == ["core", "buffer"]
+    ids, names = geofence.lookup("cam-2", [box_at(50, 40)])
+    assert ids.tolist() == [0] and names.tolist() == [""]
+
+    annotated = geofence.annotate({"camera_id": "cam-1", "bbox": box_at(50, 40)})
+    assert annotated["zone"] == "core" and annotated["zone_id"] == 2
+    assert geofence.zone_centroid("cam-2", "core") is None
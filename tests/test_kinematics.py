@@ -0,0 +1,67 @@
+"""
+Tests for kinematic track history and threat scoring
+"""
+
+import math
+
+import pytest
+
+from logic.kinematics import KinematicHistory, kinematic_score, HISTORY_SIZE, GROWTH_WEIGHT, SPEED_WEIGHT, ZONE_WEIGHT
+
+
+def test_velocity_and_growth_over_the_ring():
+    history = KinematicHistory()
+    # 100 px/s to the right, area doubling every second, sampled at 10 Hz
+    for i in range(3 * HISTORY_SIZE):
+        t = i * 0.1
+        history.update(100.0 + 100.0 * t, 50.0, 400.0 * 2 ** t, t)
+    assert history.count == HISTORY_SIZE
+    assert history.vx == pytest.approx(100.0) and history.vy == pytest.approx(0.0)
+    assert history.speed == pytest.approx(100.0)
+    assert history.growth_rate == pytest.approx(math.log(2))
+    assert history.time_to_contact == pytest.approx(2 / math.log(2))
+
+
+def test_rates_wait_for_enough_history():
+    history = KinematicHistory()
+    history.update(0.0, 0.0, 100.0, 10.0)
+    history.update(50.0, 0.0, 400.0, 10.01)
+    assert history.speed == 0.0 and history.growth_rate == 0.0
+    assert history.time_to_contact == math.inf
+
+
+def test_time_to_point():
+    history = KinematicHistory()
+    history.update(0.0, 0.0, 100.0, 0.0)
+    history.update(10.0, 0.0, 100.0, 1.0)
+    assert history.time_to_point(10.0, 0.0, 60.0, 0.0) == pytest.approx(5.0)
+    assert history.time_to_point(10.0, 0.0, -40.0, 0.0) == math.inf
+    assert history.time_to_point(10.0, 0.0, 10.0, 0.0) == 0.0
+
+
+def test_score_only_raises_confidence_and_is_capped():
+    assert kinematic_score(0.6, 0.0, 0.0, math.inf) == 0.6
+    assert kinematic_score(0.6, -1.0, 0.0, math.inf) == 0.6
+    full = kinematic_score(0.6, 10.0, 1e6, 0.0)
+    assert full == pytest.approx(0.6 + GROWTH_WEIGHT + SPEED_WEIGHT + ZONE_WEIGHT)
+    assert kinematic_score(0.99, 10.0, 1e6, 0.0) == 1.0
+    # Approaching faster scores higher
+    assert kinematic_score(0.6, 0.4, 0.0, math.inf) > kinematic_score(0.6, 0.1, 0.0, math.inf)
+
+
+def test_engine_scores_an_approaching_track_above_its_confidence(monkeypatch):
+    from logic import threat_engine
+    from logic.track_state import TrackStateStore
+
+    monkeypatch.setattr(threat_engine, "track_states", TrackStateStore())
+    monkeypatch.setattr(threat_engine, "geofence", None)
+    key = ("track", "cam-1", 1)
+    for i in range(6):
+        half = 10 + 4 * i  # box grows every frame
+        detection = {"confidence": 0.7, "camera_id": "cam-1", "track_id": 1,
+                     "bbox": [100 - half, 100 - half, 100 + half, 100 + half]}
+        annotated = threat_engine.annotate_kinematics(detection, key, 1000.0 + i * 0.1)
+    assert annotated["growth_rate"] > 0 and annotated["time_to_contact"] is not None
+    assert annotated["threat_score"] > 0.7
+    assert annotated["track_age"] == pytest.approx(0.5)
+    assert annotated["time_to_zone"] is None
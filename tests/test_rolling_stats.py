@@ -0,0 +1,53 @@
+"""
+Tests for rolling threat statistics zone handling
+"""
+
+from logic.rolling_stats import ThreatStatistics, counts_snapshot
+
+NOW = 1_700_000_000.0
+
+
+def zones(stats):
+    return stats.snapshot(now=NOW)["last_minute"]["by_zone"]
+
+
+def test_zone_rows_are_capped():
+    stats = ThreatStatistics(max_zones=2)
+    for zone in ("a", "b", "c", "d"):
+        stats.record(zone, 3, timestamp=NOW)
+    stats.record("a", 3, timestamp=NOW)
+
+    by_zone = zones(stats)
+    assert set(by_zone) == {"a", "b", "other"}
+    assert by_zone["a"]["HIGH"] == 2
+    assert by_zone["other"]["HIGH"] == 2
+
+
+def test_zone_values_that_are_not_names_count_as_other():
+    stats = ThreatStatistics()
+    stats.record(["core"], 2, timestamp=NOW)
+    stats.record({"id": 1}, 2, timestamp=NOW)
+    stats.record(7, 2, timestamp=NOW)
+    stats.record(None, 2, timestamp=NOW)
+
+    assert zones(stats) == {
+        "other": {"NONE": 0, "LOW": 0, "MEDIUM": 2, "HIGH": 0},
+        "7": {"NONE": 0, "LOW": 0, "MEDIUM": 1, "HIGH": 0},
+        "unzoned": {"NONE": 0, "LOW": 0, "MEDIUM": 1, "HIGH": 0}
+    }
+
+
+def test_counts_snapshot_matches_recorded_statistics():
+    stats = ThreatStatistics(max_zones=2)
+    events = [("a", 3), ("a", 3), ("b", 1), ("c", 2), (None, 0)]
+    for zone, level in events:
+        stats.record(zone, level, timestamp=NOW)
+
+    # Zones beyond max_zones fold into "other" (the least active ones, for stored counts)
+    snapshot = counts_snapshot({"last_minute": (60.0, [(zone, level, 1) for zone, level in events])}, max_zones=2)
+    window = snapshot["last_minute"]
+    assert window["total"] == stats.snapshot(now=NOW)["last_minute"]["total"] == 5
+    assert window["by_level"] == {"NONE": 1, "LOW": 1, "MEDIUM": 1, "HIGH": 2}
+    assert window["by_zone"]["a"]["HIGH"] == 2
+    assert sum(sum(levels.values()) for levels in window["by_zone"].values()) == 5
+    assert len(window["by_zone"]) == 3
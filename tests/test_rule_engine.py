@@ -0,0 +1,87 @@
+"""
+Tests for threat rule compilation and validation
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from logic.rule_engine import RuleSet, RuleError, DetectionColumns
+from logic.threat_evaluation import load_threat_rules, load_threat_evaluator
+
+
+VALID_RULE = {
+    "name": "core",
+    "level": "HIGH",
+    "when": {"zone": ["core"], "confidence": {"min": 0.5}, "hour": {"between": [20, 6]}}
+}
+
+
+def test_valid_rules_apply():
+    rules = RuleSet([
+        {"name": "core", "level": "HIGH", "when": {"zone": ["core"], "confidence": {"min": 0.5}}}
+    ])
+    columns = DetectionColumns.from_dicts([
+        {"confidence": 0.6, "zone": "core"},
+        {"confidence": 0.6, "zone": "perimeter"}
+    ])
+    levels, rule_index = rules.apply(columns, np.array([1, 1]))
+    assert levels.tolist() == [3, 1]
+    assert rule_index.tolist() == [0, -1]
+
+
+@pytest.mark.parametrize("definitions", [
+    {"name": "x", "level": "HIGH"},                                   # object instead of a list
+    ["not a rule"],
+    [dict(VALID_RULE, level=None)],
+    [dict(VALID_RULE, level=3)],
+    [dict(VALID_RULE, level="CRITICAL")],
+    [dict(VALID_RULE, when=["zone"])],                               # non-dict when
+    [dict(VALID_RULE, when={"confidence": {"min": None}})],
+    [dict(VALID_RULE, when={"confidence": {"min": "0.5"}})],
+    [dict(VALID_RULE, when={"confidence": {"min": 0.9, "max": 0.1}})],
+    [dict(VALID_RULE, when={"confidence": {}})],
+    [dict(VALID_RULE, when={"confidence": 0.5})],
+    [dict(VALID_RULE, when={"hour": {"between": 5}})],
+    [dict(VALID_RULE, when={"hour": {"between": [1]}})],
+    [dict(VALID_RULE, when={"hour": {"between": [None, 6]}})],
+    [dict(VALID_RULE, when={"hour": {"between": [20, 30]}})],
+    [dict(VALID_RULE, when={"hour": [20, 6]})],
+    [dict(VALID_RULE, when={"zone": [{"a": 1}]})],
+    [dict(VALID_RULE, when={"zone": []})],
+    [dict(VALID_RULE, when={"altitude": {"min": 1}})]
+])
+def test_malformed_rules_raise_rule_error(definitions):
+    with pytest.raises(RuleError):
+        RuleSet(definitions)
+
+
+def test_malformed_rule_file_is_rejected_by_loader(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"name": "x", "level": "HIGH"}))
+    assert load_threat_rules(path) is None
+    with pytest.raises(ValueError):
+        load_threat_evaluator(thresholds_path=None, rules_path=path)
+
+
+def test_non_finite_scores_classify_as_none():
+    evaluator = load_threat_evaluator(thresholds_path=None, rules_path=None)
+    levels = evaluator.classify_levels([np.nan, np.inf, -np.inf, 0.99])
+    assert levels.tolist() == [0, 0, 0, 3]
+    result = evaluator.evaluate_detection({"confidence": 0.1, "threat_score": float("nan")})
+    assert result["threat_level"] == "NONE" and not result["api_triggered"]
+
+
+def test_columns_tolerate_null_and_non_numeric_fields():
+    columns = DetectionColumns.from_dicts([
+        {"confidence": 0.9, "smoothed_confidence": None, "track_age": None, "speed": "fast", "timestamp_s": 0},
+        {"confidence": 0.5, "track_age": float("nan"), "speed": 10 ** 400, "bbox": [0, 0, None, 4]},
+        {"confidence": 0.4, "smoothed_confidence": 0.7, "track_age": 3, "speed": 2.5, "timestamp_s": float("inf")}
+    ])
+    assert columns["confidence"].tolist() == [0.9, 0.5, 0.7]
+    assert columns["track_age"].tolist() == [0.0, 0.0, 3.0]
+    assert columns["speed"].tolist() == [0.0, 0.0, 2.5]
+    assert columns["timestamp_s"][0] == 0.0
+    assert columns["timestamp_s"][2] > 0 and np.isfinite(columns["timestamp_s"]).all()
+    assert columns["bbox"][1].tolist() == [0.0, 0.0, 0.0, 4.0]
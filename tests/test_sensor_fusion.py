@@ -0,0 +1,80 @@
+"""
+Tests for multi-sensor fusion joins
+"""
+
+from logic.sensor_fusion import SensorFusion, combine_scores
+from logic.threat_engine import annotate_fusion
+from logic.track_state import track_key
+
+
+def event(source, sensor_id, position, confidence=0.9, timestamp_s=1000.0, **fields):
+    return dict(fields, source=source, sensor_id=sensor_id, site_position=position,
+                confidence=confidence, timestamp_s=timestamp_s)
+
+
+def test_camera_and_rf_at_one_position_share_a_fusion_id():
+    fusion = SensorFusion(window=1.0, cell_size=10.0)
+    camera = fusion.fuse(event("camera", "cam0", [5.0, 5.0], track_id=1))
+    rf = fusion.fuse(event("rf", "rf0", [8.0, 6.0], timestamp_s=1000.5))
+    assert rf["fusion_id"] == camera["fusion_id"]
+    assert rf["fused_sources"] == ["camera", "rf"]
+    assert rf["fusion_support"] == 0.9
+
+
+def test_two_objects_from_one_sensor_are_not_fused():
+    fusion = SensorFusion(window=1.0, cell_size=10.0)
+    first = fusion.fuse(event("camera", "cam0", [5.0, 5.0], track_id=1))
+    second = fusion.fuse(event("camera", "cam0", [6.0, 5.0], track_id=2))
+    assert second["fusion_id"] != first["fusion_id"]
+    assert second["fused_sources"] == ["camera"]
+
+
+def test_distant_and_unpositioned_events_are_not_joined():
+    fusion = SensorFusion(window=1.0, cell_size=10.0)
+    camera = fusion.fuse(event("camera", "cam0", [5.0, 5.0]))
+    far = fusion.fuse(event("rf", "rf0", [50.0, 5.0]))
+    assert far["fusion_id"] != camera["fusion_id"] and far["fusion_support"] == 0.0
+
+    unplaced = event("rf", "rf1", None)
+    assert fusion.fuse(unplaced) is unplaced
+    assert fusion.fuse(event("camera", "cam1", [5.0, 6.0]))["fused_sources"] == ["camera"]
+
+
+def test_fused_drones_keep_their_own_track_keys():
+    fusion = SensorFusion(window=1.0, cell_size=10.0)
+    rf = fusion.fuse(event("rf", "rf0", [5.0, 5.0]))
+    drone_a = fusion.fuse(event("camera", "cam0", [4.0, 5.0], camera_id="cam0", track_id=1))
+    drone_b = fusion.fuse(event("camera", "cam0", [6.0, 5.0], camera_id="cam0", track_id=2))
+    assert drone_a["fusion_id"] == rf["fusion_id"]
+    assert track_key(drone_a) == ("track", "cam0", 1)
+    assert track_key(drone_b) == ("track", "cam0", 2)
+
+
+def test_support_combines_the_strongest_event_per_other_source():
+    fusion = SensorFusion(window=1.0, cell_size=10.0)
+    fusion.fuse(event("rf", "rf0", [5.0, 5.0], confidence=0.5))
+    fusion.fuse(event("rf", "rf1", [5.0, 6.0], confidence=0.75))
+    fusion.fuse(event("acoustic", "mic0", [6.0, 5.0], confidence=0.5))
+    camera = fusion.fuse(event("camera", "cam0", [5.0, 5.0]))
+    # Noisy-OR of rf (0.8 * 0.75) and acoustic (0.6 * 0.5)
+    assert camera["fusion_support"] == round(1 - (1 - 0.6) * (1 - 0.3), 4)
+    assert camera["fused_sources"] == ["acoustic", "camera", "rf"]
+    assert combine_scores(0.5, camera["fusion_support"]) == 1 - 0.5 * (1 - camera["fusion_support"])
+
+
+def test_events_outside_the_window_are_not_joined_and_get_evicted():
+    fusion = SensorFusion(window=1.0, cell_size=10.0)
+    rf = fusion.fuse(event("rf", "rf0", [5.0, 5.0], timestamp_s=1000.0))
+    late = fusion.fuse(event("camera", "cam0", [5.0, 5.0], timestamp_s=1001.5))
+    assert late["fusion_id"] != rf["fusion_id"] and late["fusion_support"] == 0.0
+
+    fusion.fuse(event("camera", "cam1", [500.0, 500.0], timestamp_s=1010.0))
+    stats = fusion.get_stats()
+    assert stats["indexed_events"] == 1 and stats["active_cells"] == 1
+    assert stats["events"] == 3 and stats["fused_events"] == 0
+
+
+def test_engine_raises_the_score_of_a_fused_detection():
+    fused = annotate_fusion({"confidence": 0.6, "threat_score": 0.7, "fusion_support": 0.5})
+    assert fused["sensor_score"] == 0.7
+    assert fused["threat_score"] == 0.85
@@ -0,0 +1,86 @@
+"""
+Tests for the SQLite threat store
+"""
+
+import pytest
+
+from threat_store import ThreatStore, _INSERT, _row
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ThreatStore(tmp_path / "threats.db")
+    yield store
+    store.close()
+
+
+def entry(**detection):
+    return {
+        "timestamp": "2024-01-01T00:00:00",
+        "detection": dict({"class_name": "drone", "confidence": 0.9, "threat_level": "HIGH"}, **detection),
+        "action": "COUNTERMEASURE_ACTIVATED"
+    }
+
+
+def test_client_fields_are_coerced_to_column_types(store):
+    store.append([
+        entry(zone=["z"], camera_id={"id": 1}, class_name=7, confidence="x"),
+        entry(zone="core", camera_id=3)
+    ])
+    store.flush()
+    threats, _ = store.query(fields={"zone", "camera_id", "class_name", "confidence"})
+    assert [t["detection"] for t in threats] == [
+        {"camera_id": "3", "class_name": "drone", "confidence": 0.9, "zone": "core"},
+        {"camera_id": None, "class_name": "7", "confidence": None, "zone": None}
+    ]
+    # The raw values are kept in the detection JSON
+    full, _ = store.query(limit=1, cursor=threats[0]["id"])
+    assert full[0]["detection"]["zone"] == ["z"]
+
+
+
+def test_detection_field_projects_the_whole_detection(store):
+    store.append([entry(zone="core", track_id=4)])
+    store.flush()
+    threats, _ = store.query(fields={"timestamp", "detection"})
+    assert set(threats[0]) == {"id", "timestamp", "detection"}
+    assert threats[0]["detection"]["track_id"] == 4
+    assert threats[0]["detection"]["zone"] == "core"
+
+def test_bad_row_does_not_roll_back_its_batch(store):
+    good = _row(entry(zone="core"))
+    bad = good[:5] + (["not", "bindable"],) + good[6:]
+    # One queued operation, so both rows share a transaction
+    store._submit(_INSERT, [good, bad, good])
+    store.flush()
+    assert store.count() == 2
+    assert store.get_stats()["dropped"] == 1
+
+
+def test_count_is_maintained_across_stores_and_clear(store, tmp_path):
+    store.append([entry(), entry()])
+    store.flush()
+    # A second worker's store sees the same counter
+    other = ThreatStore(store.path)
+    assert other.count() == 2
+    other.append([entry()])
+    other.flush()
+    assert store.count() == 3
+    assert store.clear() == 3
+    assert other.count() == 0
+    other.close()
+
+
+def test_time_filters_do_not_assume_ids_follow_time(store):
+    # Written out of time order (another worker, or a clock step back)
+    store.append([
+        dict(entry(), timestamp="2024-01-01T00:10:00"),
+        dict(entry(), timestamp="2024-01-01T00:00:00"),
+        dict(entry(), timestamp="2024-01-01T00:20:00")
+    ])
+    store.flush()
+    since = _row(dict(entry(), timestamp="2024-01-01T00:05:00"))[1]
+    newer, _ = store.query(since=since)
+    older, _ = store.query(until=since)
+    assert [t["timestamp"] for t in newer] == ["2024-01-01T00:20:00", "2024-01-01T00:10:00"]
+    assert [t["timestamp"] for t in older] == ["2024-01-01T00:00:00"]
@@ -0,0 +1,65 @@
+"""
+Tests for per-track alert state and untracked-box association
+"""
+
+from logic.track_state import TrackStateStore, TrackAssociator, track_key, has_track_identity
+
+
+def moving_drone(step, frames=20, camera_id=0):
+    """Untracked detections of one drone moving `step` px per frame at 20 fps"""
+    for frame_id in range(frames):
+        x = 50 + step * frame_id
+        yield {
+            "class_name": "drone",
+            "confidence": 0.97,
+            "bbox": [x, 100, x + 40, 140],
+            "timestamp_s": 1000.0 + frame_id * 0.05,
+            "frame_id": frame_id,
+            "camera_id": camera_id
+        }
+
+
+def test_untracked_drone_keeps_one_key_across_cells():
+    associator = TrackAssociator()
+    keys = {track_key(d, associator=associator, now=d["timestamp_s"]) for d in moving_drone(70)}
+    assert len(keys) == 1
+    assert not has_track_identity(next(iter(keys)))
+
+
+def test_cooldown_holds_across_cells():
+    store = TrackStateStore(cooldown=30.0)
+    associator = TrackAssociator()
+    reasons = []
+    for d in moving_drone(70):
+        key = track_key(d, associator=associator, now=d["timestamp_s"])
+        reasons.append(store.observe(key, 3, True, now=d["timestamp_s"]))
+    assert reasons[0] == "NEW_OBJECT"
+    assert reasons[1:] == [None] * 19
+
+
+def test_boxes_of_one_frame_get_separate_ids():
+    associator = TrackAssociator()
+    a = associator.associate(0, 100, 100, 1.0, frame_id=1)
+    b = associator.associate(0, 120, 100, 1.0, frame_id=1)
+    assert a != b
+    assert associator.associate(0, 105, 100, 1.05, frame_id=2) in (a, b)
+
+
+def test_association_is_per_camera_and_expires():
+    associator = TrackAssociator(ttl=2.0)
+    a = associator.associate(0, 100, 100, 1.0)
+    assert associator.associate(1, 100, 100, 1.0) != a
+    assert associator.associate(0, 100, 100, 10.0) != a
+
+
+def test_kofn_smoothing_survives_cell_crossings():
+    # Regression: with per-cell keys a drone moving 70 px/frame never reached k=2 hits
+    for step in (20, 70, 150):
+        store = TrackStateStore()
+        associator = TrackAssociator()
+        smoothed = []
+        for d in moving_drone(step):
+            key = track_key(d, associator=associator, now=d["timestamp_s"])
+            smoothed.append(store.smooth_confidence(key, d["confidence"], now=d["timestamp_s"]))
+        assert smoothed[0] == 0.0
+        assert smoothed[1:] == [0.97] * 19
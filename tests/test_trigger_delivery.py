@@ -0,0 +1,101 @@
+"""
+Tests for the circuit breaker, trigger spool and reliable sender
+"""
+
+import json
+import time
+
+from logic.trigger_delivery import (
+    CircuitBreaker, TriggerSpool, ReliableTriggerSender, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+)
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_breaker_opens_probes_once_and_closes():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == STATE_CLOSED and breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN and not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.allow_request()          # the single half-open probe
+    assert breaker.state == STATE_HALF_OPEN and not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == STATE_OPEN
+
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == STATE_CLOSED and breaker.get_status()["open_count"] == 2
+
+
+def test_spool_resumes_in_order_after_restart(tmp_path):
+    spool = TriggerSpool(tmp_path / "spool.jsonl")
+    spool.append([{"n": 1}])
+    spool.append([{"n": 2}])
+    detections, next_offset = spool.peek()
+    spool.commit(next_offset)
+    assert detections == [{"n": 1}]
+
+    reopened = TriggerSpool(tmp_path / "spool.jsonl")
+    assert len(reopened) == 1
+    assert reopened.peek()[0] == [{"n": 2}]
+
+
+def test_partial_tail_is_cut_on_open(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    path.write_text(json.dumps({"detections": [{"n": 1}]}) + "\n" + '{"detections": [{"n"')
+    spool = TriggerSpool(path)
+    assert len(spool) == 1
+    assert spool.peek()[0] == [{"n": 1}]
+    spool.append([{"n": 2}])
+    assert [json.loads(line)["detections"] for line in path.read_text().splitlines()] == [[{"n": 1}], [{"n": 2}]]
+
+
+def test_corrupt_entry_is_quarantined(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    path.write_text("not json\n" + json.dumps({"other": 1}) + "\n" + json.dumps({"detections": [{"n": 3}]}) + "\n")
+    spool = TriggerSpool(path)
+    detections, _ = spool.peek()
+    assert detections == [{"n": 3}]
+    assert spool.quarantined == 2
+    assert len(spool.quarantine_path.read_text().splitlines()) == 2
+
+
+def test_replay_survives_corrupt_entries_and_delivers_the_rest(tmp_path):
+    path = tmp_path / "spool.jsonl"
+    path.write_text("garbage\n" + json.dumps({"detections": [{"n": 1}]}) + "\n")
+    sent = []
+    sender = ReliableTriggerSender(
+        lambda detections: sent.append(detections) or True,
+        spool=TriggerSpool(path),
+        replay_interval=0.01
+    )
+    assert wait_for(lambda: len(sender.spool) == 0)
+    assert sent == [[{"n": 1}]]
+
+    # New triggers go straight out once the spool has drained
+    assert sender([{"n": 2}])
+    assert sent[-1] == [{"n": 2}]
+
+
+def test_raising_transport_spools_and_replays(tmp_path):
+    calls = []
+
+    def send(detections):
+        calls.append(detections)
+        if len(calls) == 1:
+            raise ConnectionError("backend down")
+        return True
+
+    sender = ReliableTriggerSender(send, spool=TriggerSpool(tmp_path / "spool.jsonl"), replay_interval=0.01)
+    assert not sender([{"n": 1}])
+    assert wait_for(lambda: sender.replayed == 1)
+    assert calls == [[{"n": 1}], [{"n": 1}]]
@@ -0,0 +1,85 @@
+"""
+Tests for the binary trigger wire format (decode errors must be WireFormatError)
+"""
+
+import math
+import struct
+
+import pytest
+
+from logic.wire_format import encode_trigger, decode_trigger, WireFormatError, _HEADER
+
+
+DETECTION = {
+    "class_name": "drone",
+    "confidence": 0.93,
+    "bbox": [120, 80, 180, 140],
+    "timestamp_s": 1700000000.0,
+    "frame_id": 7,
+    "camera_id": "cam-1",
+    "threat_level": "HIGH"
+}
+
+
+def encode(**detection):
+    return encode_trigger({
+        "threat_detected": True,
+        "detections": [dict(DETECTION, **detection)],
+        "timestamp": "2024-01-01T00:00:00"
+    })
+
+
+def with_header_epoch(message: bytes, epoch: float) -> bytes:
+    fields = list(_HEADER.unpack_from(message, 0))
+    fields[4] = epoch
+    return _HEADER.pack(*fields) + message[_HEADER.size:]
+
+
+def test_round_trip():
+    decoded = decode_trigger(encode())
+    assert decoded["threat_detected"] is True
+    assert decoded["timestamp"] == "2024-01-01T00:00:00"
+    detection = decoded["detections"][0]
+    for name, value in DETECTION.items():
+        assert detection[name] == value
+
+
+@pytest.mark.parametrize("epoch", [1e300, -1e300, math.inf, math.nan])
+def test_out_of_range_header_timestamp(epoch):
+    with pytest.raises(WireFormatError):
+        decode_trigger(with_header_epoch(encode(), epoch))
+
+
+@pytest.mark.parametrize("timestamp_s", [1e300, math.inf, math.nan])
+def test_out_of_range_detection_timestamp(timestamp_s):
+    message = encode()
+    # timestamp_s is a fixed double in the record; rewrite it in place
+    packed = struct.pack("<d", DETECTION["timestamp_s"])
+    assert message.count(packed) == 1
+    with pytest.raises(WireFormatError):
+        decode_trigger(message.replace(packed, struct.pack("<d", timestamp_s)))
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda m: m[:-3],                # truncated
+    lambda m: m + b"\x00",            # trailing bytes
+    lambda m: b"XXXX" + m[4:],       # wrong magic
+    lambda m: m[:_HEADER.size],      # records missing
+    lambda m: b""
+])
+def test_malformed_messages(mutate):
+    with pytest.raises(WireFormatError):
+        decode_trigger(mutate(encode()))
+
+
+def test_caller_timestamp_survives_round_trip():
+    from datetime import datetime
+
+    derived = datetime.fromtimestamp(DETECTION["timestamp_s"]).isoformat()
+    assert decode_trigger(encode(timestamp=derived))["detections"][0]["timestamp"] == derived
+    # Only the derived value is left out of the message
+    assert len(encode(timestamp=derived)) == len(encode())
+
+    for timestamp in ("2023-11-14T22:13:20.500000+00:00", "frame 7", None):
+        assert decode_trigger(encode(timestamp=timestamp))["detections"][0]["timestamp"] == timestamp
+    assert decode_trigger(encode(timestamp="x", timestamp_s=None))["detections"][0]["timestamp"] == "x"
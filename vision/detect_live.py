@@ -9,20 +9,24 @@ import os
 import sys
 from pathlib import Path
 import cv2
-import numpy as np
 from ultralytics import YOLO
-from datetime import datetime
 
 # Add parent directory to path for relative imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from logic.threat_engine import evaluate_threat
+from logic.engine_service import EngineClient
+from vision.detection_stream import DetectionStream
 
 
 # Configuration
 MODEL_PATH = "runs/detect/train/weights/best.pt"
 CONFIDENCE_THRESHOLD = 0.75
 CLASS_NAME = "drone"
+# Stable tracker ids (ultralytics ByteTrack, needs the lap package) drive per-track cooldown,
+# smoothing and kinematics; without them the engine associates boxes by proximity
+# and skips the kinematic score
+TRACK_OBJECTS = os.getenv("TRACK_OBJECTS", "true").lower() == "true"
+ENGINE_SOCKET = os.getenv("ENGINE_SOCKET")  # Shared engine service socket (unset = in-process engine)
 
 
 def load_model():
@@ -41,97 +45,125 @@ def load_model():
     return model
 
 
-def run_detection_pipeline(source=0, confidence_threshold=CONFIDENCE_THRESHOLD):
+def evaluate_with_service(engine_client, detections: list) -> list:
+    """
+    Evaluate a frame in the engine service, falling back to the in-process engine
+    while the service is unreachable (the client reconnects on the next frame)
+    
+    Args:
+        engine_client (EngineClient): Engine service client
+        detections (list): Detection dicts of one frame
+    
+    Returns:
+        list: Threat level name per detection
+    """
+    try:
+        return engine_client.evaluate_batch(detections)
+    except (OSError, ValueError) as e:
+        print(f"[WARNING] Engine service unavailable ({e}) - evaluating frame in-process")
+        from logic.threat_engine import evaluate_threat
+        return [evaluate_threat(d) for d in detections]
+
+
+def run_detection_pipeline(source=0, confidence_threshold=CONFIDENCE_THRESHOLD, model=None, display=True):
     """
     Run live detection from webcam or video source
     
     Args:
         source (int or str): 0 for webcam, or path to video file
         confidence_threshold (float): Minimum confidence to trigger threat evaluation
+        model: Preloaded YOLO model (loaded with load_model() if None)
+        display (bool): Draw detections and show the preview window
     """
     
     print(f"[DETECTION] Initializing live detection pipeline...")
     
     # Load model
-    model = load_model()
+    if model is None:
+        model = load_model()
+    
+    # Evaluate in the shared engine service, or in this process
+    engine_client = None
+    if ENGINE_SOCKET:
+        engine_client = EngineClient(ENGINE_SOCKET)
+        evaluate_frame = lambda detections: evaluate_with_service(engine_client, detections)
+        print(f"[DETECTION] Using threat engine service at {ENGINE_SOCKET}")
+    else:
+        from logic.threat_engine import (
+            evaluate_threat, warm_up_trigger_transport, start_config_watcher, start_stats_logger
+        )
+        evaluate_frame = lambda detections: [evaluate_threat(d) for d in detections]
+        
+        # Pre-open the backend connection (or start the in-process countermeasure worker)
+        warm_up_trigger_transport()
+        
+        # Hot-reload thresholds and rules while running
+        start_config_watcher()
+        
+        # Periodic dispatch / delivery / track statistics in the log
+        start_stats_logger()
     
     # Open video source (webcam = 0)
-    cap = cv2.VideoCapture(source)
+    stream = DetectionStream(
+        source=source,
+        model=model,
+        confidence_threshold=confidence_threshold,
+        keep_frames=display,
+        track=TRACK_OBJECTS
+    )
     
-    if not cap.isOpened():
+    try:
+        stream.open()
+    except IOError:
         print(f"[ERROR] Cannot open video source: {source}")
         return False
     
     print(f"[DETECTION] Pipeline started. Press 'q' to exit.")
     
-    frame_count = 0
     detection_count = 0
     threat_count = 0
     
     try:
-        while True:
-            ret, frame = cap.read()
-            
-            if not ret:
-                print(f"[WARNING] Failed to read frame, restarting...")
-                break
-            
-            frame_count += 1
+        for frame_detections in stream:
+            frame = frame_detections.frame
             
-            # Run YOLOv8 inference
-            results = model.predict(
-                source=frame,
-                conf=confidence_threshold,
-                verbose=False,
-                device="cpu"  # 0 for GPU, 'cpu' for CPU
-            )
-            
-            # Process detections
-            if results and len(results) > 0:
-                result = results[0]
-                detections = result.boxes
+            # Draw detections and evaluate threats
+            if len(frame_detections) > 0:
+                detection_count += 1
+                
+                # Evaluate the whole frame at once (one round trip to the engine service)
+                threats = frame_detections.to_dicts()
+                threat_levels = evaluate_frame(threats)
                 
-                # Draw detections and evaluate threats
-                if detections is not None and len(detections) > 0:
-                    detection_count += 1
+                for threat_data, threat_level in zip(threats, threat_levels):
+                    x1, y1, x2, y2 = threat_data["bbox"]
+                    confidence = threat_data["confidence"]
+                    class_name = threat_data["class_name"]
+                    
+                    print(f"[DETECTION] {class_name.upper()} detected")
+                    print(f"  └─ Confidence: {confidence:.2%}")
+                    print(f"  └─ Location: ({x1}, {y1}) → ({x2}, {y2})")
+                    print(f"  └─ Timestamp: {threat_data['timestamp']}")
                     
-                    for box in detections:
-                        # Extract bounding box coordinates
-                        x1, y1, x2, y2 = map(int, box.xyxy[0])
-                        confidence = float(box.conf[0])
-                        class_id = int(box.cls[0])
-                        
-                        # Get class name from model
-                        class_name = model.names[class_id] if class_id < len(model.names) else "unknown"
-                        
-                        print(f"[DETECTION] {class_name.upper()} detected")
-                        print(f"  └─ Confidence: {confidence:.2%}")
-                        print(f"  └─ Location: ({x1}, {y1}) → ({x2}, {y2})")
-                        print(f"  └─ Timestamp: {datetime.now().isoformat()}")
-                        
-                        # Evaluate threat and trigger API if necessary
-                        threat_data = {
-                            "class_name": class_name,
-                            "confidence": confidence,
-                            "bbox": [x1, y1, x2, y2],
-                            "timestamp": datetime.now().isoformat(),
-                            "frame_id": frame_count
-                        }
-                        
-                        threat_level = evaluate_threat(threat_data)
-                        if threat_level in ["MEDIUM", "HIGH"]:
-                            threat_count += 1
-                            print(f"[ALERT] Threat level: {threat_level}")
-                        
-                        # Draw bounding box on frame
-                        color = (0, 255, 0) if threat_level == "LOW" else (0, 165, 255) if threat_level == "MEDIUM" else (0, 0, 255)
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-                        
-                        # Draw label with confidence
-                        label = f"{class_name.upper()} {confidence:.2%}"
-                        label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
-                        cv2.rectangle(frame, (x1, y1 - label_size[1] - 5), (x1 + label_size[0], y1), color, -1)
-                        cv2.putText(frame, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+                    if threat_level in ["MEDIUM", "HIGH"]:
+                        threat_count += 1
+                        print(f"[ALERT] Threat level: {threat_level}")
+                    
+                    if not display:
+                        continue
+                    
+                    # Draw bounding box on frame
+                    color = (0, 255, 0) if threat_level == "LOW" else (0, 165, 255) if threat_level == "MEDIUM" else (0, 0, 255)
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
+                    
+                    # Draw label with confidence
+                    label = f"{class_name.upper()} {confidence:.2%}"
+                    label_size, _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.6, 2)
+                    cv2.rectangle(frame, (x1, y1 - label_size[1] - 5), (x1 + label_size[0], y1), color, -1)
+                    cv2.putText(frame, label, (x1, y1 - 5), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 2)
+            
+            if not display:
+                continue
             
             # Display frame with detections
             cv2.imshow("AeroGuard AI - Live Detection", frame)
@@ -140,22 +172,27 @@ def run_detection_pipeline(source=0, confidence_threshold=CONFIDENCE_THRESHOLD):
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 print(f"\n[INFO] Exiting detection pipeline...")
                 break
+        else:
+            print(f"[WARNING] Failed to read frame, stopping...")
     
     except KeyboardInterrupt:
         print(f"\n[INFO] Detection interrupted by user")
     
     finally:
-        # Cleanup
-        cap.release()
-        cv2.destroyAllWindows()
+        # Cleanup (errors still propagate - no return here)
+        stream.close()
+        if engine_client is not None:
+            engine_client.close()
+        if display:
+            cv2.destroyAllWindows()
         
         # Print statistics
         print(f"\n[STATISTICS]")
-        print(f"  Total frames processed: {frame_count}")
+        print(f"  Total frames processed: {stream.frame_count}")
         print(f"  Detections made: {detection_count}")
         print(f"  Threats confirmed: {threat_count}")
-        
-        return True
+    
+    return True
 
 
 if __name__ == "__main__":
@@ -0,0 +1,309 @@
+"""
+Streaming Detection API for AeroGuard AI
+Exposes live YOLOv8 inference as a lazy generator of FrameDetections
+Lets other services embed detection in-process without running detect_live.py
+Frames are only read from the source when the consumer asks for the next result
+"""
+
+import sys
+import time
+from pathlib import Path
+from datetime import datetime
+
+import cv2
+import numpy as np
+from numpy.lib.recfunctions import structured_to_unstructured
+
+# Add parent directory to path for relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+# Configuration
+CONFIDENCE_THRESHOLD = 0.75
+DEFAULT_DEVICE = "cpu"  # 0 for GPU, 'cpu' for CPU
+
+# Structured record layout for a single detection
+DETECTION_DTYPE = np.dtype([
+    ("x1", np.float32),
+    ("y1", np.float32),
+    ("x2", np.float32),
+    ("y2", np.float32),
+    ("confidence", np.float32),
+    ("class_id", np.int32),
+    ("track_id", np.int32),  # -1 when tracking is disabled or the box is untracked
+])
+
+
+class FrameDetections:
+    """
+    Detections produced for a single frame
+    Results are held in a structured NumPy array (one record per box)
+    """
+
+    __slots__ = ("frame_id", "timestamp", "detections", "names", "source", "frame")
+
+    def __init__(self, frame_id, timestamp, detections, names, source=0, frame=None):
+        """
+        Initialize frame detections
+
+        Args:
+            frame_id (int): 1-based index of the frame within the stream
+            timestamp (float): Capture time (seconds since epoch)
+            detections (np.ndarray): Structured array with DETECTION_DTYPE
+            names (dict): Model class id -> class name mapping
+            source (int or str): Video source the frame came from
+            frame (np.ndarray): Raw BGR frame, only kept when requested
+        """
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.detections = detections
+        self.names = names
+        self.source = source
+        self.frame = frame
+
+    def __len__(self):
+        return len(self.detections)
+
+    def __iter__(self):
+        return iter(self.detections)
+
+    @property
+    def boxes(self) -> np.ndarray:
+        """
+        Bounding boxes as an (N, 4) float32 array [x1, y1, x2, y2]
+        """
+        return structured_to_unstructured(self.detections[["x1", "y1", "x2", "y2"]])
+
+    @property
+    def confidences(self) -> np.ndarray:
+        """
+        Detection confidences as an (N,) float32 array
+        """
+        return self.detections["confidence"]
+
+    def class_name(self, class_id: int) -> str:
+        """
+        Resolve a class id to its model class name
+
+        Args:
+            class_id (int): Model class id
+
+        Returns:
+            str: Class name, or "unknown" if the id is not in the model
+        """
+        return self.names.get(int(class_id), "unknown")
+
+    def to_dicts(self) -> list:
+        """
+        Convert detections to the dict format consumed by the threat engine
+
+        Returns:
+            list: One detection dict per box (class_name, confidence, bbox, timestamp,
+                  timestamp_s, frame_id, camera_id and track_id when tracked)
+        """
+        timestamp = datetime.fromtimestamp(self.timestamp).isoformat()
+        results = []
+        for det in self.detections:
+            detection = {
+                "class_name": self.class_name(det["class_id"]),
+                "confidence": float(det["confidence"]),
+                "bbox": [int(det["x1"]), int(det["y1"]), int(det["x2"]), int(det["y2"])],
+                "timestamp": timestamp,
+                "timestamp_s": self.timestamp,
+                "frame_id": self.frame_id,
+                "camera_id": str(self.source)
+            }
+            if det["track_id"] >= 0:
+                detection["track_id"] = int(det["track_id"])
+            results.append(detection)
+        return results
+
+
+def results_to_array(result) -> np.ndarray:
+    """
+    Convert an ultralytics result into a structured detection array
+
+    Args:
+        result: Single ultralytics Results object
+
+    Returns:
+        np.ndarray: Structured array with DETECTION_DTYPE
+    """
+    boxes = result.boxes
+    if boxes is None or len(boxes) == 0:
+        return np.empty(0, dtype=DETECTION_DTYPE)
+
+    xyxy = boxes.xyxy.cpu().numpy()
+    detections = np.empty(len(xyxy), dtype=DETECTION_DTYPE)
+    detections["x1"] = xyxy[:, 0]
+    detections["y1"] = xyxy[:, 1]
+    detections["x2"] = xyxy[:, 2]
+    detections["y2"] = xyxy[:, 3]
+    detections["confidence"] = boxes.conf.cpu().numpy()
+    detections["class_id"] = boxes.cls.cpu().numpy()
+    detections["track_id"] = boxes.id.cpu().numpy() if boxes.id is not None else -1
+    return detections
+
+
+class DetectionStream:
+    """
+    Lazy, context-managed stream of FrameDetections from a video source
+
+    Usage:
+        with DetectionStream(source=0) as stream:
+            for frame_detections in stream:
+                ...
+
+    The source is only read when the consumer pulls the next item, so a slow
+    consumer naturally throttles capture and inference (back-pressure).
+    """
+
+    def __init__(self,
+                 source=0,
+                 model=None,
+                 confidence_threshold=CONFIDENCE_THRESHOLD,
+                 device=DEFAULT_DEVICE,
+                 keep_frames=False,
+                 skip_empty=False,
+                 max_frames=None,
+                 track=False):
+        """
+        Initialize detection stream
+
+        Args:
+            source (int or str): 0 for webcam, or path/URL of a video source
+            model: Loaded YOLO model (defaults to detect_live.load_model())
+            confidence_threshold (float): Minimum confidence kept by inference
+            device (str or int): Inference device passed to model.predict
+            keep_frames (bool): Attach the raw frame to each FrameDetections
+            skip_empty (bool): Only yield frames that contain detections
+            max_frames (int): Stop after this many frames (None = until source ends)
+            track (bool): Run the ultralytics tracker so detections carry stable track ids
+        """
+        self.source = source
+        self.model = model
+        self.confidence_threshold = confidence_threshold
+        self.device = device
+        self.keep_frames = keep_frames
+        self.skip_empty = skip_empty
+        self.max_frames = max_frames
+        self.track = track
+
+        self.frame_count = 0
+        self._cap = None
+        self._names = {}
+
+    def open(self):
+        """
+        Load the model (if needed) and open the video source
+
+        Raises:
+            IOError: If the video source cannot be opened
+        """
+        if self._cap is not None:
+            return self
+
+        if self.model is None:
+            from vision.detect_live import load_model
+            self.model = load_model()
+        self._names = dict(enumerate(self.model.names)) \
+            if isinstance(self.model.names, (list, tuple)) else dict(self.model.names)
+
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            raise IOError(f"Cannot open video source: {self.source}")
+
+        self._cap = cap
+        return self
+
+    def close(self):
+        """Release the video source"""
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._cap is not None
+
+    def read(self):
+        """
+        Read and run inference on the next frame
+
+        Returns:
+            FrameDetections: Detections for the frame, or None when the source is exhausted
+        """
+        if self._cap is None:
+            self.open()
+
+        if self.max_frames is not None and self.frame_count >= self.max_frames:
+            return None
+
+        ret, frame = self._cap.read()
+        if not ret:
+            return None
+
+        self.frame_count += 1
+        timestamp = time.time()
+
+        if self.track:
+            results = self.model.track(
+                source=frame,
+                conf=self.confidence_threshold,
+                verbose=False,
+                device=self.device,
+                persist=True
+            )
+        else:
+            results = self.model.predict(
+                source=frame,
+                conf=self.confidence_threshold,
+                verbose=False,
+                device=self.device
+            )
+        detections = results_to_array(results[0]) if results else np.empty(0, dtype=DETECTION_DTYPE)
+
+        return FrameDetections(
+            frame_id=self.frame_count,
+            timestamp=timestamp,
+            detections=detections,
+            names=self._names,
+            source=self.source,
+            frame=frame if self.keep_frames else None
+        )
+
+    def __iter__(self):
+        try:
+            while True:
+                frame_detections = self.read()
+                if frame_detections is None:
+                    return
+                if self.skip_empty and len(frame_detections) == 0:
+                    continue
+                yield frame_detections
+        finally:
+            self.close()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+def stream_detections(source=0, **kwargs):
+    """
+    Generator over FrameDetections from a video source
+    The source is released when the generator is exhausted or closed
+
+    Args:
+        source (int or str): 0 for webcam, or path/URL of a video source
+        **kwargs: Passed through to DetectionStream
+
+    Yields:
+        FrameDetections: Detections for each frame read from the source
+    """
+    with DetectionStream(source=source, **kwargs) as stream:
+        yield from stream
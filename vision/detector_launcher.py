@@ -0,0 +1,389 @@
+"""
+Multi-Camera Detector Launcher for AeroGuard AI
+Assigns cameras to detector processes and pins each process to a disjoint core set
+Matches torch/OpenMP thread pools to the pinned cores so processes don't contend
+Supports NUMA-local placement and reports per-core utilisation for box sizing
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+from pathlib import Path
+
+# Add parent directory to path for relative imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+# Configuration
+CONFIDENCE_THRESHOLD = 0.75
+REPORT_INTERVAL = 10  # seconds between utilisation reports
+NUMA_SYSFS_PATH = Path("/sys/devices/system/node")
+PROC_STAT_PATH = Path("/proc/stat")
+
+# Environment variables read by torch / OpenMP / BLAS when sizing thread pools
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def parse_cpu_list(text: str) -> list:
+    """
+    Parse a kernel cpulist string such as "0-3,8,10-11"
+
+    Args:
+        text (str): cpulist string
+
+    Returns:
+        list: Sorted CPU ids
+    """
+    cpus = set()
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.update(range(int(start), int(end) + 1))
+        else:
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def get_available_cores() -> list:
+    """
+    Get the CPU ids this process is allowed to run on
+
+    Returns:
+        list: Sorted CPU ids
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def get_numa_nodes(available_cores=None) -> list:
+    """
+    Discover NUMA nodes and their cores (Linux sysfs)
+    Falls back to a single node holding every available core
+
+    Args:
+        available_cores (list): Restrict nodes to these CPU ids
+
+    Returns:
+        list: One sorted core list per NUMA node (empty nodes omitted)
+    """
+    available = set(available_cores if available_cores is not None else get_available_cores())
+
+    nodes = []
+    if NUMA_SYSFS_PATH.exists():
+        for node_dir in sorted(NUMA_SYSFS_PATH.glob("node[0-9]*"), key=lambda p: int(p.name[4:])):
+            try:
+                cores = [c for c in parse_cpu_list((node_dir / "cpulist").read_text()) if c in available]
+            except (OSError, ValueError):
+                continue
+            if cores:
+                nodes.append(cores)
+
+    if not nodes:
+        nodes = [sorted(available)]
+    return nodes
+
+
+def plan_placement(cameras: list, cores_per_worker=None, numa=True, available_cores=None) -> list:
+    """
+    Assign cameras to detector workers, each pinned to a disjoint core set
+
+    One worker is created per camera while cores allow; with more cameras than
+    cores, cameras are shared round-robin between workers. Workers never span
+    NUMA nodes when NUMA placement is enabled.
+
+    Args:
+        cameras (list): Video sources (webcam index or path/URL)
+        cores_per_worker (int): Fixed core count per worker (None = split evenly)
+        numa (bool): Keep each worker's cores inside one NUMA node
+        available_cores (list): Cores to place on (defaults to process affinity)
+
+    Returns:
+        list: Worker plans as dicts with worker_id, cameras, cores and numa_node
+    """
+    if not cameras:
+        return []
+
+    cores = sorted(available_cores if available_cores is not None else get_available_cores())
+    nodes = get_numa_nodes(cores) if numa else [cores]
+
+    # Number of workers each node can host
+    if cores_per_worker:
+        capacity = [len(node) // cores_per_worker for node in nodes]
+        if sum(capacity) == 0:
+            raise ValueError(f"No NUMA node has {cores_per_worker} free cores")
+    else:
+        capacity = [len(node) for node in nodes]
+
+    num_workers = min(len(cameras), sum(capacity))
+
+    # Spread workers over nodes proportionally to their capacity
+    node_workers = [0] * len(nodes)
+    for _ in range(num_workers):
+        best = max(
+            (i for i in range(len(nodes)) if node_workers[i] < capacity[i]),
+            key=lambda i: (capacity[i] - node_workers[i]) / (node_workers[i] + 1)
+        )
+        node_workers[best] += 1
+
+    plans = []
+    for node_id, (node_cores, count) in enumerate(zip(nodes, node_workers)):
+        if count == 0:
+            continue
+        if cores_per_worker:
+            sizes = [cores_per_worker] * count
+        else:
+            base, extra = divmod(len(node_cores), count)
+            sizes = [base + (1 if i < extra else 0) for i in range(count)]
+
+        offset = 0
+        for size in sizes:
+            plans.append({
+                "worker_id": len(plans),
+                "cameras": [],
+                "cores": node_cores[offset:offset + size],
+                "numa_node": node_id if numa else None
+            })
+            offset += size
+
+    for index, camera in enumerate(cameras):
+        plans[index % len(plans)]["cameras"].append(camera)
+
+    return plans
+
+
+def pin_current_process(cores: list) -> bool:
+    """
+    Pin the calling process to the given cores and size thread pools to match
+    Must run before torch is imported so OpenMP picks up the thread count
+
+    Args:
+        cores (list): CPU ids to run on
+
+    Returns:
+        bool: True if CPU affinity was applied
+    """
+    num_threads = str(max(1, len(cores)))
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = num_threads
+
+    if not hasattr(os, "sched_setaffinity"):
+        print(f"[LAUNCHER] CPU affinity not supported on this platform - thread counts only")
+        return False
+
+    try:
+        os.sched_setaffinity(0, cores)
+        return True
+    except OSError as e:
+        print(f"[LAUNCHER] Failed to set CPU affinity {cores}: {e}")
+        return False
+
+
+def _detector_worker(plan: dict, confidence_threshold: float):
+    """
+    Detector process entry point
+    Pins itself, sizes the torch thread pools and runs one pipeline per camera
+    """
+    import threading
+
+    pin_current_process(plan["cores"])
+
+    import torch
+    torch.set_num_threads(max(1, len(plan["cores"])))
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        pass  # Inter-op pool already started
+
+    from vision.detect_live import load_model, run_detection_pipeline
+
+    print(f"[WORKER {plan['worker_id']}] PID {os.getpid()} on cores {plan['cores']} "
+          f"(threads={torch.get_num_threads()}) → cameras {plan['cameras']}")
+
+    # Camera threads share this process's threat engine state (track store, dedup,
+    # fusion, statistics), which locks internally; with ENGINE_SOCKET set every
+    # process uses the shared engine service instead
+    threads = []
+    for camera in plan["cameras"]:
+        thread = threading.Thread(
+            target=run_detection_pipeline,
+            kwargs={
+                "source": camera,
+                "confidence_threshold": confidence_threshold,
+                "model": load_model(),
+                "display": False
+            },
+            name=f"detector-{camera}",
+            daemon=True
+        )
+        thread.start()
+        threads.append(thread)
+
+    for thread in threads:
+        thread.join()
+
+
+class CoreUtilisationMonitor:
+    """
+    Samples per-core CPU utilisation from /proc/stat
+    """
+
+    def __init__(self, stat_path=PROC_STAT_PATH):
+        """
+        Initialize utilisation monitor
+
+        Args:
+            stat_path (Path): Location of the kernel stat file
+        """
+        self.stat_path = Path(stat_path)
+        self._last = self._read()
+
+    @property
+    def available(self) -> bool:
+        return bool(self._last)
+
+    def _read(self) -> dict:
+        counters = {}
+        try:
+            with open(self.stat_path) as f:
+                for line in f:
+                    if not line.startswith("cpu") or line.startswith("cpu "):
+                        continue
+                    fields = line.split()
+                    values = [int(v) for v in fields[1:]]
+                    idle = values[3] + (values[4] if len(values) > 4 else 0)  # idle + iowait
+                    counters[int(fields[0][3:])] = (sum(values), idle)
+        except OSError:
+            pass
+        return counters
+
+    def sample(self) -> dict:
+        """
+        Utilisation of each core since the previous sample
+
+        Returns:
+            dict: CPU id -> utilisation percent (0-100)
+        """
+        current = self._read()
+        utilisation = {}
+        for cpu, (total, idle) in current.items():
+            prev_total, prev_idle = self._last.get(cpu, (total, idle))
+            delta_total = total - prev_total
+            delta_idle = idle - prev_idle
+            utilisation[cpu] = 100.0 * (delta_total - delta_idle) / delta_total if delta_total > 0 else 0.0
+        self._last = current
+        return utilisation
+
+
+def format_utilisation_report(plans: list, utilisation: dict) -> str:
+    """
+    Build a per-worker and per-core utilisation report
+
+    Args:
+        plans (list): Worker plans from plan_placement
+        utilisation (dict): CPU id -> utilisation percent
+
+    Returns:
+        str: Human readable report
+    """
+    lines = ["[UTILISATION]"]
+    assigned = set()
+    for plan in plans:
+        cores = plan["cores"]
+        assigned.update(cores)
+        values = [utilisation.get(c, 0.0) for c in cores]
+        average = sum(values) / len(values) if values else 0.0
+        per_core = " ".join(f"{c}:{utilisation.get(c, 0.0):.0f}%" for c in cores)
+        lines.append(f"  Worker {plan['worker_id']} (avg {average:.0f}%) {per_core}")
+
+    unassigned = sorted(set(utilisation) - assigned)
+    if unassigned:
+        per_core = " ".join(f"{c}:{utilisation[c]:.0f}%" for c in unassigned)
+        lines.append(f"  Unassigned {per_core}")
+    return "\n".join(lines)
+
+
+def launch_detectors(cameras: list,
+                     cores_per_worker=None,
+                     numa=True,
+                     confidence_threshold=CONFIDENCE_THRESHOLD,
+                     report_interval=REPORT_INTERVAL):
+    """
+    Start one pinned detector process per worker plan and monitor them
+
+    Args:
+        cameras (list): Video sources (webcam index or path/URL)
+        cores_per_worker (int): Fixed core count per worker (None = split evenly)
+        numa (bool): Keep each worker's cores inside one NUMA node
+        confidence_threshold (float): Minimum confidence passed to each pipeline
+        report_interval (float): Seconds between utilisation reports (0 disables)
+
+    Returns:
+        list: Worker plans that were launched
+    """
+    plans = plan_placement(cameras, cores_per_worker=cores_per_worker, numa=numa)
+
+    print(f"[LAUNCHER] Starting {len(plans)} detector worker(s) for {len(cameras)} camera(s)")
+    for plan in plans:
+        node = f" (NUMA node {plan['numa_node']})" if plan["numa_node"] is not None else ""
+        print(f"  Worker {plan['worker_id']}: cores {plan['cores']}{node} → {plan['cameras']}")
+
+    # Spawn gives each worker a clean interpreter so thread settings apply before torch loads
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for plan in plans:
+        process = context.Process(
+            target=_detector_worker,
+            args=(plan, confidence_threshold),
+            name=f"detector-worker-{plan['worker_id']}"
+        )
+        process.start()
+        processes.append(process)
+
+    monitor = CoreUtilisationMonitor()
+    if report_interval and not monitor.available:
+        print(f"[LAUNCHER] Per-core utilisation unavailable on this platform")
+
+    try:
+        while any(p.is_alive() for p in processes):
+            time.sleep(report_interval if report_interval and monitor.available else 1)
+            if report_interval and monitor.available:
+                print(format_utilisation_report(plans, monitor.sample()))
+    except KeyboardInterrupt:
+        print(f"\n[LAUNCHER] Stopping detector workers...")
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+
+    return plans
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Launch pinned multi-camera detector workers")
+    parser.add_argument("cameras", nargs="+", help="Camera sources (webcam index or path/URL)")
+    parser.add_argument("--cores-per-worker", type=int, default=None)
+    parser.add_argument("--no-numa", action="store_true", help="Ignore NUMA topology")
+    parser.add_argument("--conf", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--report-interval", type=float, default=REPORT_INTERVAL)
+    args = parser.parse_args()
+
+    sources = [int(c) if c.isdigit() else c for c in args.cameras]
+    launch_detectors(
+        sources,
+        cores_per_worker=args.cores_per_worker,
+        numa=not args.no_numa,
+        confidence_threshold=args.conf,
+        report_interval=args.report_interval
+    )